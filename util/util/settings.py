@@ -38,6 +38,10 @@ ALLOWED_HOSTS = []
 MEDIA_ROOT = BASE_DIR / 'media'
 MEDIA_URL = '/media/'
 
+# Server-side caches (parsed workbooks, report pages, upload results). Kept outside
+# MEDIA_ROOT, which is served in development, since the entries are pickled report data.
+CACHE_ROOT = Path(config('CACHE_ROOT', default=str(BASE_DIR / 'cache')))
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -157,3 +161,40 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 25621440  # 25MB
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Parse cache for uploaded workbooks (see util_report/parse_cache.py)
+PARSE_CACHE_ENABLED = config('PARSE_CACHE_ENABLED', default=True, cast=bool)
+PARSE_CACHE_DIR = CACHE_ROOT / 'parse_cache'
+PARSE_CACHE_MAX_BYTES = config('PARSE_CACHE_MAX_BYTES', default=512 * 1024 * 1024, cast=int)
+
+# Batch ingestion of several weekly workbooks (see util_report/batch.py)
+BATCH_INGEST_ROOT = config('BATCH_INGEST_ROOT', default=str(MEDIA_ROOT / 'batch'))  # Server folders must live under here
+BATCH_INGEST_WORKERS = config('BATCH_INGEST_WORKERS', default=4, cast=int)  # Parse processes per batch
+
+# Record tracemalloc peaks per ingestion stage (slows workbook parsing several times over)
+INGESTION_TRACE_MEMORY = config('INGESTION_TRACE_MEMORY', default=False, cast=bool)
+
+# Per-date cache of report tables, aggregates and filters (see util_report/report_cache.py).
+# 'file' shares the cache and its version stamps between the web workers and the ingestion
+# worker, so an edit or ingest in one process invalidates every other. 'locmem' keeps one
+# cache per process and is only safe when a single process serves and writes (development).
+REPORT_CACHE_BACKEND = config('REPORT_CACHE_BACKEND', default='file')
+REPORT_CACHE_ALIAS = 'reports'
+REPORT_CACHE_TIMEOUT = config('REPORT_CACHE_TIMEOUT', default=3600, cast=int)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'reports': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('REPORT_CACHE_DIR', default=str(CACHE_ROOT / 'report_cache')),
+    } if REPORT_CACHE_BACKEND == 'file' else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'util-report',
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+}
+
+# Generated reports of uploads, kept for download_result (see util_report/result_store.py)
+RESULT_STORE_DIR = CACHE_ROOT / 'results'
+RESULT_STORE_TTL = config('RESULT_STORE_TTL', default=24 * 60 * 60, cast=int)  # Seconds
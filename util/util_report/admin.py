@@ -6,12 +6,20 @@ from .models import (
     ResourceDetailsFetch,
     ExclusionTableModel,
     UtilizationReportModel,
+    IngestionJobModel,
+    IngestionRunModel,
+    ReportDateSummaryModel,
+    ReportRdmSummaryModel,
 )
 
 # Register your models here
 admin.site.register(ResourceDetailsFetch)
 admin.site.register(ExclusionTableModel)
 admin.site.register(UtilizationReportModel)
+admin.site.register(IngestionJobModel)
+admin.site.register(IngestionRunModel)
+admin.site.register(ReportDateSummaryModel)
+admin.site.register(ReportRdmSummaryModel)
 
 
 
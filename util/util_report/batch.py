@@ -0,0 +1,183 @@
+"""
+Batch ingestion of several weekly workbooks (a zip or a server-side folder).
+
+Parsing a week has no dependency on any other week, so every workbook is parsed and
+pivoted in a process pool. The stages that carry state from one week to the next
+(last week's additional days, statuses) then run in date order in this process,
+saving each week before the next one reads it.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import connections
+
+from .models import UtilizationReportModel
+from .new_main import UtilizationReportGenerator
+from .profiling import StageProfiler, record_ingestion_run
+
+logger = logging.getLogger(__name__)
+
+WORKBOOK_EXTENSIONS = {'.xlsx', '.xlsm', '.xlsb', '.xls'}
+
+
+def is_batch_source(path):
+    """True for a zip archive or a folder of workbooks."""
+    return os.path.isdir(path) or path.lower().endswith('.zip')
+
+
+def resolve_batch_directory(name):
+    """Map a folder name from a request onto BATCH_INGEST_ROOT, refusing anything outside it."""
+    root = os.path.realpath(settings.BATCH_INGEST_ROOT)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root or not os.path.isdir(path):
+        raise ValueError(f"'{name}' is not a folder under the batch ingestion root.")
+    return path
+
+
+def collect_workbooks(source, extract_dir):
+    """
+    List the workbooks in source, a zip (extracted into extract_dir) or a folder,
+    as date_workbooks() pairs.
+    """
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = []
+        with zipfile.ZipFile(source) as archive:
+            for member in archive.infolist():
+                # Only the base name is used, so members can't escape extract_dir
+                name = os.path.basename(member.filename)
+                if member.is_dir() or not name or name.startswith(('.', '~$')):
+                    continue
+                target = os.path.join(extract_dir, name)
+                with archive.open(member) as src, open(target, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                paths.append(target)
+
+    paths = [path for path in paths if os.path.splitext(path)[-1].lower() in WORKBOOK_EXTENSIONS]
+    if not paths:
+        raise ValueError("No workbooks found in the batch.")
+    return date_workbooks(paths)
+
+
+def date_workbooks(paths):
+    """
+    Pair each workbook with the report date in its file name.
+    Returns (file_date, path) pairs ordered by date; two workbooks for one date are an error.
+    """
+    dated = {}
+    for path in paths:
+        generator = UtilizationReportGenerator(path)
+        generator.parse_date_from_filename()
+        if generator.file_date in dated:
+            raise ValueError(
+                f"{os.path.basename(path)} and {os.path.basename(dated[generator.file_date])} "
+                f"are both for {generator.file_date}"
+            )
+        dated[generator.file_date] = path
+
+    # file_date is ISO formatted, so it sorts chronologically
+    return sorted(dated.items())
+
+
+def parse_workbook(file_path, trace_memory=None):
+    """Pool task: parse one workbook and return its prepared generator."""
+    generator = UtilizationReportGenerator(file_path, profiler=StageProfiler(trace_memory))
+    generator.prepare_report()
+    # Pool processes are reused; don't leave tracemalloc running in them
+    generator.profiler.stop()
+    return generator
+
+
+def _init_parse_worker():
+    # Spawned processes (Windows, macOS) start without Django configured
+    import django
+    django.setup()
+
+
+def parse_workbooks(paths, workers=None, trace_memory=None):
+    """Parse paths in parallel; returns the prepared generators in the same order."""
+    task = partial(parse_workbook, trace_memory=trace_memory)
+    workers = min(workers or settings.BATCH_INGEST_WORKERS, len(paths))
+    if workers <= 1:  # Also covers an empty list
+        return [task(path) for path in paths]
+
+    # Forked parse processes must not share this process's database connections
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker) as pool:
+        return list(pool.map(task, paths))
+
+
+def run_batch(source, replace_existing=False, workers=None, on_progress=None):
+    """
+    Ingest every workbook in source (a zip or folder) with ingest_workbooks().
+    Returns a list of (report_date, rows_written) in date order, None for skipped weeks.
+    """
+    os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+    extract_dir = tempfile.mkdtemp(prefix='batch-', dir=settings.MEDIA_ROOT)
+    try:
+        workbooks = collect_workbooks(source, extract_dir)
+        logger.info(f"Batch ingestion of {len(workbooks)} workbooks from {source}")
+        results = ingest_workbooks(workbooks, replace_existing, workers, on_progress, source='batch')
+        return [(file_date, rows_written) for file_date, _, rows_written in results]
+    finally:
+        shutil.rmtree(extract_dir, ignore_errors=True)
+
+
+def ingest_workbooks(workbooks, replace_existing=False, workers=None, on_progress=None, dry_run=False,
+                     source='batch', trace_memory=None):
+    """
+    Parse the date_workbooks() pairs in parallel, then finish and save them in date
+    order. Weeks already saved are skipped unless replace_existing is set; they still
+    feed the following week's carry-over. With dry_run the workbooks are only parsed.
+    on_progress, if given, is called with (stage, done, total). Each saved week is
+    recorded as an ingestion run from source.
+    Returns (file_date, generator, rows_written) triples; generator and rows_written
+    are None for skipped weeks, rows_written is None for every week of a dry run.
+    """
+    loaded = {
+        report_date.strftime('%Y-%m-%d') for report_date in UtilizationReportModel.objects.filter(
+            date__in=[file_date for file_date, _ in workbooks]
+        ).values_list('date', flat=True).distinct()
+    }
+    todo = [path for file_date, path in workbooks if replace_existing or dry_run or file_date not in loaded]
+    total = len(todo)
+    if on_progress:
+        on_progress('parsing', 0, total)
+
+    generators = {
+        generator.file_date: generator for generator in parse_workbooks(todo, workers, trace_memory)
+    }
+
+    results = []
+    done = 0
+    for file_date, _ in workbooks:
+        generator = generators.get(file_date)
+        if generator is None:
+            logger.info(f"Skipping {file_date}: already loaded")
+            results.append((file_date, None, None))
+            continue
+        if dry_run:
+            results.append((file_date, generator, None))
+            continue
+        if on_progress:
+            on_progress(f"week {file_date}", done, total)
+        try:
+            generator.complete_report()
+            rows_written = generator.run_stage(
+                'save_to_model', generator.save_to_model, replace=file_date in loaded
+            )
+        except Exception as e:
+            record_ingestion_run(generator, source, error=e)
+            raise
+        record_ingestion_run(generator, source, rows_written)
+        results.append((file_date, generator, rows_written))
+        done += 1
+    return results
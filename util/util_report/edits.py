@@ -0,0 +1,308 @@
+"""
+Edits of report rows from the util leakage grid.
+
+apply_edits() takes a list of {id, field, value} changes, applies them in order
+inside one transaction and writes the rows with a single bulk_update and their
+history with a single bulk_create. The summaries of the touched dates are then
+moved by the edits' deltas (adjust_date_summary()) instead of being rebuilt. The single-field endpoints go through it too.
+Billable hours edits re-derive the row with the same rules.py functions as the
+ingest pipeline and recompute_date(), applied to one-row arrays. Edits that change
+a row's additional days are carried into the later weeks of the month by
+cascade_later_weeks() in the same transaction.
+
+close_open_cases() closes a set of open cases the same way: one locked select, one
+UPDATE that appends the closing reason to the comments in SQL and one bulk_create
+of history rows, all in a single transaction.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import TextField, Value
+from django.db.models.functions import Coalesce, Concat, LTrim
+
+from . import rules
+from .models import UtilizationHistoryModel, UtilizationReportModel
+from .recompute import cascade_later_weeks, excluded_emails
+from .summaries import adjust_date_summary, get_date_summary, is_handled
+
+MAX_BATCH_EDITS = 500
+
+# Editable fields and the name used for them in error messages
+EDITABLE_FIELDS = {
+    'billable_hours': 'billable hours',
+    'addtnl_days': 'additional days',
+    'comments': 'comments',
+    'spoc_comments': 'SPOC comments',
+}
+NUMERIC_FIELDS = ('billable_hours', 'addtnl_days')
+
+
+class EditError(ValueError):
+    """A change that cannot be applied; the message is shown to the user."""
+
+
+def _history(report, action, details, field_name, previous_value, new_value):
+    return UtilizationHistoryModel(
+        report_date=report.date,
+        resource_email=report.resource_email_address,
+        action=action,
+        details=details,
+        field_name=field_name,
+        previous_value=previous_value,
+        new_value=new_value,
+    )
+
+
+def closing_comment(reason):
+    return f"[Closed: {reason}]"
+
+
+def _close_if_needed(report, was_open, reason, history):
+    """Append the closing comment and history entry when report just closed."""
+    if was_open and report.status == 'close':
+        report.comments = f"{report.comments or ''}{' ' if report.comments else ''}{closing_comment(reason)}".strip()
+        history.append(_history(report, 'closed', reason, 'status', 'open', 'close'))
+
+
+def set_billable_hours(report, value, last_week, excluded=False):
+    """
+    Set billable hours and recalculate grand total, total logged, additional days and
+    status. last_week is the resource's additional days of the previous week and
+    excluded whether the resource is on the exclusion list.
+    """
+    history = [_history(
+        report, 'edited', "Billable hours updated", 'billable_hours', str(report.billable_hours), str(value)
+    )]
+    report.billable_hours = value
+    report.grand_total = report.administrative + value + report.training + report.unassigned + report.vacation
+
+    if rules.week_number(report.date) == 1:
+        last_week = 0
+    total_days = rules.week_days(report.date)
+    billing = rules.clean_billing([report.billing])
+    logged = rules.total_logged([value], [report.vacation], [last_week])
+    was_open = report.status == 'open'
+
+    report.last_week = round(float(last_week), 2)
+    report.total_logged = round(float(logged[0]), 2)
+    report.addtnl_days = float(rules.additional_days(billing, logged, total_days, [excluded])[0])
+    report.status = rules.status(billing, [value], [report.vacation], total_days, [excluded])[0]
+
+    _close_if_needed(report, was_open, "Automatically closed - Required hours met", history)
+    return history
+
+
+def set_additional_days(report, value):
+    """Set additional days by hand; zero closes the case, anything else reopens it."""
+    history = [_history(
+        report, 'edited', "Additional days updated", 'addtnl_days', str(report.addtnl_days), str(value)
+    )]
+    report.addtnl_days = value
+    was_open = report.status == 'open'
+    report.status = 'close' if value == 0 else 'open'
+    _close_if_needed(report, was_open, "Manually set additional days to 0", history)
+    return history
+
+
+def set_comment(report, field, value):
+    """Set comments or spoc_comments."""
+    history = [_history(
+        report, 'edited', f"{field.replace('_', ' ').title()} updated", field, getattr(report, field, ''), value
+    )]
+    setattr(report, field, value)
+    return history
+
+
+def summary_deltas(before, after):
+    """Changes of (open count, handled count, additional days) between two (status, comments, addtnl_days) states."""
+    (status_before, comments_before, days_before), (status_after, comments_after, days_after) = before, after
+    return (
+        (status_after == 'open') - (status_before == 'open'),
+        is_handled(status_after, comments_after) - is_handled(status_before, comments_before),
+        (days_after or 0) - (days_before or 0),
+    )
+
+
+def _summary_state(report):
+    return report.status, report.comments, report.addtnl_days
+
+
+def parse_changes(changes):
+    """Validate raw {id, field, value} changes; returns (id, field, value) tuples."""
+    if not isinstance(changes, list) or not changes:
+        raise EditError("No changes provided")
+    if len(changes) > MAX_BATCH_EDITS:
+        raise EditError(f"At most {MAX_BATCH_EDITS} changes can be saved at once")
+
+    parsed = []
+    for change in changes:
+        if not isinstance(change, dict):
+            raise EditError("Each change needs an id, a field and a value")
+        field = change.get('field')
+        if field not in EDITABLE_FIELDS:
+            raise EditError('Invalid field')
+        try:
+            report_id = int(change.get('id'))
+        except (TypeError, ValueError):
+            raise EditError('Invalid report id')
+        value = change.get('value')
+        if field in NUMERIC_FIELDS:
+            try:
+                value = float(value if value is not None else 0)
+            except (TypeError, ValueError):
+                raise EditError(f"Invalid {EDITABLE_FIELDS[field]} value")
+        else:
+            value = '' if value is None else str(value)
+        parsed.append((report_id, field, value))
+    return parsed
+
+
+def edited_row(report, status_before):
+    return {
+        'id': report.id,
+        'date': report.date.isoformat(),
+        'billable_hours': report.billable_hours,
+        'grand_total': report.grand_total,
+        'addtnl_days': report.addtnl_days,
+        'status': report.status,
+        'status_changed': report.status != status_before,
+        'comments': report.comments or '',
+        'spoc_comments': report.spoc_comments or '',
+    }
+
+
+def apply_edits(changes):
+    """
+    Apply changes (see parse_changes()) in order, in one transaction. Returns the
+    edited rows, the new header counts of every date they belong to and the number
+    of later-week rows the changes were carried into; raises
+    EditError for invalid changes and UtilizationReportModel.DoesNotExist for unknown ids.
+    """
+    changes = parse_changes(changes)
+
+    with transaction.atomic():
+        reports = UtilizationReportModel.objects.select_for_update().in_bulk({report_id for report_id, _, _ in changes})
+        missing = sorted({report_id for report_id, _, _ in changes} - set(reports))
+        if missing:
+            raise UtilizationReportModel.DoesNotExist(f"Report not found: {', '.join(map(str, missing))}")
+        state_before = {report_id: _summary_state(report) for report_id, report in reports.items()}
+        dates = sorted({report.date for report in reports.values()})
+        # Build any missing summary before the rows change, so the deltas below apply to it
+        for report_date in dates:
+            get_date_summary(report_date)
+
+        # Previous-week additional days for billable hours edits, read in one query.
+        # Rows edited in this batch are taken from memory so earlier changes count.
+        batch_rows = {(report.resource_email_address, report.date): report for report in reports.values()}
+        previous_keys = {
+            (reports[report_id].resource_email_address, reports[report_id].date - timedelta(days=7))
+            for report_id, field, _ in changes if field == 'billable_hours'
+        }
+        previous_days = {}
+        if previous_keys:
+            previous_days = {
+                (email, report_date): days
+                for email, report_date, days in UtilizationReportModel.objects.filter(
+                    resource_email_address__in={email for email, _ in previous_keys},
+                    date__in={report_date for _, report_date in previous_keys},
+                ).values_list('resource_email_address', 'date', 'addtnl_days')
+            }
+            exclusions = excluded_emails()
+
+        history = []
+        updated_fields = set()
+        for report_id, field, value in changes:
+            report = reports[report_id]
+            if field == 'billable_hours':
+                key = (report.resource_email_address, report.date - timedelta(days=7))
+                last_week = batch_rows[key].addtnl_days if key in batch_rows else previous_days.get(key, 0)
+                is_excluded = rules.excluded([report.resource_email_address], exclusions)[0]
+                history += set_billable_hours(report, value, last_week or 0, is_excluded)
+                updated_fields.update((
+                    'billable_hours', 'grand_total', 'last_week', 'total_logged', 'addtnl_days', 'status', 'comments'
+                ))
+            elif field == 'addtnl_days':
+                history += set_additional_days(report, value)
+                updated_fields.update(('addtnl_days', 'status', 'comments'))
+            else:
+                history += set_comment(report, field, value)
+                updated_fields.add(field)
+
+        edited = [reports[report_id] for report_id in dict.fromkeys(report_id for report_id, _, _ in changes)]
+        UtilizationReportModel.objects.bulk_update(edited, sorted(updated_fields))
+        UtilizationHistoryModel.objects.bulk_create(history)
+
+        deltas = {report_date: [0, 0, 0] for report_date in dates}
+        for report in edited:
+            changes_of_row = summary_deltas(state_before[report.id], _summary_state(report))
+            deltas[report.date] = [total + change for total, change in zip(deltas[report.date], changes_of_row)]
+        for report_date, (open_delta, handled_delta, additional_days_delta) in deltas.items():
+            adjust_date_summary(report_date, open_delta, handled_delta, additional_days_delta)
+
+        # The next week's last_week is this week's additional days
+        cascaded = cascade_later_weeks({
+            (report.resource_email_address, report.date)
+            for report in edited
+            if report.resource_email_address and report.addtnl_days != state_before[report.id][2]
+        })
+
+    counts = {}
+    for report_date in dates:
+        summary = get_date_summary(report_date)
+        counts[report_date.isoformat()] = {
+            'open_count': summary.open_count if summary else 0,
+            'handled_count': summary.handled_count if summary else 0,
+            'dams_utilization': summary.dams_utilization if summary else 0,
+            'capable_utilization': summary.capable_utilization if summary else 0,
+        }
+    return {
+        'rows': [edited_row(report, state_before[report.id][0]) for report in edited],
+        'counts': counts,
+        'cascaded_rows': cascaded,
+    }
+
+
+def close_open_cases(case_ids, reason):
+    """
+    Close the open cases among case_ids with reason appended to their comments.
+    All or nothing; returns the number of cases closed.
+    """
+    with transaction.atomic():
+        cases = list(
+            UtilizationReportModel.objects.select_for_update()
+            .filter(id__in=case_ids, status='open')
+            .order_by('id')
+            .values_list('id', 'date', 'resource_email_address')
+        )
+        if not cases:
+            return 0
+        closed_per_date = {}
+        for _, report_date, _ in cases:
+            closed_per_date[report_date] = closed_per_date.get(report_date, 0) + 1
+        for report_date in closed_per_date:
+            get_date_summary(report_date)
+
+        # Same text as _close_if_needed(): existing comments, a space, the marker
+        UtilizationReportModel.objects.filter(id__in=[case_id for case_id, _, _ in cases]).update(
+            status='close',
+            comments=LTrim(Concat(
+                Coalesce('comments', Value('')), Value(' ' + closing_comment(reason)), output_field=TextField()
+            )),
+        )
+        UtilizationHistoryModel.objects.bulk_create([
+            UtilizationHistoryModel(
+                report_date=report_date,
+                resource_email=email,
+                action='closed',
+                details=f"Case closed with reason: {reason}",
+                field_name='status',
+                previous_value='open',
+                new_value='close',
+            )
+            for _, report_date, email in cases
+        ])
+        # Every case was open and is now closed with the marker
+        for report_date, closed in closed_per_date.items():
+            adjust_date_summary(report_date, open_delta=-closed, handled_delta=closed)
+    return len(cases)
@@ -0,0 +1,198 @@
+"""
+Shared Excel export for the report downloads.
+
+Every download uses the same layout: the Oracle logo in A1, a red confidential banner
+merged across the first row, bold bordered headers on row 3 and bordered data rows
+below. export_response() writes that layout with openpyxl's write-only workbook, so
+rows go to a temporary file as they are produced instead of being held as cell
+objects. The finished file is streamed back with a StreamingHttpResponse.
+
+Write-only sheets need their column widths before the first row is written, so the
+caller passes the longest value per column, measured up front: width_from_frame()
+does it with vectorized string lengths, width_from_queryset() from the database,
+measuring the values as the export writes them.
+"""
+
+import os
+import tempfile
+from functools import lru_cache
+from io import BytesIO
+
+import pandas as pd
+from django.conf import settings
+from django.db.models import F, Max, Value
+from django.db.models.functions import Coalesce, Length, NullIf
+from django.http import StreamingHttpResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.drawing.image import Image as XLImage
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
+from openpyxl.utils import get_column_letter
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+BANNER_TEXT = 'Confidential - Oracle Restricted'
+
+STREAM_CHUNK_BYTES = 64 * 1024
+
+_thin = Side(style='thin')
+THIN_BORDER = Border(left=_thin, right=_thin, top=_thin, bottom=_thin)
+
+
+def _named_styles():
+    """The styles every export registers once on its workbook."""
+    return [
+        NamedStyle(name='export_header', font=Font(bold=True), border=THIN_BORDER),
+        NamedStyle(name='export_cell', border=THIN_BORDER),
+        NamedStyle(
+            name='export_banner',
+            font=Font(bold=True, color='FF0000', size=14),
+            alignment=Alignment(horizontal='center', vertical='center'),
+        ),
+    ]
+
+
+@lru_cache(maxsize=1)
+def _logo_bytes(logo_path):
+    """Logo file contents, read from disk once per process (None when missing)."""
+    if not os.path.exists(logo_path):
+        return None
+    with open(logo_path, 'rb') as f:
+        return f.read()
+
+
+def logo_path():
+    return os.path.join(settings.BASE_DIR, 'static', 'Oracle-Logo.png')
+
+
+def width_from_frame(df, columns):
+    """Longest str() length per column of df, measured column by column."""
+    widths = []
+    for column in columns:
+        values = df[column]
+        widths.append(int(values.astype(str).str.len().max()) if len(values) else 0)
+    return widths
+
+
+def width_from_queryset(queryset, fields, defaults=None, formatters=None):
+    """
+    Longest str() length per field of the values an export writes for queryset.
+
+    Fields in formatters (numbers) are written as formatters[field](value); they are
+    measured in Python on the field's distinct values, since the database would
+    format them differently. The other fields are text, written with empty values
+    replaced by defaults.get(field) when given, and measured by one aggregate query.
+    """
+    defaults = defaults or {}
+    formatters = formatters or {}
+    queryset = queryset.order_by()
+    aggregates = {}
+    for field in fields:
+        if field in formatters:
+            continue
+        expression = F(field)
+        if defaults.get(field):
+            expression = Coalesce(NullIf(expression, Value('')), Value(defaults[field]))
+        aggregates[field] = Coalesce(Max(Length(expression)), 0)
+    result = queryset.aggregate(**aggregates) if aggregates else {}
+    for field, formatter in formatters.items():
+        values = queryset.values_list(field, flat=True).distinct()
+        result[field] = max((len(str(formatter(value))) for value in values), default=0)
+    return [result[field] for field in fields]
+
+
+def new_workbook():
+    """A write-only workbook with the export styles registered."""
+    wb = Workbook(write_only=True)
+    for style in _named_styles():
+        wb.add_named_style(style)
+    return wb
+
+
+def add_sheet(wb, sheet_title, headers, rows, widths=None):
+    """
+    Append a sheet with the export layout to wb, writing rows (an iterable of value
+    sequences) as they come. widths are the longest data values per column.
+    """
+    ws = wb.create_sheet(sheet_title)
+    ws.sheet_view.showGridLines = False
+
+    for index, header in enumerate(headers, 1):
+        longest = max(len(str(header)), widths[index - 1] if widths else 0)
+        ws.column_dimensions[get_column_letter(index)].width = longest + 3
+
+    # Banner row: logo in A1, confidential text merged across the remaining columns
+    logo = _logo_bytes(logo_path())
+    if logo is not None:
+        img = XLImage(BytesIO(logo))
+        img.height = 50
+        img.width = 150
+        ws.add_image(img, 'A1')
+        ws.row_dimensions[1].height = 40
+        first_cell = None
+    else:
+        first_cell = 'Logo not found'
+    ws.merged_cells.add(f'B1:{get_column_letter(max(len(headers), 2))}1')
+    banner = WriteOnlyCell(ws, value=BANNER_TEXT)
+    banner.style = 'export_banner'
+    ws.append([first_cell, banner])
+    ws.append([])
+
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.style = 'export_header'
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    for row in rows:
+        cells = []
+        for value in row:
+            if isinstance(value, pd.Timestamp):
+                value = value.strftime('%Y-%m-%d')
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = 'export_cell'
+            cells.append(cell)
+        ws.append(cells)
+
+
+def save_workbook(wb):
+    """Save wb into a temporary file and return it, positioned at the start."""
+    output = tempfile.TemporaryFile(suffix='.xlsx')
+    wb.save(output)
+    output.seek(0)
+    return output
+
+
+def build_workbook(sheet_title, headers, rows, widths=None):
+    """A single-sheet export saved into a temporary file (see add_sheet())."""
+    wb = new_workbook()
+    add_sheet(wb, sheet_title, headers, rows, widths)
+    return save_workbook(wb)
+
+
+def stream_file(output):
+    """Yield the contents of an open file in chunks, closing it at the end."""
+    try:
+        while True:
+            chunk = output.read(STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        output.close()
+
+
+def file_response(output, filename, content_type=XLSX_CONTENT_TYPE):
+    """Stream an open temporary file back as an attachment called filename."""
+    size = output.seek(0, os.SEEK_END)
+    output.seek(0)
+    response = StreamingHttpResponse(stream_file(output), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+    response['Content-Length'] = str(size)
+    return response
+
+
+def export_response(filename, sheet_title, headers, rows, widths=None):
+    """Build the workbook and stream it back as an attachment called filename."""
+    return file_response(build_workbook(sheet_title, headers, rows, widths), filename)
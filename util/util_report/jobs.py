@@ -0,0 +1,320 @@
+"""
+Durable ingestion jobs.
+
+Uploads enqueue an IngestionJobModel row and return straight away. Worker processes
+started by `manage.py run_ingestion_worker` claim queued jobs from the database, run
+the report generator and record stage / progress on the row. While a job runs, a
+JobHeartbeat thread refreshes its heartbeat every HEARTBEAT_INTERVAL seconds, so a
+long parse stage or batch never looks stale; jobs whose worker stops sending
+heartbeats altogether are put back on the queue.
+
+A workbook whose date was loaded after it was queued (the same week uploaded twice)
+is not saved: the job ends as needs_confirmation and keeps its file, so the user
+can confirm replacing the date. Uploads are only deleted once their job succeeds;
+remove_stale_uploads() clears those of failed and unconfirmed jobs later.
+"""
+
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .batch import run_batch
+from .models import IngestionJobModel, UtilizationReportModel
+from .new_main import UtilizationReportGenerator
+from .profiling import record_ingestion_run
+from .result_store import result_store
+
+logger = logging.getLogger(__name__)
+
+# Progress reported when each generator stage starts
+STAGE_PROGRESS = {
+    'process_report': 5,
+    'generate_report': 40,
+    'merge_from_models': 50,
+    'add_additional_days_column': 60,
+    'apply_status': 70,
+    'get_exclusion_list': 75,
+    'filter_exclusions': 80,
+    'save_to_model': 85,
+}
+
+# Crashed jobs are retried this many times before being marked failed
+MAX_ATTEMPTS = 3
+
+# Seconds between heartbeats of a running job; keep well under the worker's --stale-after
+HEARTBEAT_INTERVAL = 30
+
+# Uploads of failed and unconfirmed jobs are kept this long for a retry or a confirmation
+STALE_UPLOAD_AFTER = timedelta(days=1)
+
+
+def worker_name():
+    """Identify this worker process in job rows."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_ingestion(file_path, report_date=None, replace_existing=False):
+    """Queue a workbook for ingestion and return the job."""
+    job = IngestionJobModel.objects.create(
+        file_path=file_path,
+        report_date=report_date,
+        replace_existing=replace_existing,
+    )
+    logger.info(f"Queued ingestion job {job.pk} for {report_date}")
+    return job
+
+
+def enqueue_batch(source, replace_existing=False):
+    """Queue a zip or folder of weekly workbooks for batch ingestion and return the job."""
+    job = IngestionJobModel.objects.create(
+        kind='batch',
+        file_path=source,
+        replace_existing=replace_existing,
+    )
+    logger.info(f"Queued batch ingestion job {job.pk} for {source}")
+    return job
+
+
+def update_job(job, **fields):
+    """Persist the given fields on job, refreshing its heartbeat."""
+    fields['heartbeat_at'] = timezone.now()
+    for name, value in fields.items():
+        setattr(job, name, value)
+    IngestionJobModel.objects.filter(pk=job.pk).update(**fields)
+
+
+class JobHeartbeat:
+    """
+    Refresh a running job's heartbeat from a background thread until the block exits,
+    whatever the stage is doing. Used as a context manager around the job's work.
+    """
+
+    def __init__(self, job, interval=HEARTBEAT_INTERVAL):
+        self.job = job
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'job-{job.pk}-heartbeat', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.interval):
+                try:
+                    IngestionJobModel.objects.filter(pk=self.job.pk, status='running').update(
+                        heartbeat_at=timezone.now()
+                    )
+                except Exception as e:
+                    logger.warning(f"Could not refresh the heartbeat of ingestion job {self.job.pk}: {e}")
+        finally:
+            # The thread has its own database connection
+            connection.close()
+
+
+def claim_next_job(worker=None):
+    """Atomically move the oldest queued job to running and return it, or None."""
+    with transaction.atomic():
+        job = (IngestionJobModel.objects
+               .select_for_update(skip_locked=True)
+               .filter(status='queued')
+               .order_by('created_at')
+               .first())
+        if job is None:
+            return None
+        now = timezone.now()
+        # Compare-and-set so backends without row locks can't hand a job out twice
+        claimed = IngestionJobModel.objects.filter(pk=job.pk, status='queued').update(
+            status='running',
+            stage='starting',
+            progress=0,
+            attempts=job.attempts + 1,
+            worker=worker or worker_name(),
+            started_at=now,
+            heartbeat_at=now,
+        )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    return job
+
+
+def requeue_stale_jobs(stale_after=timedelta(minutes=10)):
+    """Return running jobs whose worker went quiet to the queue, or fail them after MAX_ATTEMPTS."""
+    cutoff = timezone.now() - stale_after
+    stale = IngestionJobModel.objects.filter(status='running', heartbeat_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status='failed',
+        message='Worker stopped responding',
+        finished_at=timezone.now(),
+    )
+    requeued = stale.filter(attempts__lt=MAX_ATTEMPTS).update(status='queued', stage='queued', progress=0)
+    if failed or requeued:
+        logger.warning(f"Stale ingestion jobs: {requeued} requeued, {failed} failed")
+    return requeued, failed
+
+
+def run_ingestion_job(job):
+    """Run a claimed job, keeping its heartbeat fresh until it finishes."""
+    with JobHeartbeat(job):
+        if job.kind == 'batch':
+            return run_batch_job(job)
+        return run_workbook_job(job)
+
+
+def run_workbook_job(job):
+    """Generate and save the report for a claimed workbook job, recording the outcome on the row."""
+
+    def on_stage(stage):
+        update_job(job, stage=stage, progress=STAGE_PROGRESS.get(stage, job.progress))
+
+    report_generator = None
+    try:
+        report_generator = UtilizationReportGenerator(job.file_path, stage_callback=on_stage)
+        # The date may have been loaded since the upload was queued; check before parsing
+        report_generator.parse_date_from_filename()
+        if not job.replace_existing and date_loaded(report_generator.file_date):
+            return needs_confirmation(job, report_generator.file_date)
+        report_generator.generate_final_report()
+
+        try:
+            rows_written = report_generator.run_stage(
+                'save_to_model', report_generator.save_to_model, replace=job.replace_existing
+            )
+        except IntegrityError:
+            # Another job saved the date while this one was parsing
+            if job.replace_existing or not date_loaded(report_generator.file_date):
+                raise
+            return needs_confirmation(job, report_generator.file_date)
+
+        # Keep the generated report for download_result; the rows are saved either way
+        result_token = None
+        try:
+            result_token = result_store.put(report_generator.final_report)
+        except Exception as e:
+            logger.warning(f"Could not store the result of ingestion job {job.pk}: {e}")
+
+        update_job(
+            job,
+            status='succeeded',
+            stage='done',
+            progress=100,
+            rows_written=rows_written or 0,
+            result_token=result_token,
+            report_date=report_generator.parsed_date.date(),
+            message=f"Saved {rows_written or 0} rows for {report_generator.file_date}",
+            finished_at=timezone.now(),
+        )
+        logger.info(f"Ingestion job {job.pk} completed: {job.message}")
+        record_ingestion_run(report_generator, 'upload', rows_written)
+        remove_upload(job)
+    except Exception as e:
+        logger.error(f"Ingestion job {job.pk} failed: {e}", exc_info=True)
+        update_job(job, status='failed', message=str(e), finished_at=timezone.now())
+        if report_generator is not None:
+            record_ingestion_run(report_generator, 'upload', error=e)
+    return job
+
+
+def date_loaded(report_date):
+    """Whether report rows are already saved for report_date."""
+    return UtilizationReportModel.objects.filter(date=report_date).exists()
+
+
+def needs_confirmation(job, report_date):
+    """Finish job without saving because report_date is already loaded; its upload is kept."""
+    update_job(
+        job,
+        status='needs_confirmation',
+        stage='done',
+        progress=100,
+        report_date=report_date,
+        message=f"Data for {report_date} is already loaded. Confirm to replace it with this file.",
+        finished_at=timezone.now(),
+    )
+    logger.info(f"Ingestion job {job.pk} needs confirmation: {report_date} is already loaded")
+    return job
+
+
+def run_batch_job(job):
+    """Ingest every workbook of a batch job, reporting the week being saved as its stage."""
+    def on_progress(stage, done, total):
+        # Parsing runs in parallel up front; saving the weeks in order takes the rest
+        update_job(job, stage=stage, progress=10 + int(85 * done / max(total, 1)))
+
+    try:
+        results = run_batch(job.file_path, replace_existing=job.replace_existing, on_progress=on_progress)
+        saved = [(file_date, rows) for file_date, rows in results if rows is not None]
+        skipped = len(results) - len(saved)
+        message = f"Saved {len(saved)} weeks ({sum(rows for _, rows in saved)} rows)"
+        if skipped:
+            message += f", skipped {skipped} already loaded"
+        update_job(
+            job,
+            status='succeeded',
+            stage='done',
+            progress=100,
+            rows_written=sum(rows for _, rows in saved),
+            report_date=results[-1][0],
+            message=message,
+            finished_at=timezone.now(),
+        )
+        logger.info(f"Batch ingestion job {job.pk} completed: {message}")
+        remove_upload(job)
+    except Exception as e:
+        logger.error(f"Batch ingestion job {job.pk} failed: {e}", exc_info=True)
+        update_job(job, status='failed', message=str(e), finished_at=timezone.now())
+    return job
+
+
+def upload_root():
+    """Directory uploads are saved to by FileSystemStorage."""
+    return os.path.realpath(FileSystemStorage().location)
+
+
+def remove_upload(job):
+    """
+    Delete the job's uploaded file; returns whether it was removed. Only files saved
+    straight into upload_root() are removed; server-side batch folders and zips, and
+    anything else, are left alone.
+    """
+    path = os.path.realpath(job.file_path)
+    if os.path.dirname(path) != upload_root() or not os.path.isfile(path):
+        return False
+    try:
+        os.remove(path)
+    except OSError as e:
+        logger.warning(f"Could not remove {job.file_path}: {e}")
+        return False
+    return True
+
+
+def remove_stale_uploads(older_than=STALE_UPLOAD_AFTER):
+    """
+    Delete the uploads of jobs that failed or waited for confirmation more than
+    older_than ago, unless a queued or running job still uses the file.
+    Returns the number of uploads removed.
+    """
+    cutoff = timezone.now() - older_than
+    in_use = set(
+        IngestionJobModel.objects.filter(status__in=('queued', 'running')).values_list('file_path', flat=True)
+    )
+    jobs = (IngestionJobModel.objects
+            .filter(status__in=('failed', 'needs_confirmation'), finished_at__lt=cutoff)
+            .exclude(file_path__in=in_use))
+    removed = sum(remove_upload(job) for job in jobs.only('pk', 'file_path'))
+    if removed:
+        logger.info(f"Removed {removed} stale uploads")
+    return removed
@@ -0,0 +1,134 @@
+"""
+Low utilization statistics over a range of report dates.
+
+Each resource is reduced to its average individual utilization over the range by
+one grouped query. A second query groups those per-resource rows by billing type
+and RDM and counts the histogram buckets with conditional aggregation, so only a
+handful of rows per distinct (billing, RDM) pair reach Python whatever the length
+of the history.
+"""
+
+import calendar
+from datetime import date
+
+from django.db import connection
+from django.db.models import Avg, Max, Value
+from django.db.models.functions import Coalesce, NullIf
+
+from .models import UtilizationReportModel
+
+LOW_THRESHOLD = 35
+WARNING_THRESHOLD = 50
+
+# Histogram buckets of average utilization: (label, lower bound, upper bound)
+UTILIZATION_RANGES = [
+    ('0-15%', None, 15),
+    ('15-25%', 15, 25),
+    ('25-35%', 25, 35),
+    ('35-50%', 35, 50),
+    ('Above 50%', 50, None),
+]
+
+
+def month_bounds(year, month):
+    """First and last day of a month."""
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def latest_month_bounds():
+    """Bounds of the month holding the latest report date, or None without data."""
+    latest = UtilizationReportModel.objects.aggregate(latest=Max('date'))['latest']
+    if latest is None:
+        return None
+    return month_bounds(latest.year, latest.month)
+
+
+def _label(field):
+    # Blank values only win when the resource has no other value in the range
+    return Coalesce(Max(NullIf(field, Value(''))), Value('N/A'))
+
+
+def resource_averages(start, end):
+    """One row per resource with its average utilization from start to end, and its billing and RDM."""
+    return (
+        UtilizationReportModel.objects
+        .filter(date__range=(start, end))
+        .order_by()
+        .values('resource_email_address')
+        .annotate(
+            utilization=Avg('individual_utilization'),
+            billing_label=_label('billing'),
+            rdm_label=_label('rdm'),
+        )
+    )
+
+
+def _bucket_sql(lower, upper, then='1'):
+    conditions = []
+    if lower is not None:
+        conditions.append(f"utilization >= {lower}")
+    if upper is not None:
+        conditions.append(f"utilization < {upper}")
+    return f"SUM(CASE WHEN {' AND '.join(conditions)} THEN {then} ELSE 0 END)"
+
+
+def low_utilization_report(start, end):
+    """
+    Resources below LOW_THRESHOLD and WARNING_THRESHOLD from start to end, with the
+    billing, RDM and utilization range distributions of all resources.
+    """
+    averages = resource_averages(start, end)
+    inner_sql, params = averages.query.sql_with_params()
+    bucket_columns = ', '.join(_bucket_sql(lower, upper) for _, lower, upper in UTILIZATION_RANGES)
+    grouped_sql = (
+        f"SELECT billing_label, rdm_label, COUNT(*), SUM(utilization), "
+        f"{_bucket_sql(None, LOW_THRESHOLD, 'utilization')}, "
+        f"{_bucket_sql(LOW_THRESHOLD, WARNING_THRESHOLD, 'utilization')}, {bucket_columns} "
+        f"FROM ({inner_sql}) resource_averages GROUP BY billing_label, rdm_label"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(grouped_sql, params)
+        groups = cursor.fetchall()
+
+    billing_types = {}
+    rdm_distribution = {}
+    range_counts = [0] * len(UTILIZATION_RANGES)
+    total = total_sum = below_35_sum = below_50_sum = 0
+    for billing, rdm, count, utilization_sum, low_sum, warning_sum, *buckets in groups:
+        billing_types[billing] = billing_types.get(billing, 0) + count
+        rdm_distribution[rdm] = rdm_distribution.get(rdm, 0) + count
+        range_counts = [seen + (bucket or 0) for seen, bucket in zip(range_counts, buckets)]
+        total += count
+        total_sum += utilization_sum or 0
+        below_35_sum += low_sum or 0
+        below_50_sum += warning_sum or 0
+
+    below_35 = []
+    below_50 = []
+    for row in averages.filter(utilization__lt=WARNING_THRESHOLD).order_by('utilization', 'resource_email_address'):
+        resource = {
+            'resource_email': row['resource_email_address'],
+            'individual_utilization': row['utilization'],
+            'billing': row['billing_label'],
+            'rdm': row['rdm_label'],
+        }
+        (below_35 if row['utilization'] < LOW_THRESHOLD else below_50).append(resource)
+
+    return {
+        'below_35': below_35,
+        'below_50': below_50,
+        'total_resources': total,
+        'stats': {
+            'billing_types': [{'type': billing, 'count': count} for billing, count in billing_types.items()],
+            'rdm_distribution': [{'name': rdm, 'count': count} for rdm, count in rdm_distribution.items()],
+            'utilization_ranges': [
+                {'range': label, 'count': count}
+                for (label, _, _), count in zip(UTILIZATION_RANGES, range_counts)
+            ],
+            'averages': {
+                'below_35': below_35_sum / len(below_35) if below_35 else 0,
+                'below_50': below_50_sum / len(below_50) if below_50 else 0,
+                'all': total_sum / total if total else 0,
+            },
+        },
+    }
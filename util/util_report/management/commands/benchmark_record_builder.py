@@ -0,0 +1,144 @@
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from util_report.models import UtilizationReportModel
+from util_report.records import build_report_records
+
+
+def synthetic_report(size, seed=0):
+    """A merged_report / WTD pair shaped like a real week, with some blanks."""
+    rng = np.random.default_rng(seed)
+    emails = [f"consultant{i}@example.com" for i in range(size)]
+
+    def hours():
+        values = rng.choice([0, 1.5, 8, 16, 24, 40, np.nan], size)
+        return pd.Series(values).astype(object).where(pd.notna(values), None)
+
+    merged = pd.DataFrame({
+        'Resource Email Address': emails,
+        'Administrative': hours(),
+        'Billable Hours': hours(),
+        'Department Mgmt': hours(),
+        'Investment': hours(),
+        'Presales': hours(),
+        'Training': hours(),
+        'Unassigned': hours(),
+        'Vacation': hours(),
+        'Grand Total': hours(),
+        'Last Week': hours(),
+        'Additional Days': rng.integers(0, 5, size),
+        'WTD Actuals': hours(),
+        'RDM': rng.choice(['Adam', 'Priya', '', None], size),
+        'Track': rng.choice(['Finance', 'HCM', None], size),
+        'Billing': rng.choice(['Billing', 'Partial', 'On Bench', None], size),
+        'Status': rng.choice(['open', 'close'], size),
+        'comments': '',
+        'spoc_comments': '',
+    })
+    wtd = pd.DataFrame({
+        'Consultant Name': emails,
+        'Individual Utilization': rng.uniform(0, 120, size),
+        'WTD Capacity': 40.0,
+        'Billable Hours': rng.uniform(0, 40, size),
+    })
+    return merged, wtd
+
+
+def legacy_records(merged_report, wtd, report_date, constants):
+    """The per-row iterrows() builder save_to_model used before the columnar builder."""
+    merged_report = merged_report.copy()
+    for column in merged_report.columns:
+        if pd.api.types.is_numeric_dtype(merged_report[column]):
+            merged_report[column] = merged_report[column].replace({pd.NA: None, float('nan'): None})
+        elif pd.api.types.is_string_dtype(merged_report[column]):
+            merged_report[column] = merged_report[column].fillna('')
+
+    def safe_float(value, default=0.0):
+        if pd.isna(value) or value is None:
+            return default
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return default
+
+    individual_util_map = dict(zip(wtd['Consultant Name'], wtd['Individual Utilization']))
+    wtd_capacity_map = dict(zip(wtd['Consultant Name'], wtd['WTD Capacity']))
+    total_billed_map = dict(zip(wtd['Consultant Name'], wtd['Billable Hours']))
+
+    records = []
+    for _, row in merged_report.iterrows():
+        resource_email = row.get('Resource Email Address', '')
+        if not resource_email:
+            continue
+        if isinstance(resource_email, str):
+            resource_email = resource_email.lower()
+        billable_hours = safe_float(row.get('Billable Hours', row.get('billable_hours', 0)))
+        vacation = safe_float(row.get('Vacation', row.get('vacation', 0)))
+        last_week = safe_float(row.get('Last Week', row.get('last_week', 0)))
+        records.append(UtilizationReportModel(
+            resource_email_address=resource_email,
+            administrative=safe_float(row.get('Administrative', row.get('administrative', 0))),
+            billable_hours=billable_hours,
+            total_billed=safe_float(total_billed_map.get(resource_email, 0)),
+            department_mgmt=safe_float(row.get('Department Mgmt', row.get('department_mgmt', 0))),
+            investment=safe_float(row.get('Investment', row.get('investment', 0))),
+            presales=safe_float(row.get('Presales', row.get('presales', 0))),
+            training=safe_float(row.get('Training', row.get('training', 0))),
+            unassigned=safe_float(row.get('Unassigned', row.get('unassigned', 0))),
+            vacation=vacation,
+            grand_total=safe_float(row.get('Grand Total', row.get('grand_total', 0))),
+            last_week=last_week,
+            total_logged=billable_hours + vacation + last_week,
+            status=row.get('Status', row.get('status', 'open')) or 'open',
+            addtnl_days=safe_float(row.get('Additional Days', row.get('addtnl_days', 0))),
+            wtd_actuals=safe_float(row.get('WTD Actuals', row.get('wtd_actuals', 0))),
+            wtd_capacity=safe_float(wtd_capacity_map.get(resource_email, 0)),
+            rdm=row.get('RDM', row.get('rdm', 'Adam')) or 'Adam',
+            track=row.get('Track', row.get('track', '')) or '',
+            billing=row.get('Billing', row.get('billing', 'TBD')) or 'TBD',
+            spoc=row.get('RDM', row.get('rdm', 'Adam')) or 'Adam',
+            comments=row.get('comments', '') or '',
+            spoc_comments=row.get('spoc_comments', '') or '',
+            date=report_date,
+            individual_utilization=safe_float(individual_util_map.get(resource_email, 0)),
+            **constants,
+        ))
+    return records
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/second of the legacy iterrows() record builder and the columnar builder'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000],
+                            help='Report sizes to benchmark')
+        parser.add_argument('--skip-legacy-above', type=int, default=None,
+                            help='Skip the legacy builder for sizes above this (it is slow)')
+
+    def handle(self, *args, **options):
+        report_date = date(2025, 3, 7)
+        constants = {'dams_utilization': 80.0, 'capable_utilization': 85.0, 'total_capacity': 4000.0}
+
+        self.stdout.write(f"{'rows':>8}  {'legacy rows/s':>14}  {'columnar rows/s':>16}  {'speedup':>8}")
+        for size in options['rows']:
+            merged, wtd = synthetic_report(size)
+
+            started = time.perf_counter()
+            _, rows = build_report_records(merged, wtd, report_date, constants)
+            columnar_rate = len(rows) / (time.perf_counter() - started)
+
+            skip_above = options['skip_legacy_above']
+            if skip_above is not None and size > skip_above:
+                self.stdout.write(f"{size:>8}  {'-':>14}  {columnar_rate:>16,.0f}  {'-':>8}")
+                continue
+            started = time.perf_counter()
+            records = legacy_records(merged, wtd, report_date, constants)
+            legacy_rate = len(records) / (time.perf_counter() - started)
+
+            self.stdout.write(
+                f"{size:>8}  {legacy_rate:>14,.0f}  {columnar_rate:>16,.0f}  {columnar_rate / legacy_rate:>7.1f}x"
+            )
@@ -0,0 +1,58 @@
+"""
+Export the report rows of a range of weeks to a file.
+
+Usage:
+    python manage.py export_utilization --start 2025-01-03 --end 2025-03-28 --format xlsx --output q1.xlsx
+    python manage.py export_utilization --start 2025-01-03 --end 2025-03-28 --format parquet --rdm Adam --output q1_adam.parquet
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from util_report.range_export import EXPORT_FORMATS, export_chunks, range_queryset
+
+
+class Command(BaseCommand):
+    help = 'Write every report row between two dates to a csv, parquet or xlsx file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', required=True, help='First report date (YYYY-MM-DD)')
+        parser.add_argument('--end', required=True, help='Last report date, inclusive (YYYY-MM-DD)')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='xlsx',
+                            help='xlsx writes one sheet per week (default: xlsx)')
+        parser.add_argument('--output', help='File to write (default: utilization_<start>_<end>.<format>)')
+        parser.add_argument('--rdm', help='Only rows of this RDM')
+        parser.add_argument('--track', help='Only rows of this track')
+        parser.add_argument('--billing', help='Only rows with this billing type')
+
+    def handle(self, *args, **options):
+        start = parse_date(options['start'])
+        end = parse_date(options['end'])
+        if not start or not end or start > end:
+            raise CommandError("--start and --end must be dates in YYYY-MM-DD order")
+
+        export_format = options['format']
+        output = options['output'] or f"utilization_{start}_{end}.{export_format}"
+        queryset = range_queryset(start, end, {name: options[name] for name in ('rdm', 'track', 'billing')})
+        rows = queryset.count()
+        if not rows:
+            raise CommandError(f"No report rows between {start} and {end}")
+
+        started = time.perf_counter()
+        try:
+            with open(output, 'wb') as f:
+                for chunk in export_chunks(export_format, queryset):
+                    f.write(chunk)
+        except Exception as e:
+            if os.path.exists(output):
+                os.remove(output)
+            raise CommandError(f"Export failed: {e}")
+
+        weeks = queryset.order_by().values('date').distinct().count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {rows} rows over {weeks} weeks to {output} "
+            f"({os.path.getsize(output)} bytes, {time.perf_counter() - started:.2f}s)"
+        ))
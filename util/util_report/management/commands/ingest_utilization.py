@@ -0,0 +1,85 @@
+"""
+Ingest utilization workbooks from the command line, e.g. from cron on a batch node.
+
+Usage:
+    python manage.py ingest_utilization /data/psrs/util_7Mar2025.xlsx /data/psrs/util_14Mar2025.xlsx
+    python manage.py ingest_utilization /data/psrs/*.xlsb --workers 4 --replace --profile
+    python manage.py ingest_utilization /data/psrs/util_7Mar2025.xlsx --dry-run
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from util_report.batch import date_workbooks, ingest_workbooks
+
+
+class Command(BaseCommand):
+    help = 'Parse and save utilization workbooks, printing rows and timings per workbook'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Workbook files (the report date is read from each name)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Processes used to parse workbooks in parallel (default: BATCH_INGEST_WORKERS)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Parse and validate only; nothing is written')
+        parser.add_argument('--replace', action='store_true',
+                            help='Replace weeks that are already loaded instead of skipping them')
+        parser.add_argument('--profile', action='store_true',
+                            help='Also print the peak memory of every pipeline stage '
+                                 '(turns on tracemalloc, which slows parsing)')
+
+    def handle(self, *args, **options):
+        missing = [path for path in options['paths'] if not os.path.isfile(path)]
+        if missing:
+            raise CommandError(f"Not found: {', '.join(missing)}")
+
+        started = time.perf_counter()
+        try:
+            workbooks = date_workbooks([os.path.abspath(path) for path in options['paths']])
+            results = ingest_workbooks(
+                workbooks,
+                replace_existing=options['replace'],
+                workers=options['workers'],
+                dry_run=options['dry_run'],
+                source='command',
+                trace_memory=options['profile'] or None,
+            )
+        except Exception as e:
+            raise CommandError(f"Ingestion failed: {e}")
+
+        total_written = 0
+        for file_date, generator, rows_written in results:
+            name = os.path.basename(dict(workbooks)[file_date])
+            if generator is None:
+                self.stdout.write(f"{file_date}  {name}: already loaded, skipped (use --replace)")
+                continue
+            self.write_summary(file_date, name, generator, rows_written, options['profile'])
+            total_written += rows_written or 0
+
+        elapsed = time.perf_counter() - started
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"Dry run: parsed {len(results)} workbooks in {elapsed:.2f}s"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Wrote {total_written} rows in {elapsed:.2f}s"))
+
+    def write_summary(self, file_date, name, generator, rows_written, profile):
+        self.stdout.write(f"{file_date}  {name}{'  (parse cache hit)' if generator.cache_hit else ''}")
+        for sheet, counts in generator.row_counts.items():
+            self.stdout.write(f"  {sheet:<20} rows read {counts.get('read', 0):>8}   kept {counts.get('kept', 0):>8}")
+        if generator.initial_report is not None:
+            self.stdout.write(f"  {'report rows':<20} {len(generator.initial_report):>17}")
+        if rows_written is not None:
+            self.stdout.write(f"  {'rows written':<20} {rows_written:>17}")
+
+        # Stage timings on every run; peak memory only when traced with --profile
+        header = f"  {'stage':<28} {'wall':>9} {'cpu':>9}"
+        self.stdout.write(header + (f" {'peak MB':>9}" if profile else '') + f" {'rows':>8}")
+        for stage in generator.profiler.stages:
+            line = f"  {stage['name']:<28} {stage['wall_seconds']:>8.3f}s {stage['cpu_seconds']:>8.3f}s"
+            if profile:
+                peak = f"{stage['peak_bytes'] / 1048576:.1f}" if 'peak_bytes' in stage else '-'
+                line += f" {peak:>9}"
+            self.stdout.write(f"{line} {stage.get('rows', 0):>8}")
+        self.stdout.write(f"  {'total':<28} {sum(generator.stage_timings.values()):>8.3f}s")
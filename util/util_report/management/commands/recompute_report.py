@@ -0,0 +1,43 @@
+"""
+Re-derive last week, total logged, additional days and status of saved report rows.
+
+Usage:
+    python manage.py recompute_report --start 2025-03-07
+    python manage.py recompute_report --start 2025-03-07 --end 2025-03-28
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from util_report.models import UtilizationReportModel
+from util_report.recompute import recompute_date
+
+
+class Command(BaseCommand):
+    help = 'Recompute the derived fields of every report row of a date or range of dates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', required=True, help='First report date (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last report date, inclusive (default: --start)')
+
+    def handle(self, *args, **options):
+        start = parse_date(options['start'])
+        end = parse_date(options['end']) if options['end'] else start
+        if not start or not end or start > end:
+            raise CommandError("--start and --end must be dates in YYYY-MM-DD order")
+
+        dates = list(
+            UtilizationReportModel.objects.filter(date__range=(start, end))
+            .order_by('date').values_list('date', flat=True).distinct()
+        )
+        if not dates:
+            raise CommandError(f"No report rows between {start} and {end}")
+
+        # Oldest first: each week reads the additional days of the one before
+        for report_date in dates:
+            started = time.perf_counter()
+            changed = recompute_date(report_date)
+            self.stdout.write(f"{report_date}: {changed} rows changed ({time.perf_counter() - started:.2f}s)")
+        self.stdout.write(self.style.SUCCESS(f"Recomputed {len(dates)} dates"))
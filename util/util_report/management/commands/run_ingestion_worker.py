@@ -0,0 +1,100 @@
+"""
+Run ingestion workers that drain the IngestionJobModel queue.
+
+Usage:
+    python manage.py run_ingestion_worker --processes 2
+"""
+
+import logging
+import multiprocessing
+import signal
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from util_report.jobs import claim_next_job, remove_stale_uploads, requeue_stale_jobs, run_ingestion_job
+
+logger = logging.getLogger(__name__)
+
+# Seconds between sweeps for uploads of failed and unconfirmed jobs
+UPLOAD_CLEANUP_INTERVAL = 60 * 60
+
+
+def worker_loop(poll_interval, stale_after, once):
+    """Claim and run jobs until stopped (or until the queue is empty with once=True)."""
+    # Never reuse a connection inherited from the parent process
+    connections.close_all()
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    last_cleanup = None
+
+    while not stopping:
+        try:
+            requeue_stale_jobs(stale_after)
+            if last_cleanup is None or time.monotonic() - last_cleanup > UPLOAD_CLEANUP_INTERVAL:
+                remove_stale_uploads()
+                last_cleanup = time.monotonic()
+            job = claim_next_job()
+        except Exception as e:
+            # A transient database error must not take the worker down
+            logger.error(f"Error polling ingestion queue: {e}")
+            connections.close_all()
+            time.sleep(poll_interval)
+            continue
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_ingestion_job(job)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run worker processes that ingest queued utilization workbooks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2,
+                            help='Number of worker processes (default: 2)')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to wait between polls when the queue is empty')
+        parser.add_argument('--stale-after', type=int, default=600,
+                            help='Seconds without a heartbeat before a running job is requeued')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of polling forever')
+
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+        loop_args = (options['poll_interval'], timedelta(seconds=options['stale_after']), options['once'])
+
+        if processes == 1:
+            self.stdout.write('Ingestion worker started')
+            worker_loop(*loop_args)
+            return
+
+        # Children must not share the parent's database connection
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=worker_loop, args=loop_args, name=f'ingestion-worker-{i}')
+            for i in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f'Started {processes} ingestion workers')
+
+        def stop(*_):
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            stop()
+            for worker in workers:
+                worker.join()
+        self.stdout.write('Ingestion workers stopped')
@@ -0,0 +1,41 @@
+from django.db import models
+
+
+class IngestionJobModel(models.Model):
+    """Workbook ingestion queued by an upload and run by the run_ingestion_worker command."""
+    STATUSES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+        ('needs_confirmation', 'Needs confirmation'),  # The date was already loaded; the upload is kept
+    )
+    KINDS = (
+        ('workbook', 'Single workbook'),
+        ('batch', 'Batch of weekly workbooks'),  # A zip or a server-side folder
+    )
+
+    kind = models.CharField(max_length=20, choices=KINDS, default='workbook')
+    status = models.CharField(max_length=20, choices=STATUSES, default='queued')
+    stage = models.CharField(max_length=50, default='queued')
+    progress = models.PositiveSmallIntegerField(default=0)  # 0-100
+    file_path = models.CharField(max_length=500)
+    report_date = models.DateField(null=True, blank=True)
+    replace_existing = models.BooleanField(default=False)  # Replace rows already saved for report_date
+    rows_written = models.IntegerField(default=0)
+    result_token = models.CharField(max_length=64, null=True, blank=True)  # Final report in the result store
+    message = models.TextField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)  # Last sign of life from the worker
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Job {self.pk} - {self.status} - {self.report_date}"
+
+    class Meta:
+        db_table = 'ingestion_job'
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'created_at'])]
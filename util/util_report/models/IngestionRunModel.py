@@ -0,0 +1,34 @@
+from django.db import models
+
+
+class IngestionRunModel(models.Model):
+    """Per-stage timings, memory and row counts of one workbook ingestion (see profiling.py)."""
+    SOURCES = (
+        ('upload', 'Upload'),
+        ('batch', 'Batch'),
+        ('command', 'Command line'),
+    )
+    STATUSES = (
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    )
+
+    source = models.CharField(max_length=20, choices=SOURCES, default='upload')
+    status = models.CharField(max_length=20, choices=STATUSES, default='succeeded')
+    file_name = models.CharField(max_length=255)
+    report_date = models.DateField(null=True, blank=True)
+    cache_hit = models.BooleanField(default=False)  # Workbook frames came from the parse cache
+    traced_memory = models.BooleanField(default=False)  # Stages carry tracemalloc peaks
+    rows_written = models.IntegerField(default=0)
+    total_seconds = models.FloatField(default=0)
+    # [{'name', 'wall_seconds', 'cpu_seconds', 'peak_bytes', 'rows'}, ...] in run order
+    stages = models.JSONField(default=list)
+    message = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Run {self.pk} - {self.file_name} - {self.status}"
+
+    class Meta:
+        db_table = 'ingestion_run'
+        ordering = ['-created_at']
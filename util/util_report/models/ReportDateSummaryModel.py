@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class ReportDateSummaryModel(models.Model):
+    """
+    Header figures of one report date, rebuilt by summaries.refresh_date_summary()
+    and adjusted in place by summaries.adjust_date_summary() after edits.
+    """
+    date = models.DateField(unique=True)
+    dams_utilization = models.FloatField(default=0)
+    capable_utilization = models.FloatField(default=0)  # Derived from the three figures below
+    total_capacity = models.FloatField(default=0)
+    total_additional_days = models.FloatField(default=0)
+    individual_utilization = models.FloatField(default=0)  # Average over the date's resources
+    resource_count = models.IntegerField(default=0)
+    open_count = models.IntegerField(default=0)
+    handled_count = models.IntegerField(default=0)  # Closed with a [Closed: ...] comment
+    rdms = models.JSONField(default=list)  # Distinct non-empty values, sorted
+    tracks = models.JSONField(default=list)
+    rdm_summary_dirty = models.BooleanField(default=True)  # Set on every refresh, cleared once the RDM rows are rebuilt
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.date} - {self.resource_count} resources"
+
+    class Meta:
+        db_table = 'report_date_summary'
+        ordering = ['-date']
@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class ReportRdmSummaryModel(models.Model):
+    """Totals of one RDM's resources on one report date, rebuilt by summaries.refresh_rdm_summaries()."""
+    date = models.DateField()
+    rdm = models.CharField(max_length=255)  # 'Unassigned' for resources without an RDM
+    resource_count = models.IntegerField(default=0)
+    billable_hours = models.FloatField(default=0)
+    wtd_actuals = models.FloatField(default=0)
+    addtnl_days = models.FloatField(default=0)
+    total_capacity = models.FloatField(default=0)  # Sum of wtd_capacity
+    total_billed = models.FloatField(default=0)
+    dams_utilization = models.FloatField(default=0)
+    capable_utilization = models.FloatField(default=0)
+    partial_count = models.IntegerField(default=0)
+    billing_count = models.IntegerField(default=0)
+    next_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.date} - {self.rdm}"
+
+    class Meta:
+        db_table = 'report_rdm_summary'
+        unique_together = ('date', 'rdm')
+        ordering = ['date', 'rdm']
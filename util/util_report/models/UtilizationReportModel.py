@@ -1,7 +1,8 @@
 from django.db import models
 
 
-class UtilizationReportModel(models.Model):
+class UtilizationReportFields(models.Model):
+    """Columns shared by the live report table and its staging table."""
     resource_email_address = models.CharField(max_length=255)
     administrative = models.FloatField(default=0)
     billable_hours = models.FloatField(default=0)
@@ -33,6 +34,11 @@ class UtilizationReportModel(models.Model):
     rdm_dams_utilization = models.FloatField(default=0)
     rdm_capable_utilization = models.FloatField(default=0)
 
+    class Meta:
+        abstract = True
+
+
+class UtilizationReportModel(UtilizationReportFields):
 
     def __str__(self):
         return f"{self.resource_email_address} - {self.date}"
@@ -41,3 +47,18 @@ class UtilizationReportModel(models.Model):
         managed = True
         db_table = 'utilization_report'
         unique_together = ('resource_email_address', 'date')
+        # Date-first so one date's rows can be paged in email order (report_rows)
+        indexes = [models.Index(fields=['date', 'resource_email_address'], name='util_report_date_email_idx')]
+
+
+class UtilizationReportStagingModel(UtilizationReportFields):
+    """Rows loaded for a date ahead of being swapped into utilization_report in one transaction."""
+    load_id = models.CharField(max_length=32, db_index=True)
+    staged_at = models.DateTimeField(null=True, blank=True)  # When the load started; old loads are leftovers
+
+    def __str__(self):
+        return f"{self.load_id} - {self.resource_email_address} - {self.date}"
+
+    class Meta:
+        managed = True
+        db_table = 'utilization_report_staging'
@@ -1,11 +1,20 @@
 from .ResourceDetailsFetch import ResourceDetailsFetch
 from .ExclusionTableModel import ExclusionTableModel
-from .UtilizationReportModel import UtilizationReportModel
+from .UtilizationReportModel import UtilizationReportModel, UtilizationReportStagingModel
 from .UtilizationHistoryModel import UtilizationHistoryModel
+from .IngestionJobModel import IngestionJobModel
+from .IngestionRunModel import IngestionRunModel
+from .ReportDateSummaryModel import ReportDateSummaryModel
+from .ReportRdmSummaryModel import ReportRdmSummaryModel
 
 __all__ = [
     'ResourceDetailsFetch',
     'ExclusionTableModel',
     'UtilizationReportModel',
+    'UtilizationReportStagingModel',
     'UtilizationHistoryModel',
+    'IngestionJobModel',
+    'IngestionRunModel',
+    'ReportDateSummaryModel',
+    'ReportRdmSummaryModel',
 ] 
\ No newline at end of file
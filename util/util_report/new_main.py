@@ -9,22 +9,54 @@ from datetime import datetime, timedelta
 import re
 import io
 import logging
+import time
 
 import pandas as pd
+from django.db import transaction
 from django.utils.dateparse import parse_date
 
 from .models import ResourceDetailsFetch, ExclusionTableModel, UtilizationReportModel
+from .parse_cache import parse_cache
+from .profiling import StageProfiler
+from .summaries import report_dates_changed
+from .records import build_report_records, insert_rows
+from . import rules
+from .staging import replace_date_rows
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Cost center whose rows make up the report; every other row is dropped on read
+TARGET_COST_CENTER = '504686'
+
+# Engines whose row iterators can be consumed lazily by the streaming reader
+STREAMING_ENGINES = {'openpyxl', 'pyxlsb'}
+
+# How many leading rows to scan for a sheet's header
+HEADER_SCAN_ROWS = 20
+
 
 class UtilizationReportGenerator:
     """Processes Excel files to generate utilization reports."""
 
-    def __init__(self, file_path):
-        """Initialize the report generator with a file path."""
+    def __init__(self, file_path, streaming=True, use_cache=True, stage_callback=None, profiler=None):
+        """
+        Initialize the report generator with a file path.
+
+        With streaming enabled, .xlsx/.xlsm/.xlsb workbooks are read row by row and
+        filtered to TARGET_COST_CENTER as they are read; .xls always goes through pandas.
+        With use_cache enabled, parsed frames are looked up in / stored to the parse cache.
+        stage_callback, if given, is called with each stage name before the stage runs.
+        profiler measures each stage; a default StageProfiler is used when omitted.
+        """
         self.file_path = file_path
+        self.stage_callback = stage_callback
+        self.profiler = profiler or StageProfiler()
+        self.streaming = streaming
+        self.use_cache = use_cache
+        self.cache_key = None
+        self.cache_hit = False
+        self.workbook_bytes = None
         self.parsed_date = None
         self.prev_week_date = None
         self.file_date = None
@@ -41,6 +73,8 @@ class UtilizationReportGenerator:
         self.merged_report = None
         self.final_report = None
         self.exclusion_set = None
+        self.swap_seconds = None
+        self.row_counts = {}  # Sheet -> {'read': rows scanned, 'kept': rows in TARGET_COST_CENTER}
 
     def parse_date_from_filename(self):
         """Extract and parse date information from the filename."""
@@ -54,9 +88,9 @@ class UtilizationReportGenerator:
 
         self.file_date = self.parsed_date.strftime('%Y-%m-%d')
         self.prev_week_date = self.parsed_date - timedelta(days=7)
-        self.week_number = (self.parsed_date.day - 1) // 7 + 1
+        self.week_number = rules.week_number(self.parsed_date)
         self.month_name = self.parsed_date.strftime('%B')
-        self.total_days = self.week_number * 5
+        self.total_days = rules.week_days(self.parsed_date)
 
         return self.parsed_date, self.prev_week_date, self.file_date, self.month_name, self.week_number, self.total_days
 
@@ -76,6 +110,11 @@ class UtilizationReportGenerator:
             with open(self.file_path, 'rb') as f:
                 file_bytes = io.BytesIO(f.read())
 
+            # The streaming reader opens the workbook itself, one sheet at a time
+            if self.use_streaming_reader:
+                self.workbook_bytes = file_bytes
+                return self.xls, self.engine
+
             # Read the Excel file from memory
             self.xls = pd.ExcelFile(file_bytes, engine=self.engine)
             return self.xls, self.engine
@@ -83,6 +122,91 @@ class UtilizationReportGenerator:
             logger.error(f"Error reading Excel file {self.file_path}: {e}")
             raise ValueError(f"Could not read Excel file: {str(e)}")
 
+    @property
+    def use_streaming_reader(self):
+        """True when the workbook should be read with the streaming row iterators."""
+        return self.streaming and self.engine in STREAMING_ENGINES
+
+    def iter_sheet_rows(self, sheet_name):
+        """Lazily yield each row of a sheet as a tuple of cell values."""
+        self.workbook_bytes.seek(0)
+        if self.engine == 'pyxlsb':
+            from pyxlsb import open_workbook
+
+            with open_workbook(self.workbook_bytes) as wb:
+                with wb.get_sheet(sheet_name) as sheet:
+                    for row in sheet.rows():
+                        yield tuple(cell.v for cell in row)
+            return
+
+        from openpyxl import load_workbook
+
+        wb = load_workbook(self.workbook_bytes, read_only=True, data_only=True)
+        try:
+            if sheet_name not in wb.sheetnames:
+                raise ValueError(f"Worksheet named '{sheet_name}' not found")
+            sheet = wb[sheet_name]
+            # Exported workbooks often carry stale dimensions; read every row that exists
+            sheet.reset_dimensions()
+            yield from sheet.iter_rows(values_only=True)
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _normalize_cell(value):
+        """Convert a raw cell value the way pandas' Excel readers do (5.0 -> 5)."""
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+
+    def stream_sheet(self, sheet_name, target_column, columns, cc_column, dtype=None):
+        """
+        Read a sheet lazily: locate the header row containing target_column, keep only
+        the requested columns and only rows whose cost center is TARGET_COST_CENTER.
+        """
+        rows = self.iter_sheet_rows(sheet_name)
+        try:
+            header = None
+            for idx, row in enumerate(rows):
+                if idx >= HEADER_SCAN_ROWS:
+                    break
+                if target_column in row:
+                    header = [str(value).strip() if value is not None else '' for value in row]
+                    break
+            if header is None:
+                raise ValueError(f"Header containing '{target_column}' not found in {sheet_name}.")
+
+            missing = [col for col in columns if col not in header]
+            if missing:
+                raise ValueError(f"Columns {missing} not found in {sheet_name}.")
+
+            # Keep the sheet's column order, matching pd.read_excel(usecols=...)
+            projection = sorted((header.index(col), col) for col in columns)
+            positions = [pos for pos, _ in projection]
+            cc_position = header.index(cc_column)
+
+            kept = []
+            rows_read = 0
+            for row in rows:
+                rows_read += 1
+                cc_value = self._normalize_cell(row[cc_position]) if cc_position < len(row) else None
+                if cc_value is None or str(cc_value).strip() != TARGET_COST_CENTER:
+                    continue
+                kept.append([self._normalize_cell(row[pos]) if pos < len(row) else None for pos in positions])
+
+            self.row_counts[sheet_name] = {'read': rows_read, 'kept': len(kept)}
+            df = pd.DataFrame(kept, columns=[col for _, col in projection])
+            df[cc_column] = TARGET_COST_CENTER
+            if dtype:
+                df = df.astype(dtype)
+            logger.info(f"Streamed {sheet_name}: kept {len(kept)} of {rows_read} rows")
+            return df
+        except Exception as e:
+            logger.error(f"Error streaming sheet {sheet_name}: {e}")
+            raise
+        finally:
+            rows.close()
+
     def find_header_row(self, sheet_name, target_column):
         """Find the header row in a specific sheet."""
         try:
@@ -115,13 +239,67 @@ class UtilizationReportGenerator:
 
     def create_dataframes(self):
         """Create and filter dataframes from the Excel sheets."""
+        try:
+            if self.use_streaming_reader:
+                # Header lookup, column projection and cost-center filter happen while reading
+                self.dfs = {
+                    'WTD': self.stream_sheet(
+                        'WTD', 'Consultant Name',
+                        self.sheet_column_mapping['WTD']['columns'],
+                        self.sheet_column_mapping['WTD']['cc_column'],
+                        dtype={'WTD Capacity': 'float32', 'Billable Hours': 'float32', 'Utl %': 'float32'}
+                    ),
+                    'MTD': self.stream_sheet(
+                        'Consultant Summary', 'Resource Email Address',
+                        self.sheet_column_mapping['MTD']['base_columns'],
+                        self.sheet_column_mapping['MTD']['cc_column'],
+                        dtype={self.month_name: 'float32'}
+                    ),
+                }
+            else:
+                self.dfs = self.read_sheets()
+                self.row_counts = {
+                    'WTD': {'read': len(self.dfs['WTD'])},
+                    'Consultant Summary': {'read': len(self.dfs['MTD'])},
+                }
+
+            # Apply filter after reading (using vectorized operations for better performance)
+            cc_column = self.sheet_column_mapping['WTD']['cc_column']
+            self.dfs['WTD'] = self.dfs['WTD'][self.dfs['WTD'][cc_column] == TARGET_COST_CENTER]
+            self.row_counts['WTD']['kept'] = len(self.dfs['WTD'])
+            
+            # Calculate individual utilization using vectorized operations
+            self.dfs['WTD']['Individual Utilization'] = (self.dfs['WTD']['Billable Hours'] / self.dfs['WTD']['WTD Capacity'] * 100).round(2)
+
+            # Apply filter after reading (using vectorized operations for better performance)
+            cc_column = self.sheet_column_mapping['MTD']['cc_column']
+            self.dfs['MTD'] = self.dfs['MTD'][self.dfs['MTD'][cc_column] == TARGET_COST_CENTER]
+            self.row_counts['Consultant Summary']['kept'] = len(self.dfs['MTD'])
+
+            # Calculate derived fields using vectorized operations
+            self.dfs['WTD']['WTD Actuals'] = self.dfs['WTD']['Billable Hours'] / 8
+            self.dfs['WTD']['Utl %'] = self.dfs['WTD']['Utl %'] * 100
+            
+            # Remove rows with NaN values in month column
+            self.dfs['MTD'] = self.dfs['MTD'].dropna(subset=[self.month_name])
+            
+            # Calculate days
+            self.dfs['MTD']['Days'] = self.dfs['MTD'][self.month_name] / 8
+            
+            return self.dfs
+        except Exception as e:
+            logger.error(f"Error creating dataframes: {e}")
+            raise
+
+    def read_sheets(self):
+        """Read the WTD and Consultant Summary sheets in full through pandas."""
         try:
             wtd_header_row = self.find_header_row('WTD', 'Consultant Name')
             mtd_header_row = self.find_header_row('Consultant Summary', 'Resource Email Address')
 
             # Only read the specific columns we need - optimization
             # For WTD sheet, only read the rows we need (more efficient)
-            self.dfs = {
+            dfs = {
                 'WTD': pd.read_excel(
                     self.xls, 
                     sheet_name='WTD',
@@ -138,15 +316,8 @@ class UtilizationReportGenerator:
                 )
             }
             
-            # Apply filter after reading (using vectorized operations for better performance)
-            cc_column = self.sheet_column_mapping['WTD']['cc_column']
-            self.dfs['WTD'] = self.dfs['WTD'][self.dfs['WTD'][cc_column] == '504686']
-            
-            # Calculate individual utilization using vectorized operations
-            self.dfs['WTD']['Individual Utilization'] = (self.dfs['WTD']['Billable Hours'] / self.dfs['WTD']['WTD Capacity'] * 100).round(2)
-            
             # Read MTD data with optimized dtypes
-            self.dfs['MTD'] = pd.read_excel(
+            dfs['MTD'] = pd.read_excel(
                 self.xls, 
                 sheet_name='Consultant Summary',
                 usecols=self.sheet_column_mapping['MTD']['base_columns'],
@@ -157,23 +328,9 @@ class UtilizationReportGenerator:
                 converters={self.sheet_column_mapping['MTD']['cc_column']: lambda x: str(x).strip()}
             )
             
-            # Apply filter after reading (using vectorized operations for better performance)
-            cc_column = self.sheet_column_mapping['MTD']['cc_column']
-            self.dfs['MTD'] = self.dfs['MTD'][self.dfs['MTD'][cc_column] == '504686']
-
-            # Calculate derived fields using vectorized operations
-            self.dfs['WTD']['WTD Actuals'] = self.dfs['WTD']['Billable Hours'] / 8
-            self.dfs['WTD']['Utl %'] = self.dfs['WTD']['Utl %'] * 100
-            
-            # Remove rows with NaN values in month column
-            self.dfs['MTD'] = self.dfs['MTD'].dropna(subset=[self.month_name])
-            
-            # Calculate days
-            self.dfs['MTD']['Days'] = self.dfs['MTD'][self.month_name] / 8
-            
-            return self.dfs
+            return dfs
         except Exception as e:
-            logger.error(f"Error creating dataframes: {e}")
+            logger.error(f"Error reading sheets: {e}")
             raise
 
     def process_report(self):
@@ -182,14 +339,20 @@ class UtilizationReportGenerator:
             # Parse date information
             self.parse_date_from_filename()
 
-            # Read Excel file
-            self.read_excel_file()
-
             # Initialize column mapping
             self.initialize_column_mapping()
 
-            # Create dataframes
-            self.create_dataframes()
+            # A previous upload of the same bytes with the same config skips Excel entirely
+            if not self.load_cached_dataframes():
+                started = time.perf_counter()
+
+                # Read Excel file
+                self.read_excel_file()
+
+                # Create dataframes
+                self.create_dataframes()
+
+                self.store_cached_dataframes(time.perf_counter() - started)
 
             return {
                 'file_date': self.file_date,
@@ -201,6 +364,37 @@ class UtilizationReportGenerator:
             logger.error(f"Error processing report: {e}")
             raise
 
+    def parse_cache_config(self):
+        """Everything besides the workbook bytes that determines the parsed frames."""
+        return {
+            'column_mapping': self.sheet_column_mapping,
+            'cost_center': TARGET_COST_CENTER,
+        }
+
+    def load_cached_dataframes(self):
+        """Populate self.dfs from the parse cache; returns True on a hit."""
+        if not (self.use_cache and parse_cache.enabled):
+            return False
+        try:
+            self.cache_key = parse_cache.make_key(self.file_path, self.parse_cache_config())
+            cached = parse_cache.get(self.cache_key, with_meta=True)
+        except Exception as e:
+            logger.warning(f"Parse cache lookup failed, parsing workbook: {e}")
+            return False
+        if cached is None:
+            return False
+        self.dfs, extra = cached
+        self.row_counts = extra.get('row_counts', {})
+        self.cache_hit = True
+        return True
+
+    def store_cached_dataframes(self, parse_seconds):
+        """Save freshly parsed frames so the next upload of this file can skip parsing."""
+        if self.cache_key and self.use_cache and parse_cache.enabled:
+            parse_cache.put(
+                self.cache_key, self.dfs, parse_seconds=parse_seconds, extra={'row_counts': self.row_counts}
+            )
+
     def calculate_dams_utilization(self):
         """Calculate the DAMS utilization percentage."""
         try:
@@ -326,10 +520,8 @@ class UtilizationReportGenerator:
                 self.merged_report['Vacation'] = 0
                 
             # Calculate Total Logged with properly converted numeric values
-            self.merged_report['Total Logged'] = (
-                pd.to_numeric(self.merged_report[billable_hours_col], errors='coerce').fillna(0) +
-                pd.to_numeric(self.merged_report['Vacation'], errors='coerce').fillna(0) +
-                self.merged_report['Last Week']
+            self.merged_report['Total Logged'] = rules.total_logged(
+                self.merged_report[billable_hours_col], self.merged_report['Vacation'], self.merged_report['Last Week']
             )
 
             logger.info("Billing types in report:")
@@ -347,53 +539,24 @@ class UtilizationReportGenerator:
             raise
 
     def _compute_additional_days(self):
-        """Calculate additional days based on billing type and shortfall using vectorized operations."""
+        """Calculate additional days based on billing type and shortfall (see rules.additional_days())."""
         try:
-            # Create a default series of zeros
-            add_days = pd.Series(0, index=self.merged_report.index)
-
-            # Handle Billing column - create if missing
+            # Handle Billing column - create if missing, then clean blank values to TBD
             if 'Billing' not in self.merged_report.columns:
-                self.merged_report['Billing'] = 'TBD'
-            
-            # Sanitize billing values - explicitly clean the column
-            self.merged_report['Billing'] = self.merged_report['Billing'].fillna('TBD')
-            
-            # Convert to string and clean up values
-            if hasattr(self.merged_report['Billing'], 'str'):
-                self.merged_report['Billing'] = (self.merged_report['Billing']
-                    .str.strip()
-                    .replace({'None': 'TBD', '': 'TBD', None: 'TBD', pd.NA: 'TBD'})
-                )
-            
-            # Ensure Total Logged is numeric
-            total_logged = pd.to_numeric(self.merged_report['Total Logged'], errors='coerce').fillna(0)
-            
+                self.merged_report['Billing'] = rules.DEFAULT_BILLING
+            self.merged_report['Billing'] = rules.clean_billing(self.merged_report['Billing'])
+
             # Get exclusion list if not already fetched
             if not hasattr(self, 'exclusion_set') or self.exclusion_set is None:
                 self.get_exclusion_list()
-            
-            # Create masks for different billing types and exclusions
-            exclusion_mask = self.merged_report['Resource Email Address'].isin(self.exclusion_set)
-            billing_mask = (self.merged_report['Billing'] == 'Billing') & (~exclusion_mask)
-            partial_mask = (self.merged_report['Billing'] == 'Partial') & (~exclusion_mask)
-
-            # Calculate shortfall for 'Billing' type using vectorized operations
-            if billing_mask.any():
-                shortfall = self.total_days - total_logged.loc[billing_mask]
-                # Explicitly cast to int64 to avoid dtype compatibility warning
-                add_days.loc[billing_mask] = shortfall.clip(lower=0).astype('int64')
-
-            # Calculate shortfall for 'Partial' type using vectorized operations
-            if partial_mask.any():
-                partial_days = self.total_days / 2
-                shortfall_partial = partial_days - total_logged.loc[partial_mask]
-                # Explicitly cast to int64 to avoid dtype compatibility warning
-                add_days.loc[partial_mask] = shortfall_partial.clip(lower=0).astype('int64')
-
-            # Final check to replace any NaNs with 0
-            add_days = add_days.fillna(0)
-            return add_days
+
+            add_days = rules.additional_days(
+                self.merged_report['Billing'],
+                self.merged_report['Total Logged'],
+                self.total_days,
+                rules.excluded(self.merged_report['Resource Email Address'], self.exclusion_set),
+            )
+            return pd.Series(add_days, index=self.merged_report.index)
         except Exception as e:
             logger.error(f"Error computing additional days: {e}", exc_info=True)
             return pd.Series(0, index=self.merged_report.index)
@@ -465,46 +628,35 @@ class UtilizationReportGenerator:
                         self.merged_report[col] = default
             raise
 
-    def determine_status(self, row):
-        """Determine the status based on billing type and hours logged."""
-        try:
-            # Helper function to safely get numeric values
-            def safe_float(value, default=0.0):
-                if pd.isna(value) or value is None or value == '':
-                    return default
-                try:
-                    return float(value)
-                except (ValueError, TypeError):
-                    return default
-            
-            # Safely get values with appropriate fallbacks
-            billing_type = str(row.get('Billing', row.get('billing', ''))).strip()
-            dept_mgmt = safe_float(row.get('Department Mgmt', row.get('department_mgmt', 0)))
-            admin = safe_float(row.get('Administrative', row.get('administrative', 0)))
-            billable_hours = safe_float(row.get('Billable Hours', row.get('billable_hours', 0)))
-            vacation = safe_float(row.get('Vacation', row.get('vacation', 0)))
-            total_logged = billable_hours + vacation
-
-            # Apply business rules to determine status
-            if billing_type == 'Billing':  # Full Billable
-                return 'close' if total_logged >= self.total_days else 'open'
-            if billing_type == 'Partial':
-                return 'close' if total_logged >= self.total_days / 2 else 'open'
-            if billing_type in {'Next', 'TBD'}:
-                return 'close' if total_logged >= self.total_days else 'open'
-            if billing_type in {'On Bench', 'Non Billable', 'Released'}:
-                return 'close'
-            
-            # Fallback/default
-            return 'open'
-        except Exception as e:
-            logger.error(f"Error determining status: {e}")
-            return 'open'  # Default to open if there's an error
+    def compute_status(self, frame=None, excluded=None):
+        """
+        Vectorized status for every row of frame (default: the merged report).
+
+        Applies the billing rules through rules.status(). When an excluded mask
+        is given, rows it marks are closed as filter_exclusions() does.
+        """
+        frame = self.merged_report if frame is None else frame
+
+        def column(name, fallback, default):
+            if name in frame.columns:
+                return frame[name]
+            if fallback in frame.columns:
+                return frame[fallback]
+            return pd.Series(default, index=frame.index)
+
+        statuses = rules.status(
+            column('Billing', 'billing', ''),
+            column('Billable Hours', 'billable_hours', 0.0),
+            column('Vacation', 'vacation', 0.0),
+            self.total_days,
+            excluded,
+        )
+        return pd.Series(statuses.tolist(), index=frame.index)
 
     def apply_status(self):
         """Apply status to each row in the final report."""
         try:
-            self.merged_report['Status'] = self.merged_report.apply(self.determine_status, axis=1)
+            self.merged_report['Status'] = self.compute_status()
             return self.merged_report
         except Exception as e:
             logger.error(f"Error applying status: {e}")
@@ -528,12 +680,12 @@ class UtilizationReportGenerator:
                 return self.merged_report
 
             # Create a mask for open statuses where email is in exclusion set
-            mask = (self.merged_report['Status'] == 'open') & (
-                self.merged_report['Resource Email Address'].isin(self.exclusion_set)
+            mask = (self.merged_report['Status'] == 'open') & rules.excluded(
+                self.merged_report['Resource Email Address'], self.exclusion_set
             )
             
             # Update Status to 'close' for the masked rows
-            if any(mask):
+            if mask.any():
                 self.merged_report.loc[mask, 'Status'] = 'close'
 
             return self.merged_report
@@ -541,30 +693,78 @@ class UtilizationReportGenerator:
             logger.error(f"Error filtering exclusions: {e}")
             return self.merged_report
 
+    def run_stage(self, name, func, *args, **kwargs):
+        """Run one pipeline stage, announcing it to stage_callback first and profiling it."""
+        if self.stage_callback:
+            self.stage_callback(name)
+        with self.profiler.measure(name) as record:
+            result = func(*args, **kwargs)
+            record['rows'] = self.stage_row_count(name, result)
+        return result
+
+    def stage_row_count(self, name, result):
+        """Rows a stage produced, for the profiler."""
+        if name == 'process_report':
+            return sum(len(df) for df in self.dfs.values()) if self.dfs else 0
+        if name == 'generate_report':
+            return len(self.initial_report) if self.initial_report is not None else 0
+        if name == 'get_exclusion_list':
+            return len(self.exclusion_set or ())
+        if name == 'save_to_model':
+            return result or 0
+        return len(self.merged_report) if self.merged_report is not None else 0
+
+    @property
+    def stage_timings(self):
+        """Stage name -> wall seconds for the stages run so far."""
+        return self.profiler.timings
+
     def generate_final_report(self):
         """Generate the full utilization report by running all processing steps."""
         try:
             logger.info("Starting report generation")
-            
-            self.process_report()
-            logger.info("Process report completed")
-            
-            self.generate_report()
-            logger.info("Generate report completed")
-            
-            self.merge_from_models()
+            self.prepare_report()
+            return self.complete_report()
+        except Exception as e:
+            logger.error(f"Error generating final report: {e}", exc_info=True)
+            raise
+
+    def prepare_report(self):
+        """
+        Parse the workbook and build the initial report. Nothing here reads the
+        database, so batches run this step for several weeks in parallel.
+        """
+        self.run_stage('process_report', self.process_report)
+        logger.info("Process report completed")
+
+        # The parsed frames are all later stages need; drop the in-memory workbook
+        # so a generator sent back from a batch parse worker doesn't carry it
+        self.xls = None
+        self.workbook_bytes = None
+
+        self.run_stage('generate_report', self.generate_report)
+        logger.info("Generate report completed")
+        return self.initial_report
+
+    def complete_report(self):
+        """
+        Run the stages that depend on saved data (resource details, last week's
+        additional days, exclusions) and build final_report.
+        """
+        try:
+            self.run_stage('merge_from_models', self.merge_from_models)
             logger.info("Merged from models completed")
             
-            self.add_additional_days_column()
+            self.run_stage('add_additional_days_column', self.add_additional_days_column)
             logger.info("Additional days column added")
             
-            self.apply_status()
+            self.run_stage('apply_status', self.apply_status)
             logger.info("Status applied")
             
-            self.get_exclusion_list()
+            self.run_stage('get_exclusion_list', self.get_exclusion_list)
             logger.info("Exclusion list retrieved")
             
-            self.filter_exclusions()
+            self.run_stage('filter_exclusions', self.filter_exclusions)
             logger.info("Exclusions filtered")
             
             # Create the final report
@@ -586,11 +786,21 @@ class UtilizationReportGenerator:
             logger.error(f"Error generating final report: {e}", exc_info=True)
             raise
 
-    def save_to_model(self):
-        """Save the final merged report to the Django model."""
+    @property
+    def is_generated(self):
+        """True once generate_final_report() has produced the state save_to_model() needs."""
+        return self.final_report is not None and self.dfs is not None
+
+    def save_to_model(self, replace=False):
+        """
+        Save the final merged report to the Django model; returns the number of rows written.
+
+        With replace, the rows are staged and swapped in for the date's existing rows in a
+        single transaction, so readers never see the date empty or half loaded.
+        """
         if self.merged_report is None or self.merged_report.empty:
             logger.error("Cannot save: merged_report is None or empty")
-            return
+            return 0
             
         # Calculate DAMS utilization before saving
         dams_utilization = self.calculate_dams_utilization()
@@ -598,119 +808,33 @@ class UtilizationReportGenerator:
         # Calculate capable utilization before saving
         capable_utilization = self.calculate_capable_utilization()
             
-        # Use bulk create for better performance
-        records_to_save = []
-        error_count = 0
-
-        # Replace NaN values with None in the DataFrame to avoid MySQL errors - optimize by only processing necessary columns
-        for column in self.merged_report.columns:
-            if pd.api.types.is_numeric_dtype(self.merged_report[column]):
-                # Use more efficient nan replacement
-                self.merged_report[column] = self.merged_report[column].replace({pd.NA: None, float('nan'): None})
-            elif pd.api.types.is_string_dtype(self.merged_report[column]):
-                # Use more efficient fillna
-                self.merged_report[column] = self.merged_report[column].fillna('')
-
-        # Define safe_float helper function outside the loop for better performance
-        def safe_float(value, default=0.0):
-            if pd.isna(value) or value is None:
-                return default
-            try:
-                return float(value)
-            except (ValueError, TypeError):
-                return default
-                
-        # Prepare batch insertion
-        # Create more efficient model creation by pre-processing common fields
         file_date_parsed = parse_date(self.file_date)
-        
-        # Get individual utilization from WTD dataframe
-        individual_util_map = dict(zip(
-            self.dfs['WTD']['Consultant Name'],
-            self.dfs['WTD']['Individual Utilization']
-        ))
-        
-        # Get WTD Capacity from WTD dataframe
-        wtd_capacity_map = dict(zip(
-            self.dfs['WTD']['Consultant Name'],
-            self.dfs['WTD']['WTD Capacity']
-        ))
-        
-        # Get Total Billed from WTD dataframe
-        total_billed_map = dict(zip(
-            self.dfs['WTD']['Consultant Name'],
-            self.dfs['WTD']['Billable Hours']
-        ))
-        
-        # Prepare batch creation with list comprehension instead of looping
+        constants = {
+            'dams_utilization': dams_utilization,
+            'capable_utilization': capable_utilization,
+            'total_capacity': self.total_capacity,
+        }
+
         try:
-            records_to_save = []
-            
-            for _, row in self.merged_report.iterrows():
-                # Get resource email in a safe way
-                resource_email = row.get('Resource Email Address', '')
-                if not resource_email:
-                    continue
-                    
-                # Use lowercase values for database lookups
-                if isinstance(resource_email, str):
-                    resource_email = resource_email.lower()
-                
-                # Calculate total_logged from billable hours and vacation
-                billable_hours = safe_float(row.get('Billable Hours', row.get('billable_hours', 0)))
-                vacation = safe_float(row.get('Vacation', row.get('vacation', 0)))
-                last_week = safe_float(row.get('Last Week', row.get('last_week', 0)))
-                total_logged = billable_hours + vacation + last_week
-                
-                # Get individual utilization, WTD capacity, and total billed for this resource
-                individual_utilization = safe_float(individual_util_map.get(resource_email, 0))
-                wtd_capacity = safe_float(wtd_capacity_map.get(resource_email, 0))
-                total_billed = safe_float(total_billed_map.get(resource_email, 0))
-                
-                # Create the model instance with safe gets for all fields and NaN handling
-                records_to_save.append(UtilizationReportModel(
-                    resource_email_address=resource_email,
-                    administrative=safe_float(row.get('Administrative', row.get('administrative', 0))),
-                    billable_hours=billable_hours,
-                    total_billed=total_billed,  # Added total_billed field
-                    department_mgmt=safe_float(row.get('Department Mgmt', row.get('department_mgmt', 0))),
-                    investment=safe_float(row.get('Investment', row.get('investment', 0))),
-                    presales=safe_float(row.get('Presales', row.get('presales', 0))),
-                    training=safe_float(row.get('Training', row.get('training', 0))),
-                    unassigned=safe_float(row.get('Unassigned', row.get('unassigned', 0))),
-                    vacation=vacation,
-                    grand_total=safe_float(row.get('Grand Total', row.get('grand_total', 0))),
-                    last_week=last_week,
-                    total_logged=total_logged,
-                    status=row.get('Status', row.get('status', 'open')) or 'open',
-                    addtnl_days=safe_float(row.get('Additional Days', row.get('addtnl_days', 0))),
-                    wtd_actuals=safe_float(row.get('WTD Actuals', row.get('wtd_actuals', 0))),
-                    wtd_capacity=wtd_capacity,
-                    rdm=row.get('RDM', row.get('rdm', 'Adam')) or 'Adam',
-                    track=row.get('Track', row.get('track', '')) or '',
-                    billing=row.get('Billing', row.get('billing', 'TBD')) or 'TBD',
-                    spoc=row.get('RDM', row.get('rdm', 'Adam')) or 'Adam',
-                    comments=row.get('comments', '') or '',
-                    spoc_comments=row.get('spoc_comments', '') or '',
-                    date=file_date_parsed,
-                    dams_utilization=dams_utilization,
-                    capable_utilization=capable_utilization,
-                    individual_utilization=individual_utilization,
-                    total_capacity=self.total_capacity
-                ))
-            
+            column_names, rows = build_report_records(
+                self.merged_report, self.dfs['WTD'], file_date_parsed, constants
+            )
         except Exception as e:
             logger.error(f"Error creating records: {e}")
             raise
-            
+
         try:
-            # Use batch size for better performance on large datasets
-            if records_to_save:
-                # Use a larger batch size for better performance
-                UtilizationReportModel.objects.bulk_create(records_to_save, batch_size=500)
-                logger.info(f"{len(records_to_save)} records saved successfully.")
+            if rows and replace:
+                _, self.swap_seconds = replace_date_rows(file_date_parsed, column_names, rows, batch_size=500)
+                logger.info(f"{len(rows)} records saved successfully.")
+            elif rows:
+                with transaction.atomic():
+                    insert_rows(UtilizationReportModel, column_names, rows, batch_size=500)
+                logger.info(f"{len(rows)} records saved successfully.")
             else:
                 logger.warning("No records to save")
+            report_dates_changed(file_date_parsed)
+            return len(rows)
         except Exception as e:
-            logger.error(f"Error during bulk_create: {e}")
-            raise 
\ No newline at end of file
+            logger.error(f"Error during insert: {e}")
+            raise
@@ -0,0 +1,175 @@
+"""
+Parse cache for uploaded workbooks.
+
+The filtered WTD and MTD frames built by UtilizationReportGenerator.create_dataframes
+are stored as Parquet under PARSE_CACHE_DIR, keyed by the SHA-256 of the workbook bytes
+plus the column-mapping / cost-center config. Re-uploading the same file skips Excel
+parsing entirely. The cache is bounded to PARSE_CACHE_MAX_BYTES and evicts the least
+recently used entries first.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import pandas as pd
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of the cached frames changes so stale entries are never read
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+META_FILE = 'meta.json'
+
+
+class ParseCache:
+    """Size-bounded LRU cache of parsed workbook frames on local disk."""
+
+    def __init__(self, root=None, max_bytes=None, enabled=None):
+        self._root = root
+        self._max_bytes = max_bytes
+        self._enabled = enabled
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+    @property
+    def root(self):
+        return str(self._root or getattr(settings, 'PARSE_CACHE_DIR', os.path.join(settings.CACHE_ROOT, 'parse_cache')))
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes or getattr(settings, 'PARSE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+
+    @property
+    def enabled(self):
+        if self._enabled is not None:
+            return self._enabled
+        return getattr(settings, 'PARSE_CACHE_ENABLED', True)
+
+    @staticmethod
+    def make_key(file_path, config):
+        """Hash the workbook bytes together with the config that shapes the parsed frames."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        digest.update(json.dumps(config, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(f"v{CACHE_FORMAT_VERSION}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key, with_meta=False):
+        """
+        Return the cached frames for key, or None on a miss. With with_meta, return
+        (frames, extra) where extra is whatever was passed to put() alongside them.
+        """
+        entry_dir = os.path.join(self.root, key)
+        try:
+            with open(os.path.join(entry_dir, META_FILE)) as f:
+                meta = json.load(f)
+            frames = {
+                name: pd.read_parquet(os.path.join(entry_dir, f"{name}.parquet"))
+                for name in meta['frames']
+            }
+        except FileNotFoundError:
+            self._record_miss()
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable parse cache entry {key}: {e}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            self._record_miss()
+            return None
+
+        # Touch the entry so eviction treats it as recently used
+        os.utime(entry_dir, None)
+        with self._lock:
+            self.hits += 1
+            self.seconds_saved += meta.get('parse_seconds', 0)
+        logger.info(f"Parse cache hit for {key[:12]} (saved {meta.get('parse_seconds', 0):.2f}s)")
+        if with_meta:
+            return frames, meta.get('extra', {})
+        return frames
+
+    def put(self, key, frames, parse_seconds=0.0, extra=None):
+        """
+        Store frames under key; the entry appears atomically or not at all.
+        extra is any JSON-serializable detail to hand back with the frames.
+        """
+        entry_dir = os.path.join(self.root, key)
+        tmp_dir = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(tmp_dir)
+            for name, df in frames.items():
+                df.to_parquet(os.path.join(tmp_dir, f"{name}.parquet"))
+            with open(os.path.join(tmp_dir, META_FILE), 'w') as f:
+                json.dump({
+                    'frames': list(frames),
+                    'parse_seconds': round(parse_seconds, 3),
+                    'created': time.time(),
+                    'extra': extra or {},
+                }, f)
+            if os.path.exists(entry_dir):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            else:
+                os.replace(tmp_dir, entry_dir)
+        except Exception as e:
+            # Caching is best effort; never fail an upload because of it
+            logger.warning(f"Could not write parse cache entry {key}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.evict()
+
+    def entries(self):
+        """List (path, size_bytes, last_used) for every complete entry."""
+        if not os.path.isdir(self.root):
+            return []
+        result = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith('.') or not os.path.isdir(path):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+            result.append((path, size, os.path.getmtime(path)))
+        return result
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            logger.info(f"Evicted parse cache entry {os.path.basename(path)[:12]}")
+
+    def stats(self):
+        """Counters for this process plus the current on-disk footprint."""
+        entries = self.entries()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0,
+            'seconds_saved': round(self.seconds_saved, 2),
+            'entries': len(entries),
+            'size_bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+        }
+
+    def _record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+
+# Shared by every generator in this process
+parse_cache = ParseCache()
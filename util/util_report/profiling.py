@@ -0,0 +1,117 @@
+"""
+Per-stage ingestion profiling.
+
+UtilizationReportGenerator.run_stage() measures every stage with a StageProfiler:
+wall time, CPU time and the rows the stage produced, plus the tracemalloc peak when
+memory tracing is on. tracemalloc slows workbook parsing several times over, so it is
+off unless INGESTION_TRACE_MEMORY is set or ingest_utilization runs with --profile.
+Finished ingestions are stored as IngestionRunModel rows for the ingestion runs page.
+"""
+
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .models import IngestionRunModel
+
+logger = logging.getLogger(__name__)
+
+
+class StageProfiler:
+    """Collects one measurement per pipeline stage, in run order."""
+
+    def __init__(self, trace_memory=None):
+        if trace_memory is None:
+            trace_memory = getattr(settings, 'INGESTION_TRACE_MEMORY', False)
+        self.trace_memory = trace_memory
+        self.stages = []
+        self._started_tracing = False
+
+    @contextmanager
+    def measure(self, name):
+        """Time the enclosed stage; the yielded dict can be given a 'rows' count."""
+        record = {'name': name}
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = round(time.perf_counter() - wall_started, 4)
+            record['cpu_seconds'] = round(time.process_time() - cpu_started, 4)
+            if self.trace_memory:
+                # Peak allocated on top of what was live when the stage started
+                record['peak_bytes'] = tracemalloc.get_traced_memory()[1] - baseline
+            self.stages.append(record)
+
+    def stop(self):
+        """Stop tracemalloc if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @property
+    def timings(self):
+        """Stage name -> wall seconds."""
+        return {stage['name']: stage['wall_seconds'] for stage in self.stages}
+
+
+def record_ingestion_run(generator, source, rows_written=None, error=None):
+    """Store the generator's stage measurements as an IngestionRunModel; never raises."""
+    profiler = generator.profiler
+    profiler.stop()
+    try:
+        return IngestionRunModel.objects.create(
+            source=source,
+            status='failed' if error else 'succeeded',
+            file_name=os.path.basename(generator.file_path),
+            report_date=generator.parsed_date.date() if generator.parsed_date else None,
+            cache_hit=generator.cache_hit,
+            traced_memory=profiler.trace_memory,
+            rows_written=rows_written or 0,
+            total_seconds=round(sum(stage['wall_seconds'] for stage in profiler.stages), 4),
+            stages=profiler.stages,
+            message=str(error) if error else None,
+        )
+    except Exception as e:
+        logger.warning(f"Could not record ingestion run for {generator.file_path}: {e}")
+        return None
+
+
+def compare_runs(base, other):
+    """
+    Line up the stages of two IngestionRunModel rows.
+    Returns (rows, regressed) where each row has both measurements and the wall time
+    delta, and regressed is the name of the stage whose wall time grew the most (or None).
+    """
+    base_stages = {stage['name']: stage for stage in base.stages}
+    other_stages = {stage['name']: stage for stage in other.stages}
+    names = list(base_stages) + [name for name in other_stages if name not in base_stages]
+
+    rows = []
+    for name in names:
+        before = base_stages.get(name, {})
+        after = other_stages.get(name, {})
+        delta = after.get('wall_seconds', 0) - before.get('wall_seconds', 0)
+        rows.append({
+            'name': name,
+            'base': before,
+            'other': after,
+            'wall_delta': round(delta, 4),
+            'wall_change': round(delta / before['wall_seconds'] * 100, 1) if before.get('wall_seconds') else None,
+            'peak_delta': (after['peak_bytes'] - before['peak_bytes'])
+            if 'peak_bytes' in before and 'peak_bytes' in after else None,
+        })
+
+    slowest = max(rows, key=lambda row: row['wall_delta'], default=None)
+    regressed = slowest['name'] if slowest and slowest['wall_delta'] > 0 else None
+    return rows, regressed
@@ -5,16 +5,22 @@ Direct Data Import Script for Utilization Report
 This script allows direct pushing of report data to the database
 without requiring an Excel file as an intermediate step.
 
-Usage:
-    python manage.py shell < util/util_report/push_direct_report.py
+Workbooks should not go through here: ingest them headlessly (e.g. from cron)
+with the management command, which runs the full report pipeline:
+
+    python manage.py ingest_utilization /data/psrs/util_7Mar2025.xlsx --replace
+
+Usage (from the directory holding manage.py):
+    python manage.py shell < util_report/push_direct_report.py
 """
 
 import logging
 from datetime import datetime
 from django.utils.dateparse import parse_date
 
-# Import your models (adjust the import path if needed)
-from util.util_report.models import UtilizationReportModel
+from util_report.models import ExclusionTableModel, UtilizationReportModel
+from util_report import rules
+from util_report.summaries import report_dates_changed
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -119,7 +125,9 @@ def push_direct_data():
             logger.info(f"Successfully imported {len(records_to_save)} records for {TARGET_DATE}")
         else:
             logger.warning("No records to import")
-        
+
+        # The date's rows changed: refresh its summaries and report cache as save_to_model does
+        report_dates_changed(parse_date(TARGET_DATE))
         return True
     
     except Exception as e:
@@ -165,22 +173,15 @@ def calculate_and_push_from_dataframe(df, week_number=1, total_days=5):
             
         df['Total Logged'] = df['Billable Hours'].fillna(0) + df['Vacation'].fillna(0)
         
-        # Calculate Additional Days based on billing type
-        df['Additional Days'] = 0
-        df['Billing'] = df['Billing'].fillna('TBD').astype(str)
-        
-        # For Billing type
-        billing_mask = df['Billing'] == 'Billing'
-        if any(billing_mask):
-            shortfall = total_days - df.loc[billing_mask, 'Total Logged']
-            df.loc[billing_mask, 'Additional Days'] = shortfall.clip(lower=0).astype('int64')
-        
-        # For Partial type
-        partial_mask = df['Billing'] == 'Partial'
-        if any(partial_mask):
-            partial_days = total_days / 2
-            shortfall_partial = partial_days - df.loc[partial_mask, 'Total Logged']
-            df.loc[partial_mask, 'Additional Days'] = shortfall_partial.clip(lower=0).astype('int64')
+        # Additional Days and Status follow the same rules as the ingest pipeline,
+        # including the exclusion list: excluded resources owe no days and are closed
+        df['Billing'] = rules.clean_billing(df['Billing'])
+        excluded_mask = rules.excluded(
+            df['Resource Email Address'],
+            ExclusionTableModel.objects.values_list('exclusion_list', flat=True)
+        )
+        df['Additional Days'] = rules.additional_days(df['Billing'], df['Total Logged'], total_days, excluded_mask)
+        df['Status'] = rules.status(df['Billing'], df['Billable Hours'], df['Vacation'], total_days, excluded_mask)
             
         # Prepare records for bulk insert
         records_to_save = []
@@ -224,7 +225,7 @@ def calculate_and_push_from_dataframe(df, week_number=1, total_days=5):
                 grand_total=safe_float(row.get('Grand Total', 0)),
                 last_week=0,  # For week 1, set to 0
                 total_logged=safe_float(row.get('Total Logged', 0)),
-                status='open',  # Default status
+                status=row['Status'],
                 addtnl_days=safe_float(row.get('Additional Days', 0)),
                 wtd_actuals=safe_float(row.get('WTD Actuals', 0)),
                 rdm=rdm_value,
@@ -240,10 +241,12 @@ def calculate_and_push_from_dataframe(df, week_number=1, total_days=5):
         if records_to_save:
             UtilizationReportModel.objects.bulk_create(records_to_save, batch_size=500)
             logger.info(f"Successfully imported {len(records_to_save)} records for {TARGET_DATE}")
-            return True
         else:
             logger.warning("No records to import")
-            return False
+
+        # The date's rows changed: refresh its summaries and report cache as save_to_model does
+        report_dates_changed(parse_date(TARGET_DATE))
+        return bool(records_to_save)
             
     except Exception as e:
         logger.error(f"Error pushing DataFrame data: {str(e)}", exc_info=True)
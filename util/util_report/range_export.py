@@ -0,0 +1,195 @@
+"""
+Report exports covering a range of dates.
+
+Rows are read from UtilizationReportModel in (date, email) order a chunk at a time
+by iter_keyset(), each chunk a separate query starting after the last row of the
+previous one. Unlike QuerySet.iterator(), which buffers the whole result on MySQL
+(mysqlclient has no server-side cursors), this keeps memory flat on every backend.
+Rows are written out as they arrive:
+
+  csv      streamed straight to the client, one chunk of lines at a time
+  parquet  one row group per chunk, written with pyarrow's ParquetWriter
+  xlsx     one sheet per week, written with the write-only export engine
+
+Parquet and xlsx files are assembled in a temporary file before they are sent, so
+memory stays bounded by the chunk size whatever the length of the range. Used by
+the export_range view and the export_utilization command.
+"""
+
+import csv
+import io
+import tempfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from django.db.models import Q
+
+from .excel_export import add_sheet, new_workbook, save_workbook, stream_file, width_from_queryset
+from .models import UtilizationReportModel
+from .report_query import FILTER_FIELDS
+
+EXPORT_FORMATS = ('csv', 'parquet', 'xlsx')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+CHUNK_SIZE = 2000
+
+# Columns of the report exports: (field, header, value used when empty);
+# numeric columns default to 0 and are rounded to two decimals
+REPORT_EXPORT_COLUMNS = [
+    ('resource_email_address', 'Resource Email Address', ''),
+    ('administrative', 'Administrative', 0),
+    ('billable_hours', 'Billable Hours', 0),
+    ('department_mgmt', 'Department Mgmt', 0),
+    ('training', 'Training', 0),
+    ('unassigned', 'Unassigned', 0),
+    ('vacation', 'Vacation', 0),
+    ('grand_total', 'Grand Total', 0),
+    ('last_week', 'Last Week', 0),
+    ('total_logged', 'Total Logged', 0),
+    ('addtnl_days', 'Additional Days', 0),
+    ('wtd_actuals', 'WTD Actuals', 0),
+    ('rdm', 'RDM', ''),
+    ('track', 'Track', ''),
+    ('billing', 'Billing', 'TBD'),
+    ('status', 'Status', 'open'),
+    ('comments', 'Comments', ''),
+    ('spoc_comments', 'SPOC Comments', ''),
+]
+EXPORT_FIELDS = [field for field, _, _ in REPORT_EXPORT_COLUMNS]
+EXPORT_HEADERS = [header for _, header, _ in REPORT_EXPORT_COLUMNS]
+
+
+def export_number(value):
+    """A numeric export value: empty as 0, rounded to two decimals."""
+    return round(float(value or 0), 2)
+
+
+# How width_from_queryset() measures the export columns, matching export_values()
+EXPORT_DEFAULTS = {field: default for field, _, default in REPORT_EXPORT_COLUMNS if default != 0}
+EXPORT_FORMATTERS = {field: export_number for field, _, default in REPORT_EXPORT_COLUMNS if default == 0}
+
+
+def export_values(values):
+    """One exported row: numbers rounded, empty values replaced by their defaults."""
+    return [
+        export_number(value) if default == 0 else (value or default)
+        for value, (_, _, default) in zip(values, REPORT_EXPORT_COLUMNS)
+    ]
+
+
+def range_queryset(start, end, filters=None):
+    """Report rows from start to end inclusive, narrowed by FILTER_FIELDS values."""
+    queryset = UtilizationReportModel.objects.filter(date__range=(start, end))
+    for name in FILTER_FIELDS:
+        value = (filters or {}).get(name)
+        if value:
+            queryset = queryset.filter(**{name: value})
+    return queryset.order_by('date', 'resource_email_address')
+
+
+# Unique per report row, and indexed (util_report_date_email_idx)
+KEYSET_FIELDS = ('date', 'resource_email_address')
+
+
+def iter_keyset(queryset, fields, chunk_size=CHUNK_SIZE):
+    """
+    Yield the values of fields for every row of queryset in KEYSET_FIELDS order,
+    reading chunk_size rows per query; each query resumes after the last key seen.
+    """
+    queryset = queryset.order_by(*KEYSET_FIELDS)
+    last_date = last_email = None
+    while True:
+        chunk = queryset
+        if last_date is not None:
+            chunk = chunk.filter(Q(date__gt=last_date) | Q(date=last_date, resource_email_address__gt=last_email))
+        rows = list(chunk.values_list(*KEYSET_FIELDS, *fields)[:chunk_size])
+        for row in rows:
+            yield row[len(KEYSET_FIELDS):]
+        if len(rows) < chunk_size:
+            return
+        last_date, last_email = rows[-1][:len(KEYSET_FIELDS)]
+
+
+def iter_export_rows(queryset):
+    """Yield (date, exported row) pairs, reading CHUNK_SIZE rows at a time."""
+    for values in iter_keyset(queryset, ('date', *EXPORT_FIELDS)):
+        yield values[0], export_values(values[1:])
+
+
+def csv_chunks(queryset):
+    """Encoded CSV with a Date column first, CHUNK_SIZE lines per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['Date', *EXPORT_HEADERS])
+    for count, (report_date, row) in enumerate(iter_export_rows(queryset), 1):
+        writer.writerow([report_date.isoformat(), *row])
+        if count % CHUNK_SIZE == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def parquet_schema():
+    fields = [pa.field('date', pa.date32())]
+    for field, _, default in REPORT_EXPORT_COLUMNS:
+        fields.append(pa.field(field, pa.float64() if default == 0 else pa.string()))
+    return pa.schema(fields)
+
+
+def write_parquet(queryset, output):
+    """Write the rows to output as Parquet, one row group per chunk."""
+    schema = parquet_schema()
+
+    def row_group(batch):
+        return pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(zip(*batch), schema)], schema=schema
+        )
+
+    with pq.ParquetWriter(output, schema) as writer:
+        batch = []
+        for report_date, row in iter_export_rows(queryset):
+            batch.append((report_date, *row))
+            if len(batch) == CHUNK_SIZE:
+                writer.write_table(row_group(batch))
+                batch = []
+        if batch:
+            writer.write_table(row_group(batch))
+
+
+def write_xlsx(queryset):
+    """Write the rows as a workbook with one sheet per week; returns the temporary file."""
+    wb = new_workbook()
+    dates = queryset.order_by('date').values_list('date', flat=True).distinct()
+    for report_date in dates:
+        week = queryset.filter(date=report_date)
+        add_sheet(
+            wb,
+            report_date.isoformat(),
+            EXPORT_HEADERS,
+            (row for _, row in iter_export_rows(week)),
+            widths=width_from_queryset(week, EXPORT_FIELDS, defaults=EXPORT_DEFAULTS, formatters=EXPORT_FORMATTERS),
+        )
+    if not dates:
+        add_sheet(wb, 'No data', EXPORT_HEADERS, [])
+    return save_workbook(wb)
+
+
+def export_chunks(export_format, queryset):
+    """The export of queryset in export_format, as an iterator of bytes."""
+    if export_format == 'csv':
+        return csv_chunks(queryset)
+    if export_format == 'parquet':
+        output = tempfile.TemporaryFile(suffix='.parquet')
+        write_parquet(queryset, output)
+        output.seek(0)
+        return stream_file(output)
+    if export_format == 'xlsx':
+        return stream_file(write_xlsx(queryset))
+    raise ValueError(f"Unknown export format {export_format!r}; use one of {', '.join(EXPORT_FORMATS)}")
@@ -0,0 +1,221 @@
+"""
+Re-derivation of report rows from their saved values.
+
+recompute_date() reads a date's rows, the previous week's additional days and the
+exclusion list with three queries, applies the rules of rules.py to the whole week
+at once and writes back only the rows whose last_week, total_logged, addtnl_days or
+status changed, with one bulk_update. No workbook is parsed: the inputs are the
+saved billable hours, vacation and billing of each row.
+
+A row's additional days are the next week's last_week, so changing them leaves the
+rest of the month stale. cascade_later_weeks() carries such changes forward: it
+reads the later rows of the changed resources in the same month with one query,
+walks the weeks in order re-deriving only the rows whose last_week no longer
+matches, and writes them with one bulk_update. A month has at most four weeks after
+the first, so the cost is bounded by the number of changed resources.
+"""
+
+import calendar
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.db.models import Q
+
+from . import rules
+from .models import ExclusionTableModel, UtilizationReportModel
+from .summaries import adjust_date_summary, get_date_summary, report_dates_changed
+
+# Fields recompute_date() derives; everything else on the row is an input
+DERIVED_FIELDS = ('last_week', 'total_logged', 'addtnl_days', 'status')
+
+# Derived fields that depend on the previous week's additional days
+CARRIED_FIELDS = ('last_week', 'total_logged', 'addtnl_days')
+
+
+def excluded_emails():
+    """Emails on the exclusion list (compare them with rules.excluded())."""
+    return set(ExclusionTableModel.objects.values_list('exclusion_list', flat=True))
+
+
+def previous_additional_days(report_date, emails=None):
+    """
+    Additional days of the week before report_date per lowercased email, limited to
+    emails when given. Empty in the first week of a month, which starts afresh.
+    """
+    if rules.week_number(report_date) == 1:
+        return {}
+    queryset = UtilizationReportModel.objects.filter(date=report_date - timedelta(days=7))
+    if emails is not None:
+        queryset = queryset.filter(resource_email_address__in=emails)
+    return {
+        email.lower(): float(days or 0)
+        for email, days in queryset.values_list('resource_email_address', 'addtnl_days')
+        if email
+    }
+
+
+def derive_fields(report_date, emails, billing, billable_hours, vacation, previous, exclusions):
+    """The DERIVED_FIELDS of rows of report_date as arrays, in DERIVED_FIELDS order."""
+    last_week = np.array([previous.get(email.lower(), 0.0) if email else 0.0 for email in emails], dtype='float64')
+    excluded_mask = rules.excluded(emails, exclusions)
+    billing = rules.clean_billing(billing)
+    total_days = rules.week_days(report_date)
+    logged = rules.total_logged(billable_hours, vacation, last_week)
+    return (
+        np.round(last_week, 2),
+        np.round(logged, 2),
+        rules.additional_days(billing, logged, total_days, excluded_mask),
+        rules.status(billing, billable_hours, vacation, total_days, excluded_mask),
+    )
+
+
+def recompute_date(report_date):
+    """
+    Re-derive DERIVED_FIELDS for every row of report_date in one pass, refresh the
+    date's summaries when anything changed and carry changed additional days into
+    the later weeks. Hand-set additional days are replaced by the derived ones.
+    Returns the number of rows of report_date changed.
+    """
+    with transaction.atomic():
+        rows = list(
+            UtilizationReportModel.objects.select_for_update()
+            .filter(date=report_date)
+            .order_by('id')
+            .values_list('id', 'resource_email_address', 'billing', 'billable_hours', 'vacation', *DERIVED_FIELDS)
+        )
+        if not rows:
+            return 0
+        ids, emails, billing, billable_hours, vacation, *saved = zip(*rows)
+        derived = derive_fields(
+            report_date, emails, billing, billable_hours, vacation,
+            previous_additional_days(report_date), excluded_emails(),
+        )
+
+        changed = np.zeros(len(rows), dtype=bool)
+        for field, new, old in zip(DERIVED_FIELDS, derived, saved):
+            if field == 'status':
+                changed |= new != np.array(old, dtype=object)
+            else:
+                changed |= ~np.isclose(new, np.array(old, dtype='float64'))
+        if not changed.any():
+            return 0
+
+        updates = [
+            UtilizationReportModel(id=ids[index], **{
+                field: values[index].item() if hasattr(values[index], 'item') else values[index]
+                for field, values in zip(DERIVED_FIELDS, derived)
+            })
+            for index in np.flatnonzero(changed)
+        ]
+        UtilizationReportModel.objects.bulk_update(updates, DERIVED_FIELDS, batch_size=500)
+        report_dates_changed(report_date)
+
+        additional_days = DERIVED_FIELDS.index('addtnl_days')
+        cascade_later_weeks({
+            (emails[index], report_date)
+            for index in np.flatnonzero(changed)
+            if emails[index] and not np.isclose(derived[additional_days][index], saved[additional_days][index])
+        })
+    return len(updates)
+
+
+def _month_end(report_date):
+    return report_date.replace(day=calendar.monthrange(report_date.year, report_date.month)[1])
+
+
+def cascade_later_weeks(changed):
+    """
+    Carry changed additional days into the later weeks of the same month. changed
+    holds (email, report_date) pairs whose addtnl_days were just written; those rows
+    are kept as written. Later rows whose last_week no longer matches get
+    CARRIED_FIELDS re-derived, and so on week after week; their status is left
+    alone. Moves the summaries of the dates touched by the additional days delta
+    and returns the number of rows updated.
+    """
+    # Per month, the first changed date of each resource
+    starts = {}
+    for email, report_date in changed:
+        month = starts.setdefault((report_date.year, report_date.month), {})
+        month[email.lower()] = min(report_date, month.get(email.lower(), report_date))
+    if not starts:
+        return 0
+
+    query = Q()
+    for month in starts.values():
+        first = min(month.values())
+        query |= Q(resource_email_address__in=set(month), date__range=(first, _month_end(first)))
+
+    with transaction.atomic():
+        frame = pd.DataFrame.from_records(
+            UtilizationReportModel.objects.select_for_update()
+            .filter(query)
+            .order_by('date', 'id')
+            .values_list('id', 'resource_email_address', 'date', 'billing', 'billable_hours', 'vacation',
+                         *CARRIED_FIELDS),
+            columns=['id', 'email', 'date', 'billing', 'billable_hours', 'vacation', *CARRIED_FIELDS],
+        )
+        if frame.empty:
+            return 0
+        frame['key'] = frame['email'].str.lower()
+        # Rows written by the caller are taken as they are
+        origins = {(email.lower(), report_date) for email, report_date in changed}
+        frame['origin'] = [(key, report_date) in origins for key, report_date in zip(frame['key'], frame['date'])]
+        frame['start'] = [
+            starts[(report_date.year, report_date.month)][key]
+            for key, report_date in zip(frame['key'], frame['date'])
+        ]
+
+        # Additional days per (resource, date) as they stand, updated as weeks are re-derived
+        days = {}
+        exclusions = None
+        updates = []
+        deltas = {}
+        for report_date, week in frame.groupby('date', sort=True):
+            for key, added in zip(week['key'], week['addtnl_days']):
+                days[(key, report_date)] = added or 0
+            # Only rows after their resource's change depend on it; a missing previous
+            # row counts as 0 as in previous_additional_days()
+            week = week[(week['date'] > week['start']) & ~week['origin']]
+            if week.empty:
+                continue
+            previous_date = report_date - timedelta(days=7)
+            previous = np.array([
+                days.get((key, previous_date), 0.0 if previous_date >= start else last_week)
+                for key, start, last_week in zip(week['key'], week['start'], week['last_week'])
+            ], dtype='float64')
+            stale = ~np.isclose(previous, week['last_week'].to_numpy(dtype='float64'))
+            if not stale.any():
+                continue
+
+            if exclusions is None:
+                exclusions = excluded_emails()
+            week = week[stale]
+            previous = previous[stale]
+            logged = rules.total_logged(week['billable_hours'], week['vacation'], previous)
+            added = rules.additional_days(
+                rules.clean_billing(week['billing']), logged, rules.week_days(report_date),
+                rules.excluded(week['email'], exclusions),
+            )
+            for row_id, key, old, last_week, total, new in zip(
+                week['id'], week['key'], week['addtnl_days'], previous, logged, added
+            ):
+                days[(key, report_date)] = float(new)
+                deltas[report_date] = deltas.get(report_date, 0) + float(new) - (old or 0)
+                updates.append(UtilizationReportModel(
+                    id=int(row_id),
+                    last_week=round(float(last_week), 2),
+                    total_logged=round(float(total), 2),
+                    addtnl_days=float(new),
+                ))
+        if not updates:
+            return 0
+
+        # Build any missing summary before the rows change, so the deltas apply to it
+        for report_date in deltas:
+            get_date_summary(report_date)
+        UtilizationReportModel.objects.bulk_update(updates, CARRIED_FIELDS, batch_size=500)
+        for report_date, additional_days_delta in deltas.items():
+            adjust_date_summary(report_date, additional_days_delta=additional_days_delta)
+    return len(updates)
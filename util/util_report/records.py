@@ -0,0 +1,137 @@
+"""
+Columnar record builder for utilization_report rows.
+
+UtilizationReportGenerator.save_to_model used to walk merged_report with iterrows(),
+resolving every column alias, coercing NaN and looking up the WTD enrichment once per
+row and building a model instance for each. Here each of those happens once per
+column: the result is a column list plus plain tuples, inserted with executemany.
+"""
+
+import pandas as pd
+from django.db import connection
+
+from .models import UtilizationReportModel
+
+# Numeric fields and the merged_report columns they are read from, in lookup order
+NUMERIC_FIELDS = {
+    'administrative': ('Administrative', 'administrative'),
+    'billable_hours': ('Billable Hours', 'billable_hours'),
+    'department_mgmt': ('Department Mgmt', 'department_mgmt'),
+    'investment': ('Investment', 'investment'),
+    'presales': ('Presales', 'presales'),
+    'training': ('Training', 'training'),
+    'unassigned': ('Unassigned', 'unassigned'),
+    'vacation': ('Vacation', 'vacation'),
+    'grand_total': ('Grand Total', 'grand_total'),
+    'last_week': ('Last Week', 'last_week'),
+    'addtnl_days': ('Additional Days', 'addtnl_days'),
+    'wtd_actuals': ('WTD Actuals', 'wtd_actuals'),
+}
+
+# Text fields, their source columns and the value used when blank
+TEXT_FIELDS = {
+    'status': (('Status', 'status'), 'open'),
+    'rdm': (('RDM', 'rdm'), 'Adam'),
+    'spoc': (('RDM', 'rdm'), 'Adam'),
+    'track': (('Track', 'track'), ''),
+    'billing': (('Billing', 'billing'), 'TBD'),
+    'comments': (('comments',), ''),
+    'spoc_comments': (('spoc_comments',), ''),
+}
+
+# WTD sheet columns joined onto each resource by consultant name
+WTD_FIELDS = {
+    'individual_utilization': 'Individual Utilization',
+    'wtd_capacity': 'WTD Capacity',
+    'total_billed': 'Billable Hours',
+}
+
+
+def resolve_column(frame, names):
+    """Return the first of names present in frame, or None."""
+    for name in names:
+        if name in frame.columns:
+            return frame[name]
+    return None
+
+
+def numeric_values(values, index):
+    """Coerce to float with blanks and unparseable values as 0.0."""
+    if values is None:
+        return pd.Series(0.0, index=index)
+    return pd.to_numeric(values, errors='coerce').fillna(0.0).astype(float)
+
+
+def text_values(values, default, index):
+    """Strings with missing and empty values replaced by default."""
+    if values is None:
+        return pd.Series(default, index=index, dtype=object)
+    values = values.astype(object)
+    blank = values.isna() | (values == '')
+    return values.where(~blank, default)
+
+
+def report_columns():
+    """Non-key columns of utilization_report, in model order."""
+    return [field for field in UtilizationReportModel._meta.concrete_fields if not field.primary_key]
+
+
+def build_report_records(merged_report, wtd, report_date, constants):
+    """
+    Build insert tuples for utilization_report from the merged report.
+
+    wtd supplies the per-consultant enrichment, report_date the date column and
+    constants any report-wide values (dams_utilization, total_capacity, ...).
+    Returns (column_names, rows); rows without a resource email are skipped.
+    """
+    emails = resolve_column(merged_report, ('Resource Email Address',))
+    if emails is None:
+        return [column.column for column in report_columns()], []
+    keep = emails.notna() & (emails.astype(str) != '')
+    frame = merged_report[keep]
+    index = frame.index
+    emails = emails[keep].map(lambda email: email.lower() if isinstance(email, str) else email)
+
+    values = {'resource_email_address': emails, 'date': pd.Series(report_date, index=index, dtype=object)}
+    for field, names in NUMERIC_FIELDS.items():
+        values[field] = numeric_values(resolve_column(frame, names), index)
+    for field, (names, default) in TEXT_FIELDS.items():
+        values[field] = text_values(resolve_column(frame, names), default, index)
+    for field, source in WTD_FIELDS.items():
+        lookup = dict(zip(wtd['Consultant Name'], wtd[source]))
+        values[field] = numeric_values(emails.map(lookup), index)
+    values['total_logged'] = values['billable_hours'] + values['vacation'] + values['last_week']
+
+    fields = report_columns()
+    columns = []
+    for field in fields:
+        if field.name in values:
+            columns.append(values[field.name].tolist())
+        else:
+            value = constants.get(field.name, field.get_default())
+            # numpy scalars go to the driver as plain Python numbers
+            value = value.item() if hasattr(value, 'item') else value
+            columns.append([value] * len(index))
+    return [field.column for field in fields], list(zip(*columns))
+
+
+def insert_rows(model, column_names, rows, batch_size=500, extra=None):
+    """
+    executemany rows into model's table. extra holds constant column values
+    appended to every row (e.g. the staging load_id).
+    """
+    if not rows:
+        return 0
+    extra = extra or {}
+    qn = connection.ops.quote_name
+    names = list(column_names) + list(extra)
+    sql = (
+        f"INSERT INTO {qn(model._meta.db_table)} ({', '.join(qn(name) for name in names)}) "
+        f"VALUES ({', '.join(['%s'] * len(names))})"
+    )
+    suffix = tuple(extra.values())
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            cursor.executemany(sql, [row + suffix for row in batch] if suffix else batch)
+    return len(rows)
@@ -0,0 +1,131 @@
+"""
+Per-date cache for the report pages.
+
+report_rows and util_leakage re-query the same week on every hit although a week
+only changes when it is edited or re-ingested. Their tables and aggregates are cached
+on the REPORT_CACHE_ALIAS cache, a file cache by default. The version stamps below
+live in that cache too, so it has to be shared by every process that writes report
+rows (web workers and run_ingestion_worker); a per-process local memory cache would
+leave the other processes serving stale entries.
+
+Every key embeds the current version stamp of the date(s) it was built from, so
+invalidating a date is just replacing its stamp: entries built from the old stamp
+are never read again and age out through the cache timeout. Writers go through
+summaries.report_dates_changed(), which calls invalidate() for the dates they touch.
+"""
+
+import hashlib
+import logging
+import threading
+import uuid
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ALIAS = 'reports'
+
+
+class ReportCache:
+    """Version-stamped cache of per-date report data, with hit counters per kind."""
+
+    def __init__(self, alias=None):
+        self._alias = alias
+        self._lock = threading.Lock()
+        self.counters = {}
+
+    @property
+    def cache(self):
+        return caches[self._alias or getattr(settings, 'REPORT_CACHE_ALIAS', DEFAULT_ALIAS)]
+
+    @staticmethod
+    def date_key(value):
+        """'YYYY-MM-DD' for a date, datetime or date string."""
+        if isinstance(value, datetime):
+            value = value.date()
+        if isinstance(value, date):
+            return value.isoformat()
+        return str(value)
+
+    def version(self, report_date):
+        """The current version stamp of report_date, created on first use."""
+        key = f"report:version:{self.date_key(report_date)}"
+        stamp = self.cache.get(key)
+        if stamp is None:
+            # add() keeps whichever worker got there first
+            self.cache.add(key, uuid.uuid4().hex[:12], timeout=None)
+            stamp = self.cache.get(key)
+        return stamp
+
+    def invalidate(self, *report_dates):
+        """Give each date a new version stamp once the current transaction commits."""
+        keys = [f"report:version:{self.date_key(report_date)}" for report_date in report_dates if report_date]
+
+        def bump():
+            try:
+                self.cache.set_many({key: uuid.uuid4().hex[:12] for key in keys}, timeout=None)
+            except Exception as e:
+                logger.error(f"Could not invalidate report cache for {', '.join(keys)}: {e}")
+
+        if keys:
+            transaction.on_commit(bump)
+
+    def get_or_build(self, kind, report_date, build, related_dates=(), variant=''):
+        """
+        Return the cached kind entry for report_date, calling build() on a miss.
+
+        related_dates are other dates the entry is built from (e.g. the previous week),
+        whose versions become part of the key too; variant distinguishes entries of the
+        same kind, such as different pages of a table.
+        """
+        dates = [report_date, *related_dates]
+        stamps = '.'.join(f"{self.date_key(d)}@{self.version(d)}" for d in dates)
+        if variant:
+            variant = ':' + hashlib.sha1(variant.encode('utf-8')).hexdigest()[:16]
+        key = f"report:{kind}:{stamps}{variant}"
+
+        try:
+            value = self.cache.get(key)
+        except Exception as e:
+            logger.error(f"Report cache lookup failed for {key}: {e}")
+            value = None
+        if value is not None:
+            self._count(kind, 'hits')
+            return value
+
+        self._count(kind, 'misses')
+        value = build()
+        try:
+            self.cache.set(key, value, timeout=getattr(settings, 'REPORT_CACHE_TIMEOUT', 3600))
+        except Exception as e:
+            logger.error(f"Could not store report cache entry {key}: {e}")
+        return value
+
+    def stats(self):
+        """Hit and miss counters for this process, overall and per kind."""
+        with self._lock:
+            kinds = {kind: dict(counts) for kind, counts in self.counters.items()}
+        for counts in kinds.values():
+            lookups = counts['hits'] + counts['misses']
+            counts['hit_ratio'] = round(counts['hits'] / lookups, 4) if lookups else 0
+        hits = sum(counts['hits'] for counts in kinds.values())
+        misses = sum(counts['misses'] for counts in kinds.values())
+        return {
+            'backend': self.cache.__class__.__name__,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0,
+            'kinds': kinds,
+        }
+
+    def _count(self, kind, outcome):
+        with self._lock:
+            counts = self.counters.setdefault(kind, {'hits': 0, 'misses': 0})
+            counts[outcome] += 1
+
+
+# Shared by every view in this process
+report_cache = ReportCache()
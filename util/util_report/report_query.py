@@ -0,0 +1,99 @@
+"""
+Paged report rows for the view_reports table.
+
+Rows for one date are ordered by a sort column with resource_email_address as the
+tie-breaker (unique per date), so a page can start right after the last row of the
+previous one: WHERE (sort, email) > (last sort, last email) ... LIMIT n. The cursor
+handed to the client encodes that last (sort, email) pair. Requests without a cursor
+(jumping to an arbitrary page) fall back to OFFSET.
+"""
+
+import base64
+import json
+
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+
+from .models import UtilizationReportModel
+
+MAX_PAGE_LENGTH = 500
+
+# Filters accepted from the client, mapped to exact-match fields
+FILTER_FIELDS = ('rdm', 'track', 'billing', 'status')
+
+
+def encode_cursor(sort_value, email):
+    """Opaque token for the position after (sort_value, email)."""
+    payload = json.dumps([sort_value, email], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def decode_cursor(token):
+    """Inverse of encode_cursor(); raises ValueError for a malformed token."""
+    try:
+        sort_value, email = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return sort_value, email
+
+
+def sort_expression(field_name):
+    """Sort key for field_name; nullable text columns sort their NULLs as ''."""
+    field = UtilizationReportModel._meta.get_field(field_name)
+    if field.null:
+        return Coalesce(F(field_name), Value(''), output_field=field)
+    return F(field_name)
+
+
+def report_page(report_date, fields, sort_field='resource_email_address', descending=False,
+                filters=None, search='', start=0, length=50, cursor=None):
+    """
+    One page of report rows for report_date.
+
+    fields are the columns to return (after the row id), filters a dict of
+    FILTER_FIELDS values, search a substring of the resource email. Returns a dict
+    with total / filtered counts, rows as (id, *fields) tuples and next_cursor
+    (None on the last page).
+    """
+    length = max(1, min(int(length), MAX_PAGE_LENGTH))
+    rows_for_date = UtilizationReportModel.objects.filter(date=report_date)
+
+    matching = rows_for_date
+    for name in FILTER_FIELDS:
+        value = (filters or {}).get(name)
+        if value:
+            matching = matching.filter(**{name: value})
+    if search:
+        matching = matching.filter(resource_email_address__icontains=search)
+
+    ordered = matching.annotate(sort_key=sort_expression(sort_field))
+    if descending:
+        ordered = ordered.order_by('-sort_key', '-resource_email_address')
+    else:
+        ordered = ordered.order_by('sort_key', 'resource_email_address')
+
+    if cursor:
+        sort_value, email = decode_cursor(cursor)
+        if descending:
+            after = Q(sort_key__lt=sort_value) | Q(sort_key=sort_value, resource_email_address__lt=email)
+        else:
+            after = Q(sort_key__gt=sort_value) | Q(sort_key=sort_value, resource_email_address__gt=email)
+        page = ordered.filter(after)[:length]
+    else:
+        start = max(0, int(start))
+        page = ordered[start:start + length]
+
+    rows = list(page.values_list('id', 'sort_key', *fields))
+    next_cursor = None
+    if len(rows) == length:
+        last = rows[-1]
+        next_cursor = encode_cursor(last[1], last[2 + fields.index('resource_email_address')])
+
+    total = rows_for_date.count()
+    filtered = matching.count() if matching is not rows_for_date else total
+    return {
+        'total': total,
+        'filtered': filtered,
+        'rows': [(row[0],) + row[2:] for row in rows],
+        'next_cursor': next_cursor,
+    }
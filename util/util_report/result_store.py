@@ -0,0 +1,94 @@
+"""
+Server-side store for the final report of an upload.
+
+The generated report used to travel in the session as a JSON blob, which the
+database session backend re-read and re-wrote on every request. Instead the
+ingestion job writes the frame as a Parquet file under RESULT_STORE_DIR, named by
+an unguessable token, and the session only keeps that token. Results expire
+RESULT_STORE_TTL seconds after they were written.
+"""
+
+import logging
+import os
+import re
+import secrets
+import time
+import uuid
+
+import pandas as pd
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 24 * 60 * 60
+
+TOKEN_PATTERN = re.compile(r'^[A-Za-z0-9_-]{32}$')
+
+
+class ResultStore:
+    """Parquet files on local disk keyed by random tokens, removed after a TTL."""
+
+    def __init__(self, root=None, ttl=None):
+        self._root = root
+        self._ttl = ttl
+
+    @property
+    def root(self):
+        return str(self._root or getattr(settings, 'RESULT_STORE_DIR', os.path.join(settings.CACHE_ROOT, 'results')))
+
+    @property
+    def ttl(self):
+        return self._ttl or getattr(settings, 'RESULT_STORE_TTL', DEFAULT_TTL)
+
+    def path(self, token):
+        """File holding token's result; raises ValueError for anything but a store token."""
+        if not token or not TOKEN_PATTERN.match(token):
+            raise ValueError("Invalid result token")
+        return os.path.join(self.root, f"{token}.parquet")
+
+    def put(self, df):
+        """Store df and return its token."""
+        token = secrets.token_urlsafe(24)
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, self.path(token))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.purge_expired()
+        return token
+
+    def get(self, token):
+        """The frame stored under token, or None when it is unknown or expired."""
+        try:
+            path = self.path(token)
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            return pd.read_parquet(path)
+        except (ValueError, FileNotFoundError):
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read stored result {token[:8]}: {e}")
+            return None
+
+    def purge_expired(self):
+        """Delete results older than the TTL; returns how many were removed."""
+        if not os.path.isdir(self.root):
+            return 0
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for entry in os.scandir(self.root):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+# Shared by the ingestion workers and the download view
+result_store = ResultStore()
@@ -0,0 +1,101 @@
+"""
+Business rules deciding which report rows need follow-up.
+
+Every rule takes whole arrays, one element per report row, and returns arrays, so
+the same code serves the ingest pipeline (a week's DataFrame), recompute_date()
+(a week read back from the database) and the edit endpoints (one-row arrays).
+A row's fields are derived as:
+
+  last_week     the resource's additional days of the previous week (0 in week 1)
+  total_logged  billable hours + vacation + last_week
+  addtnl_days   the whole days total_logged falls short of the week's requirement,
+                for Billing (every working day so far) and Partial (half of them)
+  status        'close' when billable hours + vacation meet the requirement of a
+                threshold billing type, always for ALWAYS_CLOSED_BILLING, and for
+                excluded resources; 'open' otherwise
+"""
+
+import numpy as np
+import pandas as pd
+
+# Billing types that close once the logged days meet the full / half week threshold
+FULL_THRESHOLD_BILLING = {'Billing', 'Next', 'TBD'}
+HALF_THRESHOLD_BILLING = {'Partial'}
+
+# Billing types that never need follow-up
+ALWAYS_CLOSED_BILLING = {'On Bench', 'Non Billable', 'Released'}
+
+# Billing types whose shortfall is carried as additional days
+FULL_SHORTFALL_BILLING = {'Billing'}
+HALF_SHORTFALL_BILLING = {'Partial'}
+
+DEFAULT_BILLING = 'TBD'
+
+
+def week_number(report_date):
+    """Week of the month report_date falls in, from 1."""
+    return (report_date.day - 1) // 7 + 1
+
+
+def week_days(report_date):
+    """Working days expected up to report_date's week of the month."""
+    return week_number(report_date) * 5
+
+
+def _numbers(values):
+    return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').fillna(0.0).to_numpy(dtype='float64')
+
+
+def _strings(values):
+    return pd.Series(values, dtype=object).astype(str).str.strip().to_numpy(dtype=object)
+
+
+def clean_billing(values):
+    """Billing types stripped, with blanks, None and NaN replaced by DEFAULT_BILLING."""
+    billing = pd.Series(values, dtype=object)
+    billing = billing.where(billing.notna(), DEFAULT_BILLING).astype(str).str.strip()
+    return billing.replace({'None': DEFAULT_BILLING, '': DEFAULT_BILLING}).to_numpy(dtype=object)
+
+
+def excluded(emails, exclusions):
+    """Mask of the emails found in exclusions, ignoring case."""
+    exclusions = {email.strip().lower() for email in exclusions if email}
+    return pd.Series(emails, dtype=object).map(
+        lambda email: isinstance(email, str) and email.strip().lower() in exclusions
+    ).to_numpy(dtype=bool)
+
+
+def total_logged(billable_hours, vacation, last_week):
+    """Days counted against the week's requirement; blanks and junk count as 0."""
+    return _numbers(billable_hours) + _numbers(vacation) + _numbers(last_week)
+
+
+def additional_days(billing, logged, total_days, excluded_mask=None):
+    """Whole days of shortfall of Billing and Partial rows; 0 for every other row."""
+    billing = _strings(billing)
+    full = np.isin(billing, list(FULL_SHORTFALL_BILLING))
+    half = np.isin(billing, list(HALF_SHORTFALL_BILLING))
+    required = np.where(full, total_days, np.where(half, total_days / 2, 0.0))
+    days = np.trunc(np.clip(required - _numbers(logged), 0, None))
+    if excluded_mask is not None:
+        days = np.where(np.asarray(excluded_mask, dtype=bool), 0.0, days)
+    return days
+
+
+def status(billing, billable_hours, vacation, total_days, excluded_mask=None):
+    """
+    'open' or 'close' per row. Billing types outside the known sets stay open;
+    without total_days (no report date yet) only ALWAYS_CLOSED_BILLING closes.
+    """
+    billing = _strings(billing)
+    closed = np.isin(billing, list(ALWAYS_CLOSED_BILLING))
+    if total_days is not None:
+        logged = _numbers(billable_hours) + _numbers(vacation)
+        closed = (
+            closed |
+            (np.isin(billing, list(FULL_THRESHOLD_BILLING)) & (logged >= total_days)) |
+            (np.isin(billing, list(HALF_THRESHOLD_BILLING)) & (logged >= total_days / 2))
+        )
+    if excluded_mask is not None:
+        closed = closed | np.asarray(excluded_mask, dtype=bool)
+    return np.where(closed, 'close', 'open').astype(object)
@@ -0,0 +1,89 @@
+"""
+Staged replacement of a report date.
+
+New rows are bulk loaded into utilization_report_staging under a load id, then a
+single short transaction deletes the date's live rows and copies the staged rows in
+with INSERT ... SELECT. Readers see either the old week or the new one, never an
+empty or half-loaded date, and a failed load leaves the live rows untouched.
+
+Several loads of the same date may run at once (parallel ingestion workers, or a
+batch next to an upload), so a load only ever touches staging rows of its own load
+id. Rows left behind by a load that died are removed once they are older than
+STALE_STAGING_AFTER, which no live load gets near.
+"""
+
+import logging
+import time
+import uuid
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import UtilizationReportModel, UtilizationReportStagingModel
+from .records import insert_rows
+
+logger = logging.getLogger(__name__)
+
+STALE_STAGING_AFTER = timedelta(hours=6)
+
+
+def new_load_id():
+    """Identifier tying together the staging rows of one load."""
+    return uuid.uuid4().hex
+
+
+def swap_in_staged_rows(report_date, load_id):
+    """
+    Replace report_date's live rows with the staged load in one transaction.
+    Returns (rows_inserted, swap_seconds).
+    """
+    qn = connection.ops.quote_name
+    columns = ', '.join(
+        qn(field.column) for field in UtilizationReportModel._meta.concrete_fields if not field.primary_key
+    )
+    insert_sql = (
+        f"INSERT INTO {qn(UtilizationReportModel._meta.db_table)} ({columns}) "
+        f"SELECT {columns} FROM {qn(UtilizationReportStagingModel._meta.db_table)} "
+        f"WHERE {qn('load_id')} = %s"
+    )
+
+    started = time.perf_counter()
+    with transaction.atomic():
+        deleted_count, _ = UtilizationReportModel.objects.filter(date=report_date).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(insert_sql, [load_id])
+            inserted = cursor.rowcount
+    swap_seconds = time.perf_counter() - started
+
+    logger.info(
+        f"Swapped in {inserted} rows for {report_date} (replaced {deleted_count}) "
+        f"in {swap_seconds * 1000:.1f} ms"
+    )
+    return inserted, swap_seconds
+
+
+def replace_date_rows(report_date, column_names, rows, batch_size=500):
+    """
+    Load rows (tuples ordered as column_names) into staging under a fresh load id
+    and swap them in for report_date. Returns (rows_inserted, swap_seconds).
+    """
+    if not rows:
+        return 0, 0.0
+    load_id = new_load_id()
+    staged_at = timezone.now()
+
+    # Leftovers from earlier loads of this date that died before cleaning up; loads
+    # still running are recent and keep their rows
+    UtilizationReportStagingModel.objects.filter(date=report_date).filter(
+        Q(staged_at__lt=staged_at - STALE_STAGING_AFTER) | Q(staged_at__isnull=True)
+    ).delete()
+    try:
+        insert_rows(
+            UtilizationReportStagingModel, column_names, rows, batch_size=batch_size,
+            extra={'load_id': load_id, 'staged_at': connection.ops.adapt_datetimefield_value(staged_at)},
+        )
+        return swap_in_staged_rows(report_date, load_id)
+    finally:
+        UtilizationReportStagingModel.objects.filter(load_id=load_id).delete()
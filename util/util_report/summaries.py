@@ -0,0 +1,263 @@
+"""
+Per-date summary rows for the report page headers.
+
+view_reports and util_leakage used to compute their header cards (utilization
+figures, case counts, RDM and track filter options) from the report rows on every
+load. ReportDateSummaryModel keeps one precomputed row per date instead.
+report_dates_changed() must be called for every date whose report rows are written;
+it refreshes those summaries and invalidates the date's report cache entries. Edits
+of individual rows call adjust_date_summary() with their deltas instead, so an edit
+costs the same whatever the headcount of the week.
+
+Each date also has one ReportRdmSummaryModel row per RDM for the RDM summary modal
+and download. Those are only rebuilt, with one grouped query, when a refresh has
+marked the date's rdm_summary_dirty flag, so reading them is a plain select.
+
+The summary rows also serve as the per-date rollup behind the utilization charts:
+utilization_series() averages them by month, quarter and year in the database, so
+each week counts once however many resources it has.
+"""
+
+import hashlib
+import logging
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractQuarter, ExtractYear, NullIf
+from django.utils import timezone
+
+from .models import ReportDateSummaryModel, ReportRdmSummaryModel, UtilizationReportModel
+from .report_cache import report_cache
+
+logger = logging.getLogger(__name__)
+
+HANDLED_MARKER = '[Closed:'  # Comment prefix of cases closed from util leakage
+
+UNASSIGNED_RDM = 'Unassigned'
+
+
+def is_handled(status, comments):
+    """Whether a row counts as handled: closed with a HANDLED_MARKER comment."""
+    return status == 'close' and HANDLED_MARKER in (comments or '')
+
+
+def capable_utilization(dams_utilization, total_capacity, total_additional_days):
+    """Capable utilization: DAMS utilization plus additional days at 8 hours, over capacity."""
+    if not total_capacity or total_capacity <= 0:
+        return 0
+    total_utilization = (dams_utilization / 100) * total_capacity
+    return round(((total_utilization + (total_additional_days * 8)) / total_capacity) * 100, 2)
+
+
+def refresh_date_summary(report_date):
+    """Recompute the summary row of report_date; returns it, or None when the date has no rows."""
+    report_date = report_cache.date_key(report_date)
+    rows = UtilizationReportModel.objects.filter(date=report_date)
+    totals = rows.aggregate(
+        resource_count=Count('id'),
+        open_count=Count('id', filter=Q(status='open')),
+        handled_count=Count('id', filter=Q(status='close', comments__contains=HANDLED_MARKER)),
+        individual_utilization=Avg('individual_utilization'),
+        total_additional_days=Sum('addtnl_days'),
+    )
+    if not totals['resource_count']:
+        ReportDateSummaryModel.objects.filter(date=report_date).delete()
+        ReportRdmSummaryModel.objects.filter(date=report_date).delete()
+        return None
+
+    # DAMS utilization and capacity are stored on every row of the date
+    first_report = rows.values('dams_utilization', 'total_capacity').first()
+    dams_utilization = first_report['dams_utilization'] or 0
+    total_capacity = first_report['total_capacity'] or 0
+    total_additional_days = totals['total_additional_days'] or 0
+    summary, _ = ReportDateSummaryModel.objects.update_or_create(
+        date=report_date,
+        defaults={
+            'dams_utilization': dams_utilization,
+            'capable_utilization': capable_utilization(dams_utilization, total_capacity, total_additional_days),
+            'total_capacity': total_capacity,
+            'total_additional_days': total_additional_days,
+            'individual_utilization': totals['individual_utilization'] or 0,
+            'resource_count': totals['resource_count'],
+            'open_count': totals['open_count'],
+            'handled_count': totals['handled_count'],
+            'rdms': list(rows.exclude(rdm='').exclude(rdm__isnull=True)
+                         .values_list('rdm', flat=True).distinct().order_by('rdm')),
+            'tracks': list(rows.exclude(track='').exclude(track__isnull=True)
+                           .values_list('track', flat=True).distinct().order_by('track')),
+            'rdm_summary_dirty': True,
+        },
+    )
+    return summary
+
+
+def get_date_summary(report_date):
+    """The summary row of report_date, built on first use for dates loaded before it existed."""
+    summary = ReportDateSummaryModel.objects.filter(date=report_date).first()
+    if summary is None:
+        summary = refresh_date_summary(report_date)
+    return summary
+
+
+def adjust_date_summary(report_date, open_delta=0, handled_delta=0, additional_days_delta=0):
+    """
+    Apply the effect of edited rows to report_date's summary without rescanning the
+    date: the counts and additional days move by the given deltas with F()
+    arithmetic, and capable utilization is derived again from the new total. The
+    summary must exist before the rows are written (see get_date_summary()), or the
+    lazy build would already include the edits.
+    """
+    report_date = report_cache.date_key(report_date)
+    summaries = ReportDateSummaryModel.objects.filter(date=report_date)
+    with transaction.atomic():
+        summaries.update(
+            open_count=F('open_count') + open_delta,
+            handled_count=F('handled_count') + handled_delta,
+            total_additional_days=F('total_additional_days') + additional_days_delta,
+            rdm_summary_dirty=True,
+            updated_at=timezone.now(),
+        )
+        if additional_days_delta:
+            figures = summaries.values('dams_utilization', 'total_capacity', 'total_additional_days').first()
+            if figures:
+                summaries.update(capable_utilization=capable_utilization(
+                    figures['dams_utilization'], figures['total_capacity'], figures['total_additional_days']
+                ))
+    report_cache.invalidate(report_date)
+
+
+def refresh_rdm_summaries(report_date):
+    """Rebuild the RDM rows of report_date from one query grouped by RDM."""
+    report_date = report_cache.date_key(report_date)
+    groups = (
+        UtilizationReportModel.objects
+        .filter(date=report_date)
+        .order_by()
+        .values(rdm_label=Coalesce(NullIf('rdm', Value('')), Value(UNASSIGNED_RDM)))
+        .annotate(
+            resource_count=Count('id'),
+            billable_hours=Sum('billable_hours'),
+            wtd_actuals=Sum('wtd_actuals'),
+            addtnl_days=Sum('addtnl_days'),
+            total_capacity=Sum('wtd_capacity'),
+            total_billed=Sum('total_billed'),
+            partial_count=Count('id', filter=Q(billing__iexact='partial')),
+            billing_count=Count('id', filter=Q(billing__iexact='billing')),
+            next_count=Count('id', filter=Q(billing__iexact='next')),
+        )
+    )
+    summaries = []
+    for group in groups:
+        rdm = group.pop('rdm_label')
+        capacity = group['total_capacity']
+        if capacity > 0:
+            dams_utilization = group['total_billed'] / capacity * 100
+            capable_utilization = (group['total_billed'] + group['addtnl_days'] * 8) / capacity * 100
+        else:
+            dams_utilization = capable_utilization = 0
+        summaries.append(ReportRdmSummaryModel(
+            date=report_date,
+            rdm=rdm,
+            dams_utilization=round(dams_utilization, 2),
+            capable_utilization=round(capable_utilization, 2),
+            **group,
+        ))
+
+    with transaction.atomic():
+        ReportRdmSummaryModel.objects.filter(date=report_date).delete()
+        ReportRdmSummaryModel.objects.bulk_create(summaries)
+    return summaries
+
+
+def get_rdm_summaries(report_date, summary=None):
+    """
+    RDM rows of report_date, rebuilt first when the date has changed since they were
+    built. summary is the date's summary row when the caller already has it.
+    """
+    summary = summary or get_date_summary(report_date)
+    if summary is None:
+        return []
+    if summary.rdm_summary_dirty:
+        with transaction.atomic():
+            # Clear the flag before reading the rows: a write landing meanwhile sets it again
+            claimed = ReportDateSummaryModel.objects.filter(
+                pk=summary.pk, rdm_summary_dirty=True
+            ).update(rdm_summary_dirty=False)
+            if claimed:
+                refresh_rdm_summaries(report_date)
+    return list(ReportRdmSummaryModel.objects.filter(date=report_date))
+
+
+def report_dates_changed(*report_dates):
+    """
+    Refresh the summaries of the given dates, mark their RDM rows for a rebuild and
+    invalidate their cached report data.
+    """
+    report_dates = {report_cache.date_key(report_date) for report_date in report_dates if report_date}
+    for report_date in sorted(report_dates):
+        try:
+            refresh_date_summary(report_date)
+        except Exception as e:
+            # A stale summary must not fail the edit itself; it is rebuilt on the next change
+            logger.error(f"Could not refresh report summary for {report_date}: {e}")
+    report_cache.invalidate(*report_dates)
+
+
+def summary_dates():
+    """Report dates, newest first; summarizes every date on first use after an upgrade."""
+    dates = list(ReportDateSummaryModel.objects.values_list('date', flat=True).order_by('-date'))
+    if not dates and UtilizationReportModel.objects.exists():
+        for report_date in UtilizationReportModel.objects.values_list('date', flat=True).distinct():
+            refresh_date_summary(report_date)
+        dates = list(ReportDateSummaryModel.objects.values_list('date', flat=True).order_by('-date'))
+    return dates
+
+
+def summaries_etag():
+    """
+    Version tag of the summary table, changing whenever a summary row is written or
+    removed; None while there is no report data at all.
+    """
+    state = ReportDateSummaryModel.objects.aggregate(count=Count('id'), changed=Max('updated_at'))
+    if not state['count']:
+        if not summary_dates():
+            return None
+        state = ReportDateSummaryModel.objects.aggregate(count=Count('id'), changed=Max('updated_at'))
+    return hashlib.md5(f"{state['count']}:{state['changed']}".encode('utf-8')).hexdigest()
+
+
+# Chart series: (periods grouped on, label of a group)
+SERIES_PERIODS = {
+    'monthly': (
+        {'year': ExtractYear('date'), 'month': ExtractMonth('date')},
+        lambda group: f"{group['year']}-{group['month']:02d}",
+    ),
+    'quarterly': (
+        {'year': ExtractYear('date'), 'quarter': ExtractQuarter('date')},
+        lambda group: f"{group['year']} Q{group['quarter']}",
+    ),
+    'yearly': (
+        {'year': ExtractYear('date')},
+        lambda group: str(group['year']),
+    ),
+}
+
+
+def utilization_series():
+    """Monthly, quarterly and yearly averages of the per-date DAMS and capable utilization."""
+    series = {}
+    for name, (periods, label) in SERIES_PERIODS.items():
+        groups = (
+            ReportDateSummaryModel.objects
+            .annotate(**periods)
+            .values(*periods)
+            .annotate(dams=Avg('dams_utilization'), capable=Avg('capable_utilization'))
+            .order_by(*periods)
+        )
+        groups = list(groups)
+        series[name] = {
+            'labels': [label(group) for group in groups],
+            'dams': [round(float(group['dams']), 2) for group in groups],
+            'capable': [round(float(group['capable']), 2) for group in groups],
+        }
+    return series
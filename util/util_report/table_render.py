@@ -0,0 +1,91 @@
+"""
+Shared HTML table renderer for the report pages.
+
+view_reports and util_leakage used to build a DataFrame, call to_html(), re-parse
+the markup with BeautifulSoup and walk every row again to add ids and data
+attributes. render_table() writes the final markup in one pass over the column
+arrays instead: each column is formatted once, then rows are joined together.
+The markup keeps the classes and layout of DataFrame.to_html() that the page
+scripts and styles expect.
+"""
+
+from html import escape
+
+
+class TableColumn:
+    """
+    One rendered column.
+
+    key is the entry in the column data (defaults to the header label), align='right'
+    adds Bootstrap's text-end class, data_attribute puts the cell value in a
+    data-<name> attribute for the page filters, and decimals fixes the number format.
+    """
+
+    def __init__(self, label, key=None, align='left', data_attribute=None, decimals=None):
+        self.label = label
+        self.key = key or label
+        self.align = align
+        self.data_attribute = data_attribute
+        self.decimals = decimals
+
+    def format(self, value):
+        """Cell text for value, before escaping."""
+        if value is None:
+            return ''
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if value != value:  # NaN
+                return ''
+            if self.decimals is not None:
+                return f"{value:.{self.decimals}f}"
+            if isinstance(value, int):
+                return str(value)
+            # Like pandas: up to six decimals, trailing zeros dropped but never the last one
+            text = f"{value:.6f}".rstrip('0')
+            return text + '0' if text.endswith('.') else text
+        return str(value)
+
+    def render_cells(self, values):
+        """The <td> markup of every value in the column."""
+        classes = ' class="text-end"' if self.align == 'right' else ''
+        cells = []
+        for value in values:
+            text = escape(self.format(value))
+            if self.data_attribute:
+                cells.append(f'<td{classes} data-{self.data_attribute}="{text}">{text}</td>')
+            else:
+                cells.append(f'<td{classes}>{text}</td>')
+        return cells
+
+
+def render_table(columns, data, row_attributes=None, table_id=None, classes='table table-hover table-striped'):
+    """
+    Render columns from data, a mapping of column key -> sequence of values.
+
+    row_attributes optionally maps an attribute name to a per-row sequence, e.g.
+    {'data-id': ids}; table_id sets the table's id.
+    """
+    column_cells = [column.render_cells(data[column.key]) for column in columns]
+    row_count = len(column_cells[0]) if column_cells else 0
+
+    row_openers = ['    <tr>'] * row_count
+    if row_attributes:
+        attribute_values = list(row_attributes.items())
+        row_openers = [
+            '    <tr ' + ' '.join(f'{name}="{escape(str(values[i]))}"' for name, values in attribute_values) + '>'
+            for i in range(row_count)
+        ]
+
+    id_attribute = f' id="{escape(table_id)}"' if table_id else ''
+    parts = [
+        f'<table border="1" class="dataframe {escape(classes)}"{id_attribute}>',
+        '  <thead>',
+        '    <tr style="text-align: right;">',
+    ]
+    parts.extend(f'      <th>{escape(column.label)}</th>' for column in columns)
+    parts.extend(['    </tr>', '  </thead>', '  <tbody>'])
+    for opener, cells in zip(row_openers, zip(*column_cells)):
+        parts.append(opener)
+        parts.append(''.join(cells))
+        parts.append('    </tr>')
+    parts.extend(['  </tbody>', '</table>'])
+    return '\n'.join(parts)
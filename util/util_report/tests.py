@@ -1,3 +1,1288 @@
-from django.test import TestCase
+import csv
+import os
+import tempfile
+from io import BytesIO, StringIO
+import time
+from datetime import date, timedelta
+from html.parser import HTMLParser
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django.urls import reverse
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils import get_column_letter
+
+from . import rules
+from .excel_export import width_from_queryset
+from .edits import EditError, apply_edits, close_open_cases
+from .jobs import (
+    MAX_ATTEMPTS,
+    claim_next_job,
+    enqueue_ingestion,
+    remove_stale_uploads,
+    requeue_stale_jobs,
+    run_ingestion_job,
+)
+from .management.commands.benchmark_record_builder import legacy_records, synthetic_report
+from .low_utilization import low_utilization_report, month_bounds
+from .models import (
+    ExclusionTableModel,
+    IngestionJobModel,
+    ReportDateSummaryModel,
+    UtilizationHistoryModel,
+    UtilizationReportModel,
+    UtilizationReportStagingModel,
+)
+from .new_main import HEADER_SCAN_ROWS, TARGET_COST_CENTER, UtilizationReportGenerator
+from .parse_cache import ParseCache
+from .recompute import recompute_date
+from .records import build_report_records, report_columns
+from .report_cache import report_cache
+from .range_export import EXPORT_FIELDS, EXPORT_HEADERS, iter_keyset, range_queryset
+from .report_query import report_page
+from .result_store import ResultStore, result_store
+from .staging import STALE_STAGING_AFTER, replace_date_rows
+from .summaries import refresh_date_summary
+from .table_render import render_table
+from .views import LEAKAGE_TABLE_COLUMNS, REPORT_TABLE_COLUMNS, leakage_table
+
+WEEK_1 = date(2025, 3, 7)
+WEEK_2 = date(2025, 3, 14)
+WEEK_3 = date(2025, 3, 21)
+
+# Every column of a report row, as insert_rows() and replace_date_rows() take them
+REPORT_FIELDS = [field for field in UtilizationReportModel._meta.concrete_fields if not field.primary_key]
+
+SUMMARY_FIELDS = ('resource_count', 'open_count', 'handled_count', 'total_additional_days', 'capable_utilization')
+
+
+def report_tuple(report_date, email, **values):
+    """A full report row as a tuple ordered like REPORT_FIELDS, defaults elsewhere."""
+    values = {'date': report_date, 'resource_email_address': email, **values}
+    return tuple(values.get(field.name, field.get_default()) for field in REPORT_FIELDS)
+
+
+def write_input_workbook(path, wtd_rows, mtd_rows, title_rows=2):
+    """
+    Write an upload workbook with WTD and Consultant Summary sheets for March. Each
+    sheet starts with title_rows rows of banner text above its header, like the
+    exported workbooks, and carries a column the report does not read.
+    """
+    workbook = Workbook()
+    sheets = (
+        ('WTD', ['Consultant Name', 'Manager Name', 'Region', 'WTD Capacity', 'Billable Hours', 'Utl %', 'CC'], wtd_rows),
+        ('Consultant Summary', ['Resource Email Address', 'Project Number', 'Project Name',
+                                'Work Type Description-OPS', 'Region', 'March', 'Cost Center - OPS'], mtd_rows),
+    )
+    workbook.remove(workbook.active)
+    for title, header, rows in sheets:
+        sheet = workbook.create_sheet(title)
+        for index in range(title_rows):
+            sheet.append([f'{title} report, line {index + 1}'])
+        sheet.append(header)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+    return path
+
+
+def _number(value):
+    if value is None or value == '' or pd.isna(value):
+        return 0.0
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def determine_status(row, total_days):
+    """Row-wise statement of the status rules; the oracle compute_status() is checked against."""
+    billing_type = str(row.get('Billing', row.get('billing', ''))).strip()
+    total_logged = (
+        _number(row.get('Billable Hours', row.get('billable_hours', 0))) +
+        _number(row.get('Vacation', row.get('vacation', 0)))
+    )
+    if billing_type in {'Billing', 'Next', 'TBD'}:
+        return 'close' if total_logged >= total_days else 'open'
+    if billing_type == 'Partial':
+        return 'close' if total_logged >= total_days / 2 else 'open'
+    if billing_type in {'On Bench', 'Non Billable', 'Released'}:
+        return 'close'
+    return 'open'
+
+
+class StatusEngineParityTests(SimpleTestCase):
+    """compute_status() must agree with the row-wise determine_status() rules."""
+
+    TOTAL_DAYS = (5, 10, 15, 20, 25)
+
+    def make_generator(self, total_days):
+        generator = UtilizationReportGenerator('report_7Mar2025.xlsx')
+        generator.total_days = total_days
+        return generator
+
+    def assert_parity(self, frame, excluded=None):
+        for total_days in self.TOTAL_DAYS:
+            generator = self.make_generator(total_days)
+            expected = frame.apply(determine_status, axis=1, total_days=total_days)
+            if excluded is not None:
+                expected = expected.where(~excluded, 'close')
+            actual = generator.compute_status(frame, excluded=excluded)
+            self.assertEqual(expected.tolist(), actual.tolist(), f"total_days={total_days}")
+
+    def test_exported_week(self):
+        frame = pd.read_excel(os.path.join(settings.BASE_DIR, '7Mar2025.xlsx'))
+        self.assert_parity(frame)
+
+    def test_blank_and_invalid_values(self):
+        rng = np.random.default_rng(7)
+        size = 1000
+        frame = pd.DataFrame({
+            'Billing': rng.choice(
+                ['Billing', 'Partial', 'Next', 'TBD', 'On Bench', 'Non Billable', 'Released',
+                 ' Billing ', '', 'None', None, 'Unknown'], size
+            ),
+            'Billable Hours': rng.choice([0, 2.4, 2.5, 5, 7.5, 9.9, 10, 25, np.nan], size),
+            'Vacation': rng.choice([0, 0.1, 2.5, 5, np.nan], size).astype(object),
+        })
+        frame.loc[::17, 'Vacation'] = ''
+        frame.loc[::23, 'Vacation'] = 'n/a'
+        self.assert_parity(frame)
+
+    def test_missing_columns(self):
+        frame = pd.DataFrame({'billing': ['Billing', 'Released', 'Partial', None]})
+        self.assert_parity(frame)
+
+    def test_exclusions_close_open_rows(self):
+        frame = pd.DataFrame({
+            'Billing': ['Billing', 'Billing', 'Partial', 'Released'],
+            'Billable Hours': [0, 25, 0, 0],
+            'Vacation': [0, 0, 0, 0],
+        })
+        excluded = pd.Series([True, False, False, True])
+        self.assert_parity(frame, excluded=excluded)
+
+
+class StagedReplacementTests(TestCase):
+    """replace_date_rows() swaps a date's rows for the staged load, touching nothing else."""
+
+    columns = [field.column for field in REPORT_FIELDS]
+
+    def setUp(self):
+        for email in ('a@x.com', 'b@x.com'):
+            UtilizationReportModel.objects.create(date=WEEK_1, resource_email_address=email, billable_hours=1)
+        UtilizationReportModel.objects.create(date=WEEK_2, resource_email_address='a@x.com')
+
+    def live_rows(self, report_date):
+        return sorted(UtilizationReportModel.objects.filter(date=report_date)
+                      .values_list('resource_email_address', 'billable_hours'))
+
+    def test_swaps_in_the_staged_rows(self):
+        rows = [report_tuple(WEEK_1, 'b@x.com', billable_hours=4), report_tuple(WEEK_1, 'c@x.com', billable_hours=5)]
+        inserted, _ = replace_date_rows(WEEK_1, self.columns, rows)
+
+        self.assertEqual(inserted, 2)
+        self.assertEqual(self.live_rows(WEEK_1), [('b@x.com', 4.0), ('c@x.com', 5.0)])
+        self.assertEqual(self.live_rows(WEEK_2), [('a@x.com', 0.0)])
+        self.assertFalse(UtilizationReportStagingModel.objects.exists())
+
+    def test_failed_swap_keeps_the_live_rows(self):
+        # The same resource twice breaks the live table's unique (email, date)
+        rows = [report_tuple(WEEK_1, 'c@x.com'), report_tuple(WEEK_1, 'c@x.com')]
+        with self.assertRaises(IntegrityError):
+            replace_date_rows(WEEK_1, self.columns, rows)
+
+        self.assertEqual(self.live_rows(WEEK_1), [('a@x.com', 1.0), ('b@x.com', 1.0)])
+        self.assertFalse(UtilizationReportStagingModel.objects.exists())
+
+    def test_other_loads_of_the_date_keep_their_staged_rows(self):
+        now = timezone.now()
+        UtilizationReportStagingModel.objects.create(
+            date=WEEK_1, resource_email_address='running@x.com', load_id='running', staged_at=now
+        )
+        UtilizationReportStagingModel.objects.create(
+            date=WEEK_1, resource_email_address='dead@x.com', load_id='dead',
+            staged_at=now - STALE_STAGING_AFTER - timedelta(minutes=1),
+        )
+        replace_date_rows(WEEK_1, self.columns, [report_tuple(WEEK_1, 'c@x.com')])
+
+        self.assertEqual(list(UtilizationReportStagingModel.objects.values_list('load_id', flat=True)), ['running'])
+        self.assertEqual(self.live_rows(WEEK_1), [('c@x.com', 0.0)])
+
+
+class LowUtilizationReportTests(TestCase):
+    """low_utilization_report() averages each resource over the range before bucketing."""
+
+    def setUp(self):
+        rows = [
+            ('a@x.com', WEEK_1, 10, 'Billing', 'R1'),
+            ('a@x.com', WEEK_2, 20, 'Billing', 'R1'),
+            ('b@x.com', WEEK_1, 40, 'Partial', ''),
+            ('c@x.com', WEEK_1, 80, 'Billing', 'R1'),
+            ('c@x.com', date(2025, 4, 4), 0, 'Billing', 'R1'),
+            ('d@x.com', WEEK_1, 30, '', 'R2'),
+            ('d@x.com', WEEK_2, 30, 'Next', 'R2'),
+        ]
+        for email, report_date, utilization, billing, rdm in rows:
+            UtilizationReportModel.objects.create(
+                resource_email_address=email, date=report_date,
+                individual_utilization=utilization, billing=billing, rdm=rdm,
+            )
+
+    def test_resources_below_the_thresholds(self):
+        result = low_utilization_report(*month_bounds(2025, 3))
+
+        self.assertEqual(
+            [(row['resource_email'], row['individual_utilization']) for row in result['below_35']],
+            [('a@x.com', 15), ('d@x.com', 30)],
+        )
+        self.assertEqual(
+            result['below_50'],
+            [{'resource_email': 'b@x.com', 'individual_utilization': 40, 'billing': 'Partial', 'rdm': 'N/A'}],
+        )
+        self.assertEqual(result['total_resources'], 4)
+
+    def test_distributions_and_averages(self):
+        stats = low_utilization_report(*month_bounds(2025, 3))['stats']
+
+        self.assertEqual(
+            {row['type']: row['count'] for row in stats['billing_types']},
+            {'Billing': 2, 'Partial': 1, 'Next': 1},
+        )
+        self.assertEqual({row['name']: row['count'] for row in stats['rdm_distribution']}, {'R1': 2, 'N/A': 1, 'R2': 1})
+        self.assertEqual(
+            [(row['range'], row['count']) for row in stats['utilization_ranges']],
+            [('0-15%', 0), ('15-25%', 1), ('25-35%', 1), ('35-50%', 1), ('Above 50%', 1)],
+        )
+        self.assertEqual(stats['averages'], {'below_35': 22.5, 'below_50': 40, 'all': 41.25})
+
+    def test_range_without_rows(self):
+        result = low_utilization_report(*month_bounds(2025, 5))
+
+        self.assertEqual((result['below_35'], result['below_50'], result['total_resources']), ([], [], 0))
+        self.assertEqual(result['stats']['averages'], {'below_35': 0, 'below_50': 0, 'all': 0})
+
+
+class BusinessRulesTests(SimpleTestCase):
+    """The array rules of rules.py, one element per report row."""
+
+    def test_week_of_the_month(self):
+        self.assertEqual([rules.week_number(day) for day in (WEEK_1, date(2025, 3, 28), date(2025, 3, 29))], [1, 4, 5])
+        self.assertEqual(rules.week_days(WEEK_3), 15)
+
+    def test_total_logged_counts_junk_as_zero(self):
+        logged = rules.total_logged([8, 'n/a', None], [1, None, ''], [0.5, 2, np.nan])
+        np.testing.assert_array_equal(logged, [9.5, 2.0, 0.0])
+
+    def test_additional_days_are_whole_days_of_shortfall(self):
+        days = rules.additional_days(['Billing', 'Partial', 'Next', 'Billing', 'Billing'], [12.5, 1, 0, 20, 0], 15)
+        np.testing.assert_array_equal(days, [2.0, 6.0, 0.0, 0.0, 15.0])
+
+        days = rules.additional_days(['Billing', 'Billing'], [0, 0], 15, [True, False])
+        np.testing.assert_array_equal(days, [0.0, 15.0])
+
+    def test_status_thresholds(self):
+        billing = ['Billing', 'Billing', 'TBD', 'Partial', 'Partial', 'On Bench', 'Released', 'Mystery']
+        billable = [8, 8, 10, 3, 3, 0, 0, 100]
+        vacation = [2, 1.5, 0, 2, 1, 0, None, 0]
+
+        self.assertEqual(
+            list(rules.status(billing, billable, vacation, 10)),
+            ['close', 'open', 'close', 'close', 'open', 'close', 'close', 'open'],
+        )
+
+    def test_status_of_excluded_resources_and_without_total_days(self):
+        self.assertEqual(list(rules.status(['Billing', 'Billing'], [0, 0], [0, 0], 10, [True, False])), ['close', 'open'])
+        self.assertEqual(list(rules.status(['Billing', 'Non Billable'], [99, 0], [0, 0], None)), ['open', 'close'])
+
+    def test_clean_billing(self):
+        self.assertEqual(
+            list(rules.clean_billing([None, np.nan, '', 'None', ' Billing '])),
+            ['TBD', 'TBD', 'TBD', 'TBD', 'Billing'],
+        )
+
+    def test_excluded_ignores_case(self):
+        mask = rules.excluded(['A@X.com', None, 'b@x.com'], {' a@x.com ', ''})
+        self.assertEqual(list(mask), [True, False, False])
+
+
+class ExclusionTableMixin:
+    """Creates the unmanaged exclusion table, which the test database lacks, around the test class."""
+
+    @classmethod
+    def setUpClass(cls):
+        with connection.schema_editor() as editor:
+            editor.create_model(ExclusionTableModel)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            editor.delete_model(ExclusionTableModel)
+
+
+class SummaryAssertions:
+    """Checks that incrementally adjusted date summaries equal a rebuild."""
+
+    def summary(self, report_date):
+        return ReportDateSummaryModel.objects.filter(date=report_date).values(*SUMMARY_FIELDS).get()
+
+    def assertSummaryMatchesRefresh(self, *report_dates):
+        for report_date in report_dates:
+            adjusted = self.summary(report_date)
+            refresh_date_summary(report_date)
+            self.assertEqual(adjusted, self.summary(report_date), f"summary of {report_date}")
+
+
+class ApplyEditsTests(ExclusionTableMixin, SummaryAssertions, TestCase):
+    """apply_edits() re-derives edited rows, records their history and moves the summaries."""
+
+    def setUp(self):
+        UtilizationReportModel.objects.create(
+            date=WEEK_1, resource_email_address='a@x.com', billing='Billing',
+            billable_hours=2, total_logged=2, addtnl_days=3, status='open',
+        )
+        self.report = UtilizationReportModel.objects.create(
+            date=WEEK_2, resource_email_address='a@x.com', billing='Billing',
+            billable_hours=5, last_week=3, total_logged=8, addtnl_days=2, status='open',
+        )
+        self.other = UtilizationReportModel.objects.create(
+            date=WEEK_2, resource_email_address='b@x.com', billing='Billing',
+            addtnl_days=10, status='open', comments='waiting',
+        )
+        refresh_date_summary(WEEK_1)
+        refresh_date_summary(WEEK_2)
+
+    def edit(self, report, field, value):
+        return apply_edits([{'id': report.id, 'field': field, 'value': value}])
+
+    def test_billable_hours_edit_uses_the_previous_week(self):
+        result = self.edit(self.report, 'billable_hours', 6)
+
+        self.report.refresh_from_db()
+        self.assertEqual(
+            (self.report.last_week, self.report.total_logged, self.report.addtnl_days, self.report.status),
+            (3, 9, 1, 'open'),
+        )
+        self.assertEqual(result['rows'][0]['status_changed'], False)
+        self.assertEqual(
+            list(UtilizationHistoryModel.objects.values_list('action', 'details', 'previous_value', 'new_value')),
+            [('edited', 'Billable hours updated', '5.0', '6.0')],
+        )
+        self.assertEqual(result['counts'][WEEK_2.isoformat()]['open_count'], 2)
+        self.assertSummaryMatchesRefresh(WEEK_2)
+
+    def test_meeting_the_requirement_closes_the_case(self):
+        result = self.edit(self.report, 'billable_hours', 10)
+
+        self.report.refresh_from_db()
+        self.assertEqual((self.report.addtnl_days, self.report.status), (0, 'close'))
+        self.assertEqual(self.report.comments, '[Closed: Automatically closed - Required hours met]')
+        self.assertEqual(
+            list(UtilizationHistoryModel.objects.order_by('id').values_list('action', 'field_name')),
+            [('edited', 'billable_hours'), ('closed', 'status')],
+        )
+        self.assertEqual(result['counts'][WEEK_2.isoformat()]['handled_count'], 1)
+        self.assertEqual(self.summary(WEEK_2)['total_additional_days'], 10)
+        self.assertSummaryMatchesRefresh(WEEK_2)
+
+    def test_excluded_resource_closes_without_additional_days(self):
+        ExclusionTableModel.objects.create(exclusion_list='B@X.com')
+        self.edit(self.other, 'billable_hours', 1)
+
+        self.other.refresh_from_db()
+        self.assertEqual((self.other.total_logged, self.other.addtnl_days, self.other.status), (1, 0, 'close'))
+        self.assertSummaryMatchesRefresh(WEEK_2)
+
+    def test_zero_additional_days_closes_the_case(self):
+        self.edit(self.other, 'addtnl_days', 0)
+
+        self.other.refresh_from_db()
+        self.assertEqual((self.other.addtnl_days, self.other.status), (0, 'close'))
+        self.assertEqual(self.other.comments, 'waiting [Closed: Manually set additional days to 0]')
+        self.assertEqual(
+            UtilizationHistoryModel.objects.get(action='closed').details, 'Manually set additional days to 0'
+        )
+        self.assertEqual(self.summary(WEEK_2)['open_count'], 1)
+        self.assertSummaryMatchesRefresh(WEEK_2)
+
+    def test_comment_edit(self):
+        self.edit(self.other, 'spoc_comments', 'on leave')
+
+        self.other.refresh_from_db()
+        self.assertEqual((self.other.spoc_comments, self.other.status), ('on leave', 'open'))
+        self.assertEqual(UtilizationHistoryModel.objects.get().field_name, 'spoc_comments')
+        self.assertSummaryMatchesRefresh(WEEK_2)
+
+    def test_invalid_changes_save_nothing(self):
+        with self.assertRaises(EditError):
+            self.edit(self.report, 'status', 'close')
+        with self.assertRaises(EditError):
+            apply_edits([
+                {'id': self.other.id, 'field': 'addtnl_days', 'value': 0},
+                {'id': self.report.id, 'field': 'billable_hours', 'value': 'lots'},
+            ])
+        with self.assertRaises(UtilizationReportModel.DoesNotExist):
+            apply_edits([
+                {'id': self.other.id, 'field': 'addtnl_days', 'value': 0},
+                {'id': 0, 'field': 'addtnl_days', 'value': 0},
+            ])
+
+        self.other.refresh_from_db()
+        self.assertEqual((self.other.addtnl_days, self.other.status), (10, 'open'))
+        self.assertFalse(UtilizationHistoryModel.objects.exists())
+
+
+class CloseOpenCasesTests(SummaryAssertions, TestCase):
+    """close_open_cases() closes only open cases, appending the reason to their comments."""
+
+    def setUp(self):
+        self.chased = UtilizationReportModel.objects.create(
+            date=WEEK_1, resource_email_address='a@x.com', status='open', comments='chased', addtnl_days=2,
+        )
+        self.silent = UtilizationReportModel.objects.create(
+            date=WEEK_2, resource_email_address='b@x.com', status='open', comments='',
+        )
+        self.closed = UtilizationReportModel.objects.create(
+            date=WEEK_2, resource_email_address='c@x.com', status='close', comments='done',
+        )
+        refresh_date_summary(WEEK_1)
+        refresh_date_summary(WEEK_2)
+
+    def test_closes_the_open_cases(self):
+        closed = close_open_cases([self.chased.id, self.silent.id, self.closed.id, 0], 'Left project')
+
+        self.assertEqual(closed, 2)
+        self.assertEqual(
+            dict(UtilizationReportModel.objects.values_list('resource_email_address', 'comments')),
+            {'a@x.com': 'chased [Closed: Left project]', 'b@x.com': '[Closed: Left project]', 'c@x.com': 'done'},
+        )
+        self.assertEqual(set(UtilizationReportModel.objects.values_list('status', flat=True)), {'close'})
+        self.assertEqual(
+            sorted(UtilizationHistoryModel.objects.values_list('resource_email', 'report_date', 'action', 'details')),
+            [
+                ('a@x.com', WEEK_1, 'closed', 'Case closed with reason: Left project'),
+                ('b@x.com', WEEK_2, 'closed', 'Case closed with reason: Left project'),
+            ],
+        )
+        self.assertEqual((self.summary(WEEK_2)['open_count'], self.summary(WEEK_2)['handled_count']), (0, 1))
+        self.assertSummaryMatchesRefresh(WEEK_1, WEEK_2)
+
+    def test_nothing_open(self):
+        self.assertEqual(close_open_cases([self.closed.id], 'Left project'), 0)
+
+        self.assertFalse(UtilizationHistoryModel.objects.exists())
+        self.assertEqual(UtilizationReportModel.objects.get(id=self.closed.id).comments, 'done')
+        self.assertSummaryMatchesRefresh(WEEK_2)
+
+
+class CascadeLaterWeeksTests(ExclusionTableMixin, SummaryAssertions, TestCase):
+    """Changed additional days are carried into the later weeks of the month."""
+
+    def setUp(self):
+        # a@x.com falls 5, 3 and 2 days short in weeks 1 to 3
+        self.weeks = [
+            UtilizationReportModel.objects.create(
+                date=report_date, resource_email_address='a@x.com', billing='Billing', status='open',
+                billable_hours=billable, last_week=last_week, total_logged=billable + last_week, addtnl_days=added,
+            )
+            for report_date, billable, last_week, added in (
+                (WEEK_1, 0, 0, 5), (WEEK_2, 2, 5, 3), (WEEK_3, 10, 3, 2),
+            )
+        ]
+        UtilizationReportModel.objects.create(
+            date=WEEK_2, resource_email_address='b@x.com', billing='Billing', status='open',
+            billable_hours=4, total_logged=4, addtnl_days=6,
+        )
+        UtilizationReportModel.objects.create(
+            date=date(2025, 4, 4), resource_email_address='a@x.com', billing='Billing', status='open', addtnl_days=5,
+        )
+        for report_date in (WEEK_1, WEEK_2, WEEK_3):
+            refresh_date_summary(report_date)
+
+    def carried(self, email='a@x.com'):
+        return list(
+            UtilizationReportModel.objects.filter(resource_email_address=email).order_by('date')
+            .values_list('date', 'last_week', 'total_logged', 'addtnl_days', 'status')
+        )
+
+    def test_edit_is_carried_into_later_weeks(self):
+        result = apply_edits([{'id': self.weeks[0].id, 'field': 'billable_hours', 'value': 5}])
+
+        self.assertEqual(result['cascaded_rows'], 2)
+        self.assertEqual(self.carried(), [
+            (WEEK_1, 0, 5, 0, 'close'),
+            (WEEK_2, 0, 2, 8, 'open'),
+            (WEEK_3, 8, 18, 0, 'open'),
+            (date(2025, 4, 4), 0, 0, 5, 'open'),
+        ])
+        self.assertEqual(self.carried('b@x.com'), [(WEEK_2, 0, 4, 6, 'open')])
+        self.assertEqual(
+            list(UtilizationHistoryModel.objects.order_by('id').values_list('resource_email', 'report_date', 'action')),
+            [('a@x.com', WEEK_1, 'edited'), ('a@x.com', WEEK_1, 'closed')],
+        )
+        self.assertEqual(self.summary(WEEK_2)['total_additional_days'], 14)
+        self.assertSummaryMatchesRefresh(WEEK_1, WEEK_2, WEEK_3)
+
+        # The cascade leaves nothing for a recompute to change
+        self.assertEqual([recompute_date(report_date) for report_date in (WEEK_1, WEEK_2, WEEK_3)], [0, 0, 0])
+
+    def test_rows_edited_in_the_same_batch_are_kept(self):
+        result = apply_edits([
+            {'id': self.weeks[0].id, 'field': 'billable_hours', 'value': 5},
+            {'id': self.weeks[1].id, 'field': 'addtnl_days', 'value': 4},
+        ])
+
+        self.assertEqual(result['cascaded_rows'], 1)
+        self.assertEqual(self.carried()[1:3], [(WEEK_2, 5, 7, 4, 'open'), (WEEK_3, 4, 14, 1, 'open')])
+        self.assertSummaryMatchesRefresh(WEEK_1, WEEK_2, WEEK_3)
+
+    def test_unchanged_additional_days_are_not_carried(self):
+        result = apply_edits([{'id': self.weeks[0].id, 'field': 'comments', 'value': 'on it'}])
+
+        self.assertEqual(result['cascaded_rows'], 0)
+        self.assertEqual(self.carried()[1:3], [(WEEK_2, 5, 7, 3, 'open'), (WEEK_3, 3, 13, 2, 'open')])
+
+    def test_recompute_carries_rederived_days(self):
+        UtilizationReportModel.objects.filter(id=self.weeks[0].id).update(billable_hours=4)
+
+        self.assertEqual(recompute_date(WEEK_1), 1)
+        self.assertEqual(self.carried()[:3], [
+            (WEEK_1, 0, 4, 1, 'open'),
+            (WEEK_2, 1, 3, 7, 'open'),
+            (WEEK_3, 7, 17, 0, 'open'),
+        ])
+        self.assertSummaryMatchesRefresh(WEEK_2, WEEK_3)
+
+
+class StreamingReaderParityTests(SimpleTestCase):
+    """The streaming reader yields the frames of the pandas read_excel + filter path."""
+
+    wtd_rows = [
+        ['Asha Rao', 'M One', 'North', 40, 32, 0.8, 504686],
+        ['Ben Li', 'M One', 'North', 40, 40.5, 1.0125, '504686'],
+        ['Other Team', 'M Two', 'South', 40, 10, 0.25, 111111],
+        ['Cara Diaz', None, 'North', 20.0, None, None, ' 504686 '],
+        [None, None, None, None, None, None, None],
+        ['No Center', 'M Two', 'South', 40, 40, 1, None],
+    ]
+    mtd_rows = [
+        ['asha.rao@x.com', 'P1', 'Alpha', 'Billable', 'North', 32, 504686],
+        ['ben.li@x.com', 'P2', 'Beta', 'Non Billable', 'North', 40.5, 504686.0],
+        ['ben.li@x.com', 'P3', 'Gamma', 'Billable', 'North', None, 504686],
+        ['other@x.com', 'P4', 'Delta', 'Billable', 'South', 8, 222222],
+        ['cara.diaz@x.com', None, None, None, 'North', 16, '504686'],
+    ]
+
+    def parse(self, path, streaming):
+        generator = UtilizationReportGenerator(path, streaming=streaming, use_cache=False)
+        generator.process_report()
+        return generator
+
+    def assertSameFrames(self, path):
+        streamed, read = self.parse(path, True), self.parse(path, False)
+        self.assertTrue(streamed.use_streaming_reader)
+        self.assertFalse(read.use_streaming_reader)
+        for sheet in ('WTD', 'MTD'):
+            pd.testing.assert_frame_equal(
+                streamed.dfs[sheet].reset_index(drop=True), read.dfs[sheet].reset_index(drop=True), obj=sheet
+            )
+        return streamed
+
+    def test_frames_match_the_pandas_reader(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_input_workbook(os.path.join(tmp, 'util_7Mar2025.xlsx'), self.wtd_rows, self.mtd_rows)
+            streamed = self.assertSameFrames(path)
+
+        self.assertEqual(list(streamed.dfs['WTD']['Consultant Name']), ['Asha Rao', 'Ben Li', 'Cara Diaz'])
+        self.assertEqual(set(streamed.dfs['WTD']['CC']), {TARGET_COST_CENTER})
+        # The blank March hours row is dropped after the filter
+        self.assertEqual(list(streamed.dfs['MTD']['Resource Email Address']),
+                         ['asha.rao@x.com', 'ben.li@x.com', 'cara.diaz@x.com'])
+        self.assertEqual(streamed.row_counts['WTD'], {'read': 6, 'kept': 3})
+        self.assertEqual(streamed.row_counts['Consultant Summary'], {'read': 5, 'kept': 4})
+
+    def test_header_found_further_down(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_input_workbook(
+                os.path.join(tmp, 'util_7Mar2025.xlsx'), self.wtd_rows, self.mtd_rows, title_rows=HEADER_SCAN_ROWS - 1
+            )
+            self.assertSameFrames(path)
+
+    def test_header_beyond_the_scanned_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_input_workbook(
+                os.path.join(tmp, 'util_7Mar2025.xlsx'), self.wtd_rows, self.mtd_rows, title_rows=HEADER_SCAN_ROWS
+            )
+            for streaming in (True, False):
+                with self.assertRaisesMessage(ValueError, "Header containing 'Consultant Name' not found in WTD"), \
+                        self.assertLogs('util_report.new_main', 'ERROR'):
+                    self.parse(path, streaming)
+
+
+class ParseCacheTests(SimpleTestCase):
+    """Cached frames equal a fresh parse; the key follows the config; eviction keeps the cache in bounds."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = write_input_workbook(
+            os.path.join(self.tmp.name, 'util_7Mar2025.xlsx'),
+            StreamingReaderParityTests.wtd_rows, StreamingReaderParityTests.mtd_rows,
+        )
+        self.cache_dir = os.path.join(self.tmp.name, 'parse_cache')
+
+    def parse(self, use_cache=True):
+        generator = UtilizationReportGenerator(self.path, use_cache=use_cache)
+        generator.process_report()
+        return generator
+
+    def test_hit_returns_the_parsed_frames(self):
+        with override_settings(PARSE_CACHE_DIR=self.cache_dir):
+            first, second = self.parse(), self.parse()
+        fresh = self.parse(use_cache=False)
+
+        self.assertEqual((first.cache_hit, second.cache_hit), (False, True))
+        self.assertEqual(first.cache_key, second.cache_key)
+        for sheet in ('WTD', 'MTD'):
+            pd.testing.assert_frame_equal(
+                second.dfs[sheet].reset_index(drop=True), fresh.dfs[sheet].reset_index(drop=True), obj=sheet
+            )
+        self.assertEqual(second.row_counts, fresh.row_counts)
+
+    def test_key_follows_the_workbook_and_config(self):
+        generator = UtilizationReportGenerator(self.path)
+        generator.parse_date_from_filename()
+        generator.initialize_column_mapping()
+        config = generator.parse_cache_config()
+        key = ParseCache.make_key(self.path, config)
+
+        self.assertEqual(ParseCache.make_key(self.path, generator.parse_cache_config()), key)
+        self.assertNotEqual(ParseCache.make_key(self.path, {**config, 'cost_center': '999999'}), key)
+        mapping = {**config['column_mapping'], 'WTD': {**config['column_mapping']['WTD'], 'cc_column': 'Cost Center'}}
+        self.assertNotEqual(ParseCache.make_key(self.path, {**config, 'column_mapping': mapping}), key)
+
+        other = write_input_workbook(os.path.join(self.tmp.name, 'util_14Mar2025.xlsx'),
+                                     StreamingReaderParityTests.wtd_rows[:2], StreamingReaderParityTests.mtd_rows)
+        self.assertNotEqual(ParseCache.make_key(other, config), key)
+
+    def test_changed_cost_center_misses(self):
+        with override_settings(PARSE_CACHE_DIR=self.cache_dir):
+            self.parse()
+            with mock.patch('util_report.new_main.TARGET_COST_CENTER', '111111'):
+                generator = self.parse()
+
+        self.assertFalse(generator.cache_hit)
+        self.assertEqual(list(generator.dfs['WTD']['Consultant Name']), ['Other Team'])
+
+    def test_eviction_drops_the_least_recently_used(self):
+        frames = {'WTD': pd.DataFrame({'a': range(100)})}
+        with override_settings(PARSE_CACHE_DIR=self.cache_dir):
+            cache = ParseCache()
+            cache.put('a', frames)
+            entry_size = cache.stats()['size_bytes']
+
+        with override_settings(PARSE_CACHE_DIR=self.cache_dir, PARSE_CACHE_MAX_BYTES=entry_size * 5 // 2):
+            cache.put('b', frames)
+            now = time.time()
+            os.utime(os.path.join(self.cache_dir, 'a'), (now - 100, now - 100))
+            os.utime(os.path.join(self.cache_dir, 'b'), (now - 50, now - 50))
+            self.assertIsNotNone(cache.get('a'))
+            cache.put('c', frames)
+
+            self.assertEqual(sorted(os.listdir(self.cache_dir)), ['a', 'c'])
+            self.assertLessEqual(cache.stats()['size_bytes'], cache.max_bytes)
+            self.assertIsNone(cache.get('b'))
+
+
+class IngestionQueueTests(TestCase):
+    """Claiming, requeueing and finishing ingestion jobs."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=self.tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def upload(self, name):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(b'not a workbook')
+        return path
+
+    def test_a_job_is_claimed_once(self):
+        job = enqueue_ingestion(self.upload('util_7Mar2025.xlsx'), report_date=WEEK_1)
+
+        claimed = claim_next_job(worker='w1')
+        self.assertEqual((claimed.pk, claimed.status, claimed.attempts, claimed.worker), (job.pk, 'running', 1, 'w1'))
+        self.assertIsNone(claim_next_job(worker='w2'))
+
+    def test_stale_jobs_are_requeued_until_max_attempts(self):
+        job = enqueue_ingestion(self.upload('util_7Mar2025.xlsx'))
+        fresh = enqueue_ingestion(self.upload('util_14Mar2025.xlsx'))
+        claim_next_job()
+        claim_next_job()
+        IngestionJobModel.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=11))
+
+        with self.assertLogs('util_report.jobs', 'WARNING'):
+            self.assertEqual(requeue_stale_jobs(timedelta(minutes=10)), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.stage, job.attempts), ('queued', 'queued', 1))
+        self.assertEqual(IngestionJobModel.objects.get(pk=fresh.pk).status, 'running')
+
+        IngestionJobModel.objects.filter(pk=job.pk).update(
+            status='running', attempts=MAX_ATTEMPTS, heartbeat_at=timezone.now() - timedelta(minutes=11)
+        )
+        with self.assertLogs('util_report.jobs', 'WARNING'):
+            self.assertEqual(requeue_stale_jobs(timedelta(minutes=10)), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.message), ('failed', 'Worker stopped responding'))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failed_job_records_its_message_and_keeps_the_upload(self):
+        path = self.upload('weekly.xlsx')
+        enqueue_ingestion(path)
+
+        with self.assertLogs('util_report', 'ERROR'):
+            job = run_ingestion_job(claim_next_job())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn("Filename does not contain a valid date", job.message)
+        self.assertTrue(os.path.exists(path))
+
+    def test_loaded_date_waits_for_confirmation(self):
+        UtilizationReportModel.objects.create(date=WEEK_1, resource_email_address='a@x.com')
+        path = self.upload('util_7Mar2025.xlsx')
+        enqueue_ingestion(path, report_date=WEEK_1)
+
+        job = run_ingestion_job(claim_next_job())
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.report_date), ('needs_confirmation', WEEK_1))
+        self.assertIn('2025-03-07 is already loaded', job.message)
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(UtilizationReportModel.objects.count(), 1)
+
+    def test_stale_uploads_are_removed_unless_in_use(self):
+        kept, stale = self.upload('util_7Mar2025.xlsx'), self.upload('util_14Mar2025.xlsx')
+        long_ago = timezone.now() - timedelta(days=2)
+        for path in (kept, stale):
+            IngestionJobModel.objects.create(file_path=path, status='failed', finished_at=long_ago)
+        IngestionJobModel.objects.create(file_path=kept, status='queued', replace_existing=True)
+        IngestionJobModel.objects.create(file_path=self.upload('util_21Mar2025.xlsx'), status='failed',
+                                         finished_at=timezone.now())
+
+        self.assertEqual(remove_stale_uploads(), 1)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['util_21Mar2025.xlsx', 'util_7Mar2025.xlsx'])
+
+
+class RecordBuilderParityTests(SimpleTestCase):
+    """The columnar record builder produces the rows of the iterrows() builder it replaced."""
+
+    def test_rows_match_the_legacy_builder(self):
+        merged, wtd = synthetic_report(400, seed=7)
+        # Mixed-case emails, rows without one, NaN hours and text, and resources missing from WTD
+        merged.loc[::5, 'Resource Email Address'] = merged.loc[::5, 'Resource Email Address'].str.upper()
+        merged.loc[3, 'Resource Email Address'] = ''
+        merged.loc[4, 'Resource Email Address'] = None
+        merged.loc[::7, 'Vacation'] = np.nan
+        merged.loc[::11, 'Billing'] = np.nan
+        merged.loc[::13, 'Track'] = ''
+        merged.loc[::17, 'Status'] = None
+        merged.loc[::19, 'comments'] = None
+        wtd = wtd.iloc[::2]
+        constants = {'dams_utilization': np.float64(80.5), 'capable_utilization': 85.0, 'total_capacity': 4000.0}
+
+        columns, rows = build_report_records(merged, wtd, WEEK_1, constants)
+        legacy = [
+            tuple(getattr(record, field.attname) for field in report_columns())
+            for record in legacy_records(merged, wtd, WEEK_1, constants)
+        ]
+
+        self.assertEqual(columns, [field.column for field in report_columns()])
+        self.assertEqual(len(rows), 398)
+        self.assertEqual(rows, legacy)
+
+
+class ReportPageTests(TestCase):
+    """Keyset pages walked through next_cursor equal the OFFSET pages and cover every row once."""
+
+    fields = ['resource_email_address', 'billable_hours', 'rdm']
+
+    def setUp(self):
+        hours = [0, 8, 8, 16, 40, 8, 0, 24]
+        rdms = ['Priya', None, 'Adam', '', None, 'Adam', 'Zoe']
+        for index in range(23):
+            UtilizationReportModel.objects.create(
+                date=WEEK_1, resource_email_address=f'r{(index * 7) % 23:02d}@x.com',
+                billable_hours=hours[index % len(hours)], rdm=rdms[index % len(rdms)],
+            )
+        UtilizationReportModel.objects.create(date=WEEK_2, resource_email_address='r00@x.com')
+
+    def keyset_pages(self, length, **options):
+        pages, cursor = [], None
+        while True:
+            page = report_page(WEEK_1, self.fields, length=length, cursor=cursor, **options)
+            pages.append(page['rows'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return pages
+
+    def offset_pages(self, length, **options):
+        return [
+            report_page(WEEK_1, self.fields, length=length, start=start, **options)['rows']
+            for start in range(0, 23, length)
+        ]
+
+    def test_keyset_pages_match_offset_pages(self):
+        ids = set(UtilizationReportModel.objects.filter(date=WEEK_1).values_list('id', flat=True))
+        for sort_field in ('billable_hours', 'rdm', 'resource_email_address'):
+            for descending in (False, True):
+                for length in (5, 23):
+                    with self.subTest(sort_field=sort_field, descending=descending, length=length):
+                        options = {'sort_field': sort_field, 'descending': descending}
+                        keyset = [row for page in self.keyset_pages(length, **options) for row in page]
+                        offset = [row for page in self.offset_pages(length, **options) for row in page]
+
+                        self.assertEqual(keyset, offset)
+                        self.assertEqual(len(keyset), 23)
+                        self.assertEqual({row[0] for row in keyset}, ids)
+
+    def test_order_breaks_ties_by_email(self):
+        rows = [row for page in self.keyset_pages(5, sort_field='rdm') for row in page]
+        expected = sorted(rows, key=lambda row: (row[3] or '', row[1]))
+        self.assertEqual(rows, expected)
+
+        rows = [row for page in self.keyset_pages(5, sort_field='billable_hours', descending=True) for row in page]
+        expected = sorted(rows, key=lambda row: (row[2], row[1]), reverse=True)
+        self.assertEqual(rows, expected)
+
+    def test_filtered_pages(self):
+        page = report_page(WEEK_1, self.fields, sort_field='billable_hours', filters={'rdm': 'Adam'}, length=2)
+        rows = page['rows'] + report_page(
+            WEEK_1, self.fields, sort_field='billable_hours', filters={'rdm': 'Adam'}, length=50,
+            cursor=page['next_cursor'],
+        )['rows']
+
+        self.assertEqual((page['total'], page['filtered']), (23, 6))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual({row[3] for row in rows}, {'Adam'})
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'reports': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'report-cache-tests'},
+})
+class ReportCacheInvalidationTests(ExclusionTableMixin, TestCase):
+    """Edits give the touched dates a new version stamp, so their cached pages are rebuilt."""
+
+    def setUp(self):
+        report_cache.cache.clear()
+        self.report = UtilizationReportModel.objects.create(
+            date=WEEK_1, resource_email_address='a@x.com', billing='Billing', addtnl_days=5, status='open',
+        )
+        UtilizationReportModel.objects.create(
+            date=WEEK_2, resource_email_address='a@x.com', billing='Billing', last_week=5, total_logged=5,
+            addtnl_days=5, status='open',
+        )
+        UtilizationReportModel.objects.create(date=WEEK_3, resource_email_address='b@x.com', status='open')
+        self.builds = []
+
+    def cached(self, kind, report_date):
+        def build():
+            self.builds.append((kind, report_date))
+            return list(UtilizationReportModel.objects.filter(date=report_date)
+                        .order_by('id').values_list('addtnl_days', 'status', 'comments'))
+        return report_cache.get_or_build(kind, report_date, build)
+
+    def warm(self):
+        pages = {(kind, day): self.cached(kind, day) for kind in ('rows', 'leakage') for day in (WEEK_1, WEEK_2, WEEK_3)}
+        for (kind, day), page in pages.items():
+            self.assertEqual(self.cached(kind, day), page)
+        self.builds.clear()
+        return {day: report_cache.version(day) for day in (WEEK_1, WEEK_2, WEEK_3)}
+
+    def test_edits_rebuild_the_pages_of_the_dates_they_touch(self):
+        versions = self.warm()
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_edits([{'id': self.report.id, 'field': 'billable_hours', 'value': 5}])
+
+        # The edited week and the week the new additional days were carried into
+        self.assertNotEqual(report_cache.version(WEEK_1), versions[WEEK_1])
+        self.assertNotEqual(report_cache.version(WEEK_2), versions[WEEK_2])
+        self.assertEqual(report_cache.version(WEEK_3), versions[WEEK_3])
+        self.assertEqual(self.cached('rows', WEEK_1)[0][:2], (0, 'close'))
+        self.assertEqual(self.cached('leakage', WEEK_2)[0][0], 10)
+        self.cached('rows', WEEK_3)
+        self.assertEqual(self.builds, [('rows', WEEK_1), ('leakage', WEEK_2)])
+
+    def test_closing_cases_rebuilds_their_pages(self):
+        versions = self.warm()
+        with self.captureOnCommitCallbacks(execute=True):
+            close_open_cases([self.report.id], 'Left project')
+
+        self.assertNotEqual(report_cache.version(WEEK_1), versions[WEEK_1])
+        self.assertEqual(report_cache.version(WEEK_2), versions[WEEK_2])
+        self.assertEqual(self.cached('leakage', WEEK_1), [(5, 'close', '[Closed: Left project]')])
+        self.cached('leakage', WEEK_2)
+        self.assertEqual(self.builds, [('leakage', WEEK_1)])
+
+
+# The download_report layout before the shared export engine: numbers rounded to two
+# places, blanks replaced, and each width the longest str() of header and cells + 3
+BASELINE_REPORT_COLUMNS = [
+    ('resource_email_address', 'Resource Email Address', None),
+    ('administrative', 'Administrative', 0), ('billable_hours', 'Billable Hours', 0),
+    ('department_mgmt', 'Department Mgmt', 0), ('training', 'Training', 0), ('unassigned', 'Unassigned', 0),
+    ('vacation', 'Vacation', 0), ('grand_total', 'Grand Total', 0), ('last_week', 'Last Week', 0),
+    ('total_logged', 'Total Logged', 0), ('addtnl_days', 'Additional Days', 0), ('wtd_actuals', 'WTD Actuals', 0),
+    ('rdm', 'RDM', ''), ('track', 'Track', ''), ('billing', 'Billing', 'TBD'), ('status', 'Status', 'open'),
+    ('comments', 'Comments', ''), ('spoc_comments', 'SPOC Comments', ''),
+]
+
+
+def baseline_report_layout(reports):
+    """(headers, rows, widths) of the old download_report for reports."""
+    headers = [header for _, header, _ in BASELINE_REPORT_COLUMNS]
+    rows = []
+    for report in reports:
+        row = []
+        for field, _, default in BASELINE_REPORT_COLUMNS:
+            value = getattr(report, field)
+            if default == 0:
+                value = round(float(value or 0), 2)
+            elif default is not None:
+                value = value or default
+            row.append(value)
+        rows.append(row)
+    widths = [
+        max([len(str(header))] + [len(str(row[index])) for row in rows if row[index] is not None]) + 3
+        for index, header in enumerate(headers)
+    ]
+    return headers, rows, widths
+
+
+class ReportDownloadTests(TestCase):
+    """The streamed download_report workbook keeps the layout of the original export."""
+
+    def setUp(self):
+        rows = [
+            ('a.long.resource.name@example.com', {'vacation': 1234567.125, 'billable_hours': 7.255, 'billing': None,
+                                                   'status': '', 'comments': 'Chased <twice> & waiting'}),
+            ('b@x.com', {'administrative': 1 / 3, 'grand_total': 40, 'rdm': 'Priya', 'track': 'Finance and HCM',
+                         'billing': '', 'spoc_comments': None}),
+            ('c@x.com', {'last_week': -2.5, 'addtnl_days': 12, 'wtd_actuals': 4.999, 'billing': 'Non Billable',
+                         'status': 'close', 'comments': None}),
+        ]
+        for email, values in rows:
+            UtilizationReportModel.objects.create(date=WEEK_1, resource_email_address=email, **values)
+        UtilizationReportModel.objects.create(date=WEEK_2, resource_email_address='z' * 60 + '@x.com')
+
+    def download(self):
+        # The layout does not depend on the logo, which needs Pillow to embed
+        with mock.patch('util_report.excel_export.logo_path', return_value=os.path.join(self.id(), 'missing.png')):
+            response = self.client.get(reverse('download_report'), {'date': WEEK_1.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        return load_workbook(BytesIO(b''.join(response.streaming_content)))['Full Report']
+
+    def test_matches_the_baseline_layout(self):
+        sheet = self.download()
+        headers, rows, widths = baseline_report_layout(
+            UtilizationReportModel.objects.filter(date=WEEK_1).order_by('resource_email_address')
+        )
+
+        self.assertEqual(sheet.cell(row=1, column=2).value, 'Confidential - Oracle Restricted')
+        self.assertEqual([cell.value for cell in sheet[3]], headers)
+        # Empty strings are saved as empty cells, which read back as None
+        self.assertEqual(
+            [list(row) for row in sheet.iter_rows(min_row=4, values_only=True)],
+            [[None if value == '' else value for value in row] for row in rows],
+        )
+        self.assertEqual(
+            [sheet.column_dimensions[get_column_letter(index)].width for index in range(1, len(headers) + 1)],
+            widths,
+        )
+
+    def test_widths_count_the_written_values(self):
+        reports = UtilizationReportModel.objects.filter(
+            date=WEEK_1, resource_email_address__in=['a.long.resource.name@example.com', 'b@x.com']
+        )
+
+        self.assertEqual(width_from_queryset(reports, ['billing', 'status']), [0, 4])
+        self.assertEqual(
+            width_from_queryset(
+                reports, ['billing', 'status', 'vacation'], defaults={'billing': 'TBD', 'status': 'open'},
+                formatters={'vacation': lambda value: round(float(value or 0), 2)},
+            ),
+            [3, 4, 10],
+        )
+
+
+class ResultStoreTests(TestCase):
+    """Upload results are stored under random tokens and expire after the TTL."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = ResultStore(root=self.tmp.name, ttl=60)
+        self.frame = pd.DataFrame({
+            'resource_email_address': ['a@x.com', 'b@x.com'],
+            'billable_hours': [8.5, np.nan],
+            'addtnl_days': [0, 3],
+            'comments': ['', None],
+        })
+
+    def age(self, token, seconds):
+        then = time.time() - seconds
+        os.utime(self.store.path(token), (then, then))
+
+    def test_round_trip(self):
+        token = self.store.put(self.frame)
+
+        self.assertRegex(token, r'^[A-Za-z0-9_-]{32}$')
+        self.assertEqual(os.listdir(self.tmp.name), [f'{token}.parquet'])
+        pd.testing.assert_frame_equal(self.store.get(token), self.frame)
+        self.assertNotEqual(self.store.put(self.frame), token)
+
+    def test_only_store_tokens_are_accepted(self):
+        for token in (None, '', 'short', '../' + 'a' * 29, 'a' * 31 + '/', 'a' * 33, 'a' * 31 + '.'):
+            with self.subTest(token=token):
+                with self.assertRaises(ValueError):
+                    self.store.path(token)
+                self.assertIsNone(self.store.get(token))
+        self.assertIsNone(self.store.get('a' * 32))
+
+    def test_results_expire_after_the_ttl(self):
+        old, fresh = self.store.put(self.frame), self.store.put(self.frame)
+        self.age(old, 61)
+
+        self.assertIsNone(self.store.get(old))
+        self.assertFalse(os.path.exists(self.store.path(old)))
+        self.assertIsNotNone(self.store.get(fresh))
+
+    def test_put_purges_expired_results(self):
+        old = self.store.put(self.frame)
+        self.age(old, 61)
+        fresh = self.store.put(self.frame)
+
+        self.assertEqual(os.listdir(self.tmp.name), [f'{fresh}.parquet'])
+        self.assertEqual(self.store.purge_expired(), 0)
+
+    def test_download_serves_the_session_result(self):
+        with override_settings(RESULT_STORE_DIR=self.tmp.name), \
+                mock.patch('util_report.excel_export.logo_path', return_value=os.path.join(self.tmp.name, 'none.png')):
+            self.assertEqual(self.client.get(reverse('download_result')).status_code, 404)
+
+            session = self.client.session
+            session['result_token'] = result_store.put(self.frame)
+            session.save()
+            response = self.client.get(reverse('download_result'))
+            self.assertEqual(response.status_code, 200)
+            sheet = load_workbook(BytesIO(b''.join(response.streaming_content)))['Utilization Report']
+
+        self.assertEqual([cell.value for cell in sheet[3]], ['Resource Email Address', 'Billable Hours', 'Addtnl Days'])
+        self.assertEqual([row[0] for row in sheet.iter_rows(min_row=4, values_only=True)], ['a@x.com', 'b@x.com'])
+
+
+class RangeExportTests(TestCase):
+    """export_range in each format, read back, with the rdm / track / billing filters."""
+
+    def setUp(self):
+        for report_date in (WEEK_1, WEEK_2, WEEK_3, date(2025, 4, 4)):
+            for index in range(6):
+                UtilizationReportModel.objects.create(
+                    date=report_date, resource_email_address=f'r{index}@x.com', billable_hours=index * 1.005,
+                    rdm=('Adam', 'Priya', None)[index % 3], track=('HCM', 'Finance')[index % 2],
+                    billing=('Billing', None)[index % 2],
+                )
+
+    def export(self, export_format, **filters):
+        with mock.patch('util_report.excel_export.logo_path', return_value=os.path.join(self.id(), 'missing.png')):
+            response = self.client.get(reverse('export_range'), {
+                'start': '2025-03-01', 'end': '2025-03-31', 'format': export_format, **filters,
+            })
+            self.assertEqual(response.status_code, 200)
+            return b''.join(response.streaming_content)
+
+    def test_csv(self):
+        rows = list(csv.reader(StringIO(self.export('csv').decode('utf-8'))))
+
+        self.assertEqual(rows[0], ['Date', *EXPORT_HEADERS])
+        self.assertEqual(len(rows), 1 + 18)
+        self.assertEqual([row[0] for row in rows[1:]], ['2025-03-07'] * 6 + ['2025-03-14'] * 6 + ['2025-03-21'] * 6)
+        self.assertEqual(rows[2][1:], ['r1@x.com', '0.0', '1.0', '0.0', '0.0', '0.0', '0.0', '0.0', '0.0', '0.0',
+                                       '0.0', '0.0', 'Priya', 'Finance', 'TBD', 'open', '', ''])
+
+    def test_parquet(self):
+        frame = pd.read_parquet(BytesIO(self.export('parquet')))
+
+        self.assertEqual(list(frame.columns), ['date', *EXPORT_FIELDS])
+        self.assertEqual(len(frame), 18)
+        self.assertEqual(sorted(set(frame['date'])), [WEEK_1, WEEK_2, WEEK_3])
+        self.assertEqual(list(frame['billable_hours'][:3]), [0.0, 1.0, 2.01])
+
+    def test_xlsx_has_one_sheet_per_week(self):
+        workbook = load_workbook(BytesIO(self.export('xlsx')))
+
+        self.assertEqual(workbook.sheetnames, ['2025-03-07', '2025-03-14', '2025-03-21'])
+        for sheet in workbook:
+            self.assertEqual([cell.value for cell in sheet[3]], EXPORT_HEADERS)
+            self.assertEqual([row[0] for row in sheet.iter_rows(min_row=4, values_only=True)],
+                             [f'r{index}@x.com' for index in range(6)])
+
+    def test_filters(self):
+        rows = list(csv.reader(StringIO(self.export('csv', rdm='Adam').decode('utf-8'))))[1:]
+        self.assertEqual({(row[1], row[13]) for row in rows}, {('r0@x.com', 'Adam'), ('r3@x.com', 'Adam')})
+        self.assertEqual(len(rows), 6)
+
+        frame = pd.read_parquet(BytesIO(self.export('parquet', track='HCM', billing='Billing')))
+        self.assertEqual(sorted(set(frame['resource_email_address'])), ['r0@x.com', 'r2@x.com', 'r4@x.com'])
+        self.assertEqual(len(frame), 9)
+
+        workbook = load_workbook(BytesIO(self.export('xlsx', rdm='Priya', track='Finance')))
+        self.assertEqual([sheet.max_row for sheet in workbook], [4, 4, 4])
+
+    def test_keyset_chunks_read_every_row_once(self):
+        queryset = range_queryset(WEEK_1, date(2025, 4, 30))
+        expected = list(queryset.values_list('date', 'resource_email_address'))
+        for chunk_size in (1, 5, 6, 24, 100):
+            self.assertEqual(list(iter_keyset(queryset, ('date', 'resource_email_address'), chunk_size)), expected)
+
+    def test_invalid_requests(self):
+        url = reverse('export_range')
+        self.assertEqual(self.client.get(url, {'start': '2025-03-01', 'end': '2025-03-31', 'format': 'json'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start': '2025-03-31', 'end': '2025-03-01'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start': '2025-05-01', 'end': '2025-05-31'}).status_code, 404)
+
+
+class TableParser(HTMLParser):
+    """Reads a rendered table into its attributes, headers and rows, with entities decoded."""
+
+    def __init__(self, markup):
+        super().__init__()
+        self.table, self.headers, self.rows, self.cell = None, [], [], None
+        self.feed(markup)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: set(value.split()) if name == 'class' else value for name, value in attrs}
+        if tag == 'table':
+            self.table = attrs
+        elif tag == 'tr' and self.table is not None and self.headers:
+            self.rows.append((attrs, []))
+        elif tag in ('th', 'td'):
+            self.cell = (attrs, [])
+
+    def handle_endtag(self, tag):
+        if tag in ('th', 'td'):
+            attrs, text = self.cell
+            (self.headers if tag == 'th' else self.rows[-1][1]).append((attrs, ''.join(text)))
+            self.cell = None
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell[1].append(data)
+
+
+def baseline_table(frame, columns, table_id=None, row_ids=None, **to_html):
+    """
+    What the pages rendered before render_table(): DataFrame.to_html(), then the
+    BeautifulSoup pass adding the table id, row data-id and cell data-* attributes.
+    The data-* attributes go on their own columns (the old pass put them three
+    cells early) and right-aligned cells get text-end, as render_table() intends.
+    """
+    table = TableParser(frame.to_html(classes='table table-hover table-striped', index=False, **to_html))
+    if table_id:
+        table.table['id'] = table_id
+    for index, (row_attrs, cells) in enumerate(table.rows):
+        if row_ids is not None:
+            row_attrs['data-id'] = str(row_ids[index])
+        for column, (cell_attrs, text) in zip(columns, cells):
+            if column.align == 'right':
+                cell_attrs['class'] = {'text-end'}
+            if column.data_attribute:
+                cell_attrs[f'data-{column.data_attribute}'] = text
+    return table
+
+
+class TableRenderTests(TestCase):
+    """render_table() against the to_html() + BeautifulSoup markup it replaced."""
+
+    def assertSameTable(self, markup, expected):
+        table = TableParser(markup)
+        self.assertEqual(table.table, expected.table)
+        self.assertEqual(table.headers, expected.headers)
+        self.assertEqual(table.rows, expected.rows)
+
+    def test_report_table_matches_baseline(self):
+        data = {
+            'Resource Email Address': ['a@x.com', 'b@x.com'],
+            'Administrative': [1.005, 0],
+            'Billable Hours': [2.345678, 40.0],
+            'Department Mgmt': [0.0, 1.5],
+            'Training': [0.0, 0.0],
+            'Unassigned': [3.333, 0.0],
+            'Vacation': [0.0, 8.0],
+            'Grand Total': [6.683678, 49.5],
+            'Status': ['open', 'close'],
+            'Additional Days': [1.0, 0.0],
+            'WTD Actuals': [0.0, 40.0],
+            'Comments': ['<b>"Bench" & training</b>', ''],
+            'SPOC Comments': ['', "it's <done>"],
+            'RDM': ["O'Neil & Co", 'Adam'],
+            'Track': ['HCM', ''],
+            'Billing': ['TBD', 'Billing'],
+            'Individual Utilization': [0.058, 1.0],
+        }
+        markup = render_table(REPORT_TABLE_COLUMNS, data, table_id='reportTable')
+
+        frame = pd.DataFrame(data)
+        numeric = [column.label for column in REPORT_TABLE_COLUMNS if column.decimals is not None]
+        frame[numeric] = frame[numeric].astype(float).round(2)
+        expected = baseline_table(frame, REPORT_TABLE_COLUMNS, table_id='reportTable',
+                                  float_format=lambda x: '{:.2f}'.format(x) if pd.notnull(x) else '')
+        self.assertSameTable(markup, expected)
+
+        self.assertEqual([text for _, text in TableParser(markup).rows[0][1][1:4]], ['1.00', '2.35', '0.00'])
+        self.assertIn('<td>&lt;b&gt;&quot;Bench&quot; &amp; training&lt;/b&gt;</td>', markup)
+        self.assertIn('data-rdm="O&#x27;Neil &amp; Co"', markup)
+        self.assertNotIn('<b>', markup)
+
+    def test_leakage_table_matches_baseline(self):
+        rows = [
+            UtilizationReportModel.objects.create(
+                date=WEEK_1, resource_email_address=email, status='open', administrative=administrative,
+                billable_hours=billable, grand_total=total, addtnl_days=days, rdm=rdm, track='HCM', billing='TBD',
+                department_mgmt=0, training=0, unassigned=0, vacation=0, wtd_actuals=0,
+            )
+            for email, administrative, billable, total, days, rdm in [
+                ('a@x.com', 1.5, 2.5, 4.0, 1.0, '<Adam>'),
+                ('b@x.com', 8.0, 0.5, 8.5, 0.0, 'Priya & Co'),
+            ]
+        ]
+        # Each column keeps one precision: to_html() padded a column to its longest
+        # decimals (0.50 next to 2.25), which render_table() deliberately drops
+        UtilizationReportModel.objects.create(date=WEEK_1, resource_email_address='c@x.com', status='close')
+
+        fields = [
+            'resource_email_address', 'administrative', 'billable_hours', 'department_mgmt', 'training',
+            'unassigned', 'vacation', 'grand_total', 'status', 'addtnl_days', 'wtd_actuals', 'rdm', 'track', 'billing',
+        ]
+        frame = pd.DataFrame(
+            list(UtilizationReportModel.objects.filter(date=WEEK_1, status='open').values_list(*fields)),
+            columns=[column.label for column in LEAKAGE_TABLE_COLUMNS],
+        )
+        expected = baseline_table(frame, LEAKAGE_TABLE_COLUMNS, row_ids=[row.pk for row in rows])
+        markup = leakage_table(WEEK_1)
+        self.assertSameTable(markup, expected)
+
+        self.assertEqual([attrs['data-id'] for attrs, _ in TableParser(markup).rows], [str(row.pk) for row in rows])
+        self.assertIn('<td>&lt;Adam&gt;</td>', markup)
+        self.assertEqual(leakage_table(WEEK_2), '')
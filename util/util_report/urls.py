@@ -6,13 +6,17 @@ urlpatterns = [
     # Redirect root path to view_reports
     path('', RedirectView.as_view(pattern_name='view_reports', permanent=False), name='index'),
     path('extract/', views.extract_data_view, name='extract_data'),
+    path('jobs/<int:job_id>/', views.job_status, name='job_status'),
     path('view-reports/', views.view_reports, name='view_reports'),
+    path('report-rows/', views.report_rows, name='report_rows'),
     path('util-leakage/', views.util_leakage, name='util_leakage'),
     path('util-summary/', views.util_summary, name='util_summary'),
     path('update-comments/', views.update_comments, name='update_comments'),
     path('update-billable-hours/', views.update_billable_hours, name='update_billable_hours'),
     path('update-additional-days/', views.update_additional_days, name='update_additional_days'),
+    path('batch-edit/', views.batch_edit, name='batch_edit'),
     path('download-report/', views.download_report, name='download_report'),
+    path('export-range/', views.export_range, name='export_range'),
     path('download-result/', views.download_result, name='download_result'),
     path('download-util-leakage/', views.download_util_leakage, name='download_util_leakage'),
     path('close-cases/', views.close_cases, name='close_cases'),
@@ -23,5 +27,8 @@ urlpatterns = [
     path('get-low-utilization-resources/', views.get_low_utilization_resources, name='get_low_utilization_resources'),
     path('get_rdm_summary/', views.get_rdm_summary, name='get_rdm_summary'),
     path('download-rdm-summary/', views.download_rdm_summary_excel, name='download_rdm_summary_excel'),
+    path('parse-cache-stats/', views.parse_cache_stats, name='parse_cache_stats'),
+    path('report-cache-stats/', views.report_cache_stats, name='report_cache_stats'),
+    path('ingestion-runs/', views.ingestion_runs, name='ingestion_runs'),
     # path('', views.upload_file, name='upload'), # Commented out - replaced by modal
 ]
\ No newline at end of file
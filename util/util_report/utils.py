@@ -3,6 +3,7 @@ import os
 from datetime import datetime
 from django.conf import settings
 from .models import UtilizationReportModel
+from .summaries import summary_dates
 from django.core.files.storage import FileSystemStorage
 from django.shortcuts import render
 from django.http import JsonResponse
@@ -15,8 +16,7 @@ def process_excel_file(request, file):
 
 def get_available_dates():
     """Get list of available report dates."""
-    dates = UtilizationReportModel.objects.values_list('date', flat=True).distinct().order_by('-date')
-    return [date.strftime('%Y-%m-%d') for date in dates]
+    return [date.strftime('%Y-%m-%d') for date in summary_dates()]
 
 def get_report_for_date(date):
     """
@@ -1,36 +1,148 @@
 from django.shortcuts import render, redirect
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.core.files.storage import FileSystemStorage
 from django.utils.dateparse import parse_date
 from .new_main import UtilizationReportGenerator
+from .parse_cache import parse_cache
+from .profiling import compare_runs
+from .report_cache import report_cache
+from .report_query import FILTER_FIELDS, report_page
+from .result_store import result_store
+from .summaries import (
+    get_date_summary, get_rdm_summaries, report_dates_changed, summaries_etag, summary_dates, utilization_series,
+)
+from .table_render import TableColumn, render_table
+from .excel_export import export_response, width_from_frame, width_from_queryset
+from .range_export import (
+    CONTENT_TYPES, EXPORT_DEFAULTS, EXPORT_FIELDS, EXPORT_FORMATS, EXPORT_FORMATTERS, EXPORT_HEADERS,
+    export_chunks, export_values, iter_keyset, range_queryset,
+)
+from .edits import EditError, apply_edits, close_open_cases
+from .low_utilization import latest_month_bounds, low_utilization_report, month_bounds
 from .forms import UploadFileForm
 from .utils import process_excel_file, get_available_dates, get_report_for_date
 from django.urls import reverse
-from .models import UtilizationReportModel, UtilizationHistoryModel
-from django.views.decorators.http import require_http_methods, require_GET
+from .models import UtilizationReportModel, UtilizationHistoryModel, IngestionJobModel, IngestionRunModel
+from .jobs import enqueue_ingestion, enqueue_batch
+from .batch import is_batch_source, resolve_batch_directory
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods, require_GET
 import json
 import pandas as pd
-from io import BytesIO
 from datetime import datetime, timedelta
 import os
 from django.contrib import messages
-from bs4 import BeautifulSoup
-import threading
 import time
-import shutil
 from django.conf import settings
 import logging
 from django.db import models
 import random
-from openpyxl import Workbook
-from openpyxl.drawing.image import Image as XLImage
-from openpyxl.styles import Alignment, Font, Border, Side
-import openpyxl.utils
-from openpyxl.styles import PatternFill
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Fields shown on view_reports (with the value used when empty) and their columns
+REPORT_TABLE_FIELDS = [
+    ('resource_email_address', ''),
+    ('administrative', 0),
+    ('billable_hours', 0),
+    ('department_mgmt', 0),
+    ('training', 0),
+    ('unassigned', 0),
+    ('vacation', 0),
+    ('grand_total', 0),
+    ('status', 'open'),
+    ('addtnl_days', 0),
+    ('wtd_actuals', 0),
+    ('comments', ''),
+    ('spoc_comments', ''),
+    ('rdm', ''),
+    ('track', ''),
+    ('billing', 'TBD'),
+    ('individual_utilization', 0),
+]
+REPORT_TABLE_COLUMNS = [
+    TableColumn('Resource Email Address'),
+    TableColumn('Administrative', align='right', decimals=2),
+    TableColumn('Billable Hours', align='right', decimals=2),
+    TableColumn('Department Mgmt', align='right', decimals=2),
+    TableColumn('Training', align='right', decimals=2),
+    TableColumn('Unassigned', align='right', decimals=2),
+    TableColumn('Vacation', align='right', decimals=2),
+    TableColumn('Grand Total', align='right', decimals=2),
+    TableColumn('Status'),
+    TableColumn('Additional Days', align='right', decimals=2),
+    TableColumn('WTD Actuals', align='right', decimals=2),
+    TableColumn('Comments'),
+    TableColumn('SPOC Comments'),
+    TableColumn('RDM', data_attribute='rdm'),
+    TableColumn('Track', data_attribute='track'),
+    TableColumn('Billing', data_attribute='billing'),
+    TableColumn('Individual Utilization', align='right', decimals=2),
+]
+
+# Open cases on util_leakage; the id becomes each row's data-id
+LEAKAGE_TABLE_FIELDS = [
+    ('id', None),
+    ('resource_email_address', ''),
+    ('administrative', 0),
+    ('billable_hours', 0),
+    ('department_mgmt', 0),
+    ('training', 0),
+    ('unassigned', 0),
+    ('vacation', 0),
+    ('grand_total', 0),
+    ('status', 'open'),
+    ('addtnl_days', 0),
+    ('wtd_actuals', 0),
+    ('rdm', ''),
+    ('track', ''),
+    ('billing', ''),
+]
+LEAKAGE_TABLE_COLUMNS = [
+    TableColumn('Resource'),
+    TableColumn('Administrative', align='right'),
+    TableColumn('Billable Hours', align='right'),
+    TableColumn('Department Mgmt', align='right'),
+    TableColumn('Training', align='right'),
+    TableColumn('Unassigned', align='right'),
+    TableColumn('Vacation', align='right'),
+    TableColumn('Grand Total', align='right'),
+    TableColumn('Status'),
+    TableColumn('Additional Days', align='right'),
+    TableColumn('WTD Actuals', align='right'),
+    TableColumn('RDM'),
+    TableColumn('Track'),
+    TableColumn('Billing'),
+]
+
+# Columns of the download_util_leakage workbook: (field, header)
+LEAKAGE_EXPORT_COLUMNS = [
+    ('resource_email_address', 'Name'),
+    ('administrative', 'Administrative'),
+    ('billable_hours', 'Billable Days'),
+    ('department_mgmt', 'Department Mgmt'),
+    ('training', 'Training'),
+    ('unassigned', 'Unassigned'),
+    ('vacation', 'Vacation'),
+    ('grand_total', 'Grand Total'),
+    ('status', 'Status'),
+    ('addtnl_days', 'Additional Days'),
+    ('wtd_actuals', 'WTD Actual'),
+    ('rdm', 'RDM'),
+    ('track', 'Track'),
+    ('billing', 'Billing'),
+]
+LEAKAGE_EXPORT_NUMERIC_FIELDS = {
+    'administrative', 'billable_hours', 'department_mgmt', 'training',
+    'unassigned', 'vacation', 'grand_total', 'addtnl_days', 'wtd_actuals',
+}
+
+
+def leakage_number(value):
+    """A numeric cell of the leakage export: rounded to two decimals, empty as 0."""
+    return round(float(value), 2) if value is not None else 0
+
 # Global dictionary to keep track of files that need to be deleted
 files_to_cleanup = {}
 
@@ -54,52 +166,11 @@ def cleanup_files():
                 print(f"Error deleting file {file_path}: {e}")
                 del files_to_cleanup[file_path]
 
-def save_to_database_background(file_path, report_date=None, request=None):
-    """
-    Save the extracted data to the database in the background.
-    This function is called asynchronously to avoid blocking the user interface.
-    Now also accepts a request parameter to update the session when save is complete.
-    """
-    try:
-        # Delete existing data for this date if specified
-        if report_date:
-            deleted_count, _ = UtilizationReportModel.objects.filter(date=report_date).delete()
-            print(f"Deleted {deleted_count} existing records for date {report_date}")
-        
-        # Generate and save report
-        report_generator = UtilizationReportGenerator(file_path)
-        report_generator.generate_final_report()
-        report_generator.save_to_model()
-        
-        # Mark file for cleanup instead of immediate deletion
-        files_to_cleanup[file_path] = time.time()
-        print(f"Background database save completed for date: {report_date}")
-        
-        # Run cleanup routine to safely delete files when possible
-        cleanup_files()
-        
-        # After all saving operations are complete, set a flag in the session if request is provided
-        if request and report_date:
-            # Check if report_date is already a string or datetime object
-            date_str = report_date
-            if hasattr(report_date, 'strftime'):  # It's a datetime object
-                date_str = report_date.strftime('%Y-%m-%d')
-                
-            # Store the date in session to indicate this date's data has been saved
-            request.session['background_save_complete'] = date_str
-            request.session.modified = True
-            
-        print("Data saved to database successfully in background.")
-        return True
-    except Exception as e:
-        print(f"Error saving to database in background: {e}")
-        # Still mark file for cleanup even if there's an error
-        files_to_cleanup[file_path] = time.time()
-        return False
-
 def extract_data_view(request):
     """
-    Handle file uploads and extract data from Excel files.
+    Handle file uploads by queueing them for ingestion.
+    The workbook is parsed and saved by the run_ingestion_worker processes; the
+    result page polls the job's status endpoint until it finishes.
     """
     # Run cleanup routine at the start of request
     cleanup_files()
@@ -108,105 +179,38 @@ def extract_data_view(request):
     if request.method == 'POST' and request.POST.get('confirm_update') == 'true':
         # Get the file path from session
         file_path = request.session.get('temp_file_path')
-        if not file_path:
+        if not file_path or not os.path.exists(file_path):
             # Redirect back with an error message if file session expired
             messages.error(request, "File session expired. Please upload again.")
             # Try redirecting to referer, default to view_reports
             referer = request.META.get('HTTP_REFERER', reverse('view_reports'))
             return redirect(referer) 
         
-        try:
-            # Make a copy of the file to avoid file locking issues
-            file_name = os.path.basename(file_path)
-            temp_copy_path = os.path.join(os.path.dirname(file_path), f"temp_copy_{file_name}")
-            
-            try:
-                shutil.copy2(file_path, temp_copy_path)
-            except Exception as e:
-                # Redirect back with an error message if file copy fails
-                messages.error(request, f"Error processing uploaded file: {str(e)}")
-                referer = request.META.get('HTTP_REFERER', reverse('view_reports'))
-                return redirect(referer)
-            
-            # Get the date to clean existing data
-            report_date = request.session.get('report_date')
-            
-            # Generate report first without saving to database
-            report_generator = UtilizationReportGenerator(temp_copy_path)
-            final_df = report_generator.generate_final_report()
-            
-            # Store the current date in session for navigation purposes
-            request.session['current_report_date'] = report_generator.file_date
-            
-            # Store DataFrame as JSON in session
-            request.session['report_data'] = final_df.to_json(orient='records')
-            
-            # Clean up temp file path session variable
-            if 'temp_file_path' in request.session:
-                del request.session['temp_file_path']
-            
-            # Format numeric columns to limit decimal places
-            for col in final_df.select_dtypes(include=['float', 'float32', 'float64']).columns:
-                final_df[col] = final_df[col].round(2)
-            
-            # Convert data to HTML table with improved styling
-            report_html = final_df.to_html(classes='table table-striped table-bordered', index=False)
-            
-            # Process the HTML to add better column formatting
-            soup = BeautifulSoup(report_html, 'html.parser')
-            
-            # Add data-type attributes to cells for proper formatting
-            for i, col in enumerate(final_df.columns):
-                # Find all header cells
-                th = soup.find('thead').find_all('th')[i]
-                th['class'] = th.get('class', []) + ['py-2']
-                
-                # Check column data type and apply appropriate classes
-                if pd.api.types.is_numeric_dtype(final_df[col].dtype):
-                    th['class'] = th.get('class', []) + ['text-end', 'px-3']
-                    # Apply to all cells in this column
-                    for td in soup.find('tbody').find_all('tr'):
-                        cells = td.find_all('td')
-                        if i < len(cells):
-                            cells[i]['class'] = cells[i].get('class', []) + ['text-end', 'px-3']
-                else:
-                    th['class'] = th.get('class', []) + ['text-start', 'px-3']
-                    # Apply to all cells in this column
-                    for td in soup.find('tbody').find_all('tr'):
-                        cells = td.find_all('td')
-                        if i < len(cells):
-                            cells[i]['class'] = cells[i].get('class', []) + ['text-start', 'px-3']
-            
-            report_html = str(soup)
-            
-            # Start background thread to save to database
-            bg_thread = threading.Thread(
-                target=save_to_database_background,
-                args=(temp_copy_path, report_date, request)
-            )
-            bg_thread.daemon = True
-            bg_thread.start()
-            
-            messages.success(request, f'Report generated for {report_generator.file_date}. Data is being saved in the background.')
-            
-            return render(request, 'util_report/result.html', {
-                'report_html': report_html,
-                'has_data': True,
-                'current_date': report_generator.file_date,
-                'saving_in_background': True
-            })
-        except Exception as e:
-            # Mark file for cleanup
-            if file_path and os.path.exists(file_path):
-                files_to_cleanup[file_path] = time.time()
-            
-            error_message = f"An error occurred while extracting data: {str(e)}"
-            # Redirect back with the specific error message
-            logger.error(f"Error in extract_data_view (confirmation step): {error_message}", exc_info=True)
-            messages.error(request, error_message)
-            referer = request.META.get('HTTP_REFERER', reverse('view_reports'))
-            return redirect(referer)
+        report_date = request.session.get('report_date')
+        job = enqueue_ingestion(file_path, report_date=report_date, replace_existing=True)
+        
+        # Store the current date in session for navigation purposes
+        request.session['current_report_date'] = report_date
+        
+        # Clean up temp file path session variable
+        if 'temp_file_path' in request.session:
+            del request.session['temp_file_path']
+        
+        messages.success(request, f'Report for {report_date} queued for processing.')
+        return render(request, 'util_report/result.html', {
+            'job_id': job.pk,
+            'current_date': report_date,
+        })
     
+    # Batch of weekly workbooks already on the server
+    if request.method == 'POST' and request.POST.get('batch_directory'):
+        try:
+            source = resolve_batch_directory(request.POST['batch_directory'].strip())
+        except ValueError as e:
+            messages.error(request, str(e))
+            return redirect(request.META.get('HTTP_REFERER', reverse('view_reports')))
+        return queue_batch(request, source)
+
     # Normal file upload flow
     if request.method == 'POST' and request.FILES.get('file'):
         file = request.FILES['file']
@@ -214,26 +218,13 @@ def extract_data_view(request):
         file_path = fs.save(file.name, file)
         full_file_path = fs.path(file_path)
 
+        # A zip holds several weeks; they are parsed in parallel and saved in date order
+        if is_batch_source(full_file_path):
+            return queue_batch(request, full_file_path)
+
         try:
-            # Make a copy of the file to avoid file locking issues
-            file_name = os.path.basename(full_file_path)
-            temp_copy_path = os.path.join(os.path.dirname(full_file_path), f"temp_copy_{file_name}")
-            
-            try:
-                shutil.copy2(full_file_path, temp_copy_path)
-            except Exception as e:
-                # Mark original file for cleanup
-                files_to_cleanup[full_file_path] = time.time()
-                
-                # Redirect back with an error message if file copy fails (initial upload)
-                messages.error(request, f"Error preparing uploaded file: {str(e)}")
-                referer = request.META.get('HTTP_REFERER', reverse('view_reports'))
-                return redirect(referer)
-            
-            # First process the file to determine its date without saving to DB
-            report_generator = UtilizationReportGenerator(temp_copy_path)
-            
-            # Parse the date from the file to check for existing data
+            # Parse the date from the file name to check for existing data
+            report_generator = UtilizationReportGenerator(full_file_path)
             report_generator.parse_date_from_filename()
             report_date = report_generator.file_date
             
@@ -249,72 +240,19 @@ def extract_data_view(request):
                 request.session['temp_file_path'] = full_file_path
                 request.session['report_date'] = report_date
                 
-                # Mark temp copy for cleanup
-                files_to_cleanup[temp_copy_path] = time.time()
-                
                 return render(request, 'util_report/confirm_update.html', {
                     'report_date': report_date,
                     'dates': get_available_dates()
                 })
             
-            # If no existing data, proceed to generate the report first
-            final_df = report_generator.generate_final_report()
-            
-            # Store DataFrame as JSON in session
-            request.session['report_data'] = final_df.to_json(orient='records')
+            # If no existing data, hand the file to the ingestion workers
+            job = enqueue_ingestion(full_file_path, report_date=report_date)
 
-            # Format numeric columns to limit decimal places
-            for col in final_df.select_dtypes(include=['float', 'float32', 'float64']).columns:
-                final_df[col] = final_df[col].round(2)
-            
-            # Convert data to HTML table with improved styling
-            report_html = final_df.to_html(classes='table table-striped table-bordered', index=False)
-            
-            # Process the HTML to add better column formatting
-            soup = BeautifulSoup(report_html, 'html.parser')
-            
-            # Add data-type attributes to cells for proper formatting
-            for i, col in enumerate(final_df.columns):
-                # Find all header cells
-                th = soup.find('thead').find_all('th')[i]
-                th['class'] = th.get('class', []) + ['py-2']
-                
-                # Check column data type and apply appropriate classes
-                if pd.api.types.is_numeric_dtype(final_df[col].dtype):
-                    th['class'] = th.get('class', []) + ['text-end', 'px-3']
-                    # Apply to all cells in this column
-                    for td in soup.find('tbody').find_all('tr'):
-                        cells = td.find_all('td')
-                        if i < len(cells):
-                            cells[i]['class'] = cells[i].get('class', []) + ['text-end', 'px-3']
-                else:
-                    th['class'] = th.get('class', []) + ['text-start', 'px-3']
-                    # Apply to all cells in this column
-                    for td in soup.find('tbody').find_all('tr'):
-                        cells = td.find_all('td')
-                        if i < len(cells):
-                            cells[i]['class'] = cells[i].get('class', []) + ['text-start', 'px-3']
-            
-            report_html = str(soup)
-            
-            # Start background thread to save to database
-            bg_thread = threading.Thread(
-                target=save_to_database_background,
-                args=(temp_copy_path, report_date, request)
-            )
-            bg_thread.daemon = True
-            bg_thread.start()
-            
-            # Mark original file for cleanup
-            files_to_cleanup[full_file_path] = time.time()
-
-            messages.success(request, f'Report generated for {report_date}. Data is being saved in the background.')
+            messages.success(request, f'Report for {report_date} queued for processing.')
 
             return render(request, 'util_report/result.html', {
-                'report_html': report_html,
-                'has_data': True,
+                'job_id': job.pk,
                 'current_date': report_date,
-                'saving_in_background': True
             })
 
         except Exception as e:
@@ -333,6 +271,48 @@ def extract_data_view(request):
     # (since there's no dedicated upload page anymore)
     return redirect(reverse('view_reports'))
 
+def queue_batch(request, source):
+    """Queue a batch ingestion job for source and show its progress page."""
+    job = enqueue_batch(source, replace_existing=request.POST.get('replace_existing') == 'on')
+    messages.success(request, 'Weekly workbooks queued for batch processing.')
+    return render(request, 'util_report/result.html', {
+        'job_id': job.pk,
+        'current_date': None,
+    })
+
+@require_GET
+def job_status(request, job_id):
+    """
+    Report the stage and progress of an ingestion job as JSON.
+    """
+    try:
+        job = IngestionJobModel.objects.get(pk=job_id)
+    except IngestionJobModel.DoesNotExist:
+        return JsonResponse({'error': 'Job not found'}, status=404)
+
+    # The session only carries the token; download_result loads the report from the store
+    if job.result_token and request.session.get('result_token') != job.result_token:
+        request.session['result_token'] = job.result_token
+
+    # The date was loaded after the upload was queued; set up the confirm/replace flow for its file
+    if job.status == 'needs_confirmation' and request.session.get('temp_file_path') != job.file_path:
+        request.session['temp_file_path'] = job.file_path
+        request.session['report_date'] = job.report_date.strftime('%Y-%m-%d')
+
+    return JsonResponse({
+        'id': job.pk,
+        'status': job.status,
+        'stage': job.stage,
+        'progress': job.progress,
+        'report_date': job.report_date.strftime('%Y-%m-%d') if job.report_date else None,
+        'rows_written': job.rows_written,
+        'has_result': bool(job.result_token),
+        'message': job.message or '',
+        'created_at': job.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'started_at': job.started_at.strftime('%Y-%m-%d %H:%M:%S') if job.started_at else None,
+        'finished_at': job.finished_at.strftime('%Y-%m-%d %H:%M:%S') if job.finished_at else None,
+    })
+
 def view_reports(request):
     """
     View all reports for a given date.
@@ -351,35 +331,19 @@ def view_reports(request):
     request.session['current_report_date'] = selected_date
     
     # Get list of available dates for the dropdown
-    available_dates = list(UtilizationReportModel.objects.values_list('date', flat=True).distinct().order_by('-date'))
+    available_dates = summary_dates()
     
     try:
-        # Get all fields that we want to retrieve
-        fields_to_retrieve = [
-            'resource_email_address', 'administrative', 'billable_hours',
-            'department_mgmt', 'training', 'unassigned', 'vacation', 'grand_total',
-            'status', 'addtnl_days', 'wtd_actuals', 'comments',
-            'spoc_comments', 'rdm', 'track', 'billing', 'dams_utilization', 
-            'capable_utilization', 'individual_utilization'
-        ]
-        
-        # Retrieve records for the selected date
-        reports = UtilizationReportModel.objects.filter(date=selected_date)
-        
-        # Get unique values for filters
-        rdms = list(UtilizationReportModel.objects.filter(date=selected_date).exclude(rdm='').values_list('rdm', flat=True).distinct().order_by('rdm'))
-        tracks = list(UtilizationReportModel.objects.filter(date=selected_date).exclude(track='').values_list('track', flat=True).distinct().order_by('track'))
-        
-        # Get DAMS utilization, capable utilization, and individual utilization for the selected date
-        first_report = reports.first()
-        dams_utilization = first_report.dams_utilization if first_report else 0
-        capable_utilization = first_report.capable_utilization if first_report else 0
-        
-        # Calculate average individual utilization
-        individual_utilization = reports.aggregate(avg_individual=models.Avg('individual_utilization'))['avg_individual'] or 0
+        # Header figures and filter options come precomputed from the date's summary row
+        summary = get_date_summary(selected_date)
+        rdms = summary.rdms if summary else []
+        tracks = summary.tracks if summary else []
+        dams_utilization = summary.dams_utilization if summary else 0
+        capable_utilization = summary.capable_utilization if summary else 0
+        individual_utilization = summary.individual_utilization if summary else 0
         
         # If no reports found, show the no data template
-        if not reports.exists():
+        if summary is None:
             context = {
                 'date': selected_date,
                 'selected_date': selected_date,
@@ -398,71 +362,19 @@ def view_reports(request):
             }
             return render(request, 'util_report/no_data.html', context)
         
-        # Convert queryset to list of dictionaries
-        data = []
-        for report in reports:
-            report_data = {
-                'Resource Email Address': report.resource_email_address,
-                'Administrative': report.administrative or 0,
-                'Billable Hours': report.billable_hours or 0,
-                'Department Mgmt': report.department_mgmt or 0,
-                'Training': report.training or 0,
-                'Unassigned': report.unassigned or 0,
-                'Vacation': report.vacation or 0,
-                'Grand Total': report.grand_total or 0,
-                'Status': report.status or 'open',
-                'Additional Days': report.addtnl_days or 0,
-                'WTD Actuals': report.wtd_actuals or 0,
-                'Comments': report.comments or '',
-                'SPOC Comments': report.spoc_comments or '',
-                'RDM': report.rdm or '',
-                'Track': report.track or '',
-                'Billing': report.billing or 'TBD',
-                'Individual Utilization': report.individual_utilization or 0
-            }
-            data.append(report_data)
-        
-        # Convert to DataFrame for HTML rendering
-        df = pd.DataFrame(data)
-        
-        # Format numeric columns
-        numeric_columns = ['Administrative', 'Billable Hours', 'Department Mgmt', 'Training',
-                         'Unassigned', 'Vacation', 'Grand Total', 'Additional Days',
-                         'WTD Actuals', 'Individual Utilization']
-        
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = df[col].round(2)
-        
-        # Convert DataFrame to HTML
-        table_html = df.to_html(
-            classes='table table-hover table-striped',
-            index=False,
-            float_format=lambda x: '{:.2f}'.format(x) if pd.notnull(x) else ''
+        # Only the header is rendered here; the page fetches its rows from report_rows
+        report_html = render_table(
+            REPORT_TABLE_COLUMNS, {column.key: [] for column in REPORT_TABLE_COLUMNS}, table_id='reportTable'
         )
         
-        # Add data attributes for filtering
-        soup = BeautifulSoup(table_html, 'html.parser')
-        
-        # Add ID to table
-        table = soup.find('table')
-        if table:
-            table['id'] = 'reportTable'
-        
-        # Add data attributes to cells
-        for row in soup.find_all('tr')[1:]:  # Skip header row
-            cells = row.find_all('td')
-            if len(cells) >= 14:  # Make sure we have enough cells
-                cells[11]['data-rdm'] = cells[11].text  # RDM column
-                cells[12]['data-track'] = cells[12].text  # Track column
-                cells[13]['data-billing'] = cells[13].text  # Billing column
-        
-        report_html = str(soup)
-        
         # Prepare context for template
         context = {
-            'reports': data,
+            'reports': bool(report_html),
             'report_data': report_html,
+            'report_columns': [
+                {'field': field, 'align': column.align}
+                for (field, _), column in zip(REPORT_TABLE_FIELDS, REPORT_TABLE_COLUMNS)
+            ],
             'date': selected_date,
             'selected_date': selected_date,
             'available_dates': available_dates,
@@ -497,6 +409,63 @@ def view_reports(request):
         }
         return render(request, 'util_report/error.html', context)
 
+@require_GET
+def report_rows(request):
+    """
+    One page of view_reports rows, in the DataTables server-side format.
+
+    Takes draw, start, length, order[0][column], order[0][dir] and search[value]
+    as sent by DataTables, plus date, rdm, track, billing and status filters.
+    Passing back the returned next_cursor as cursor continues from the last row
+    without an OFFSET scan.
+    """
+    report_date = parse_date(request.GET.get('date', ''))
+    if not report_date:
+        return JsonResponse({'success': False, 'error': 'A valid date is required'}, status=400)
+
+    fields = [field for field, _ in REPORT_TABLE_FIELDS]
+    try:
+        draw = int(request.GET.get('draw', 0))
+        start = int(request.GET.get('start', 0))
+        length = int(request.GET.get('length', 50))
+        sort_index = int(request.GET.get('order[0][column]', 0))
+        sort_field = fields[sort_index] if 0 <= sort_index < len(fields) else fields[0]
+        # Cached per date and request parameters; draw only echoes back to the client
+        variant = '&'.join(f"{name}={value}" for name, value in sorted(request.GET.items()) if name != 'draw')
+        page = report_cache.get_or_build('rows', report_date, lambda: report_page(
+            report_date,
+            fields,
+            sort_field=sort_field,
+            descending=request.GET.get('order[0][dir]') == 'desc',
+            filters={name: request.GET.get(name, '') for name in FILTER_FIELDS},
+            search=request.GET.get('search[value]', '').strip(),
+            start=start,
+            length=length,
+            cursor=request.GET.get('cursor') or None,
+        ), variant=variant)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except Exception as e:
+        logger.error(f"Error loading report rows for {report_date}: {e}")
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+    # Objects keyed by field (DataTables columns.data), with the row id as data-id
+    data = []
+    for row in page['rows']:
+        record = {'DT_RowAttr': {'data-id': row[0]}}
+        for value, (field, default), column in zip(row[1:], REPORT_TABLE_FIELDS, REPORT_TABLE_COLUMNS):
+            value = round(value or 0, 2) if column.decimals is not None else value or default
+            record[field] = column.format(value)
+        data.append(record)
+
+    return JsonResponse({
+        'draw': draw,
+        'recordsTotal': page['total'],
+        'recordsFiltered': page['filtered'],
+        'data': data,
+        'next_cursor': page['next_cursor'],
+    })
+
 @require_http_methods(["POST"])
 def close_cases(request):
     """
@@ -518,30 +487,8 @@ def close_cases(request):
         if not case_ids:
             return JsonResponse({'success': False, 'error': 'No cases selected'})
             
-        # Update all selected cases
-        updated_count = 0
-        for case_id in case_ids:
-            try:
-                case = UtilizationReportModel.objects.get(id=case_id)
-                # Only update if case is open
-                if case.status == 'open':
-                    # Record history before making changes
-                    UtilizationHistoryModel.objects.create(
-                        report_date=case.date,
-                        resource_email=case.resource_email_address,
-                        action='closed',
-                        details=f"Case closed with reason: {reason}",
-                        field_name='status',
-                        previous_value=case.status,
-                        new_value='close'
-                    )
-                    
-                    case.status = 'close'
-                    case.comments = f"{case.comments or ''}{' ' if case.comments else ''}[Closed: {reason}]".strip()
-                    case.save()
-                    updated_count += 1
-            except UtilizationReportModel.DoesNotExist:
-                continue
+        # Close every selected open case in one transaction
+        updated_count = close_open_cases(case_ids, reason)
         
         # Return success response
         if request.content_type == 'application/json':
@@ -569,45 +516,46 @@ def update_comments(request):
     """
     try:
         data = json.loads(request.body)
-        report_id = data.get('id')
-        field = data.get('field')
-        value = data.get('value')
-
-        if field not in ['comments', 'spoc_comments']:
+        # Only comments go through here; hours and days have their own endpoints
+        if data.get('field') not in ('comments', 'spoc_comments'):
             return JsonResponse({'success': False, 'error': 'Invalid field'})
-
-        report = UtilizationReportModel.objects.get(id=report_id)
-        
-        # Record history before making changes
-        previous_value = getattr(report, field, '')
-        UtilizationHistoryModel.objects.create(
-            report_date=report.date,
-            resource_email=report.resource_email_address,
-            action='edited',
-            details=f"{field.replace('_', ' ').title()} updated",
-            field_name=field,
-            previous_value=previous_value,
-            new_value=value
-        )
-        
-        setattr(report, field, value)
-        report.save()
-
+        apply_edits([{'id': data.get('id'), 'field': data.get('field'), 'value': data.get('value')}])
         return JsonResponse({'success': True})
     except UtilizationReportModel.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'Report not found'})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
 
+@require_http_methods(["POST"])
+def batch_edit(request):
+    """
+    Apply a list of {id, field, value} changes from the util leakage grid in one
+    transaction. Returns the edited rows and the new header counts per date.
+    """
+    try:
+        data = json.loads(request.body)
+        changes = data.get('changes') if isinstance(data, dict) else data
+        result = apply_edits(changes)
+        return JsonResponse({'success': True, **result})
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
+    except EditError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except UtilizationReportModel.DoesNotExist as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=404)
+    except Exception as e:
+        logger.error(f"Error applying batch edit: {str(e)}")
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
 def download_result(request):
     """
     Download current session's report as Excel with styling.
     """
     try:
-        if 'report_data' not in request.session:
+        report_df = result_store.get(request.session.get('result_token'))
+        if report_df is None:
             return HttpResponse("No report data found in session.", status=404)
 
-        report_df = pd.read_json(request.session['report_data'])
         columns_to_include = [
             'resource_email_address', 'administrative', 'billable_hours',
             'department_mgmt', 'investment', 'presales', 'training',
@@ -617,92 +565,16 @@ def download_result(request):
         ]
         # Ensure only existing columns are selected
         columns_to_include = [col for col in columns_to_include if col in report_df.columns]
-        report_df = report_df[columns_to_include]
-        report_df = report_df.fillna('') # Replace NaN with empty string for Excel
-
-        # Create Excel workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'Utilization Report'
-
-        # Hide grid lines
-        ws.sheet_view.showGridLines = False
-
-        # Define styles
-        thin_border = Border(left=Side(style='thin'), 
-                             right=Side(style='thin'), 
-                             top=Side(style='thin'), 
-                             bottom=Side(style='thin'))
-
-        # Insert Oracle logo
-        logo_path = os.path.join(settings.BASE_DIR, 'static', 'Oracle-Logo.png')
-        if os.path.exists(logo_path):
-            img = XLImage(logo_path)
-            img.height = 50
-            img.width = 150
-            ws.add_image(img, 'A1')
-            ws.row_dimensions[1].height = 40 
-        else:
-            ws['A1'] = "Logo not found"
-
-        # Add confidential text
-        # Adjust column span based on the actual number of columns
-        max_col_letter_title = openpyxl.utils.get_column_letter(len(columns_to_include)) 
-        ws.merge_cells(f'B1:{max_col_letter_title}1') 
-        cell = ws['B1']
-        cell.value = 'Confidential - Oracle Restricted'
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.font = Font(bold=True, color='FF0000', size=14)
-
-        # Start table data from row 3
-        start_row = 3 
-
-        # Write table headers
-        headers = [col.replace('_', ' ').title() for col in columns_to_include]
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=start_row, column=col_num, value=header)
-            cell.font = Font(bold=True)
-            cell.border = thin_border
-
-        # Write data rows
-        current_row = start_row + 1
-        for _, row_data in report_df.iterrows():
-            for col_num, value in enumerate(row_data, 1):
-                 # Convert potential Timestamp objects to string
-                 if isinstance(value, pd.Timestamp):
-                    value = value.strftime('%Y-%m-%d') 
-                 cell = ws.cell(row=current_row, column=col_num, value=value)
-                 cell.border = thin_border
-            current_row += 1
-
-        # Set column widths
-        for i in range(len(headers)):
-            max_length = 0
-            column_letter = openpyxl.utils.get_column_letter(i + 1)
-            max_length = len(str(ws.cell(row=start_row, column=i+1).value))
-            for row_idx in range(start_row + 1, current_row):
-                cell = ws.cell(row=row_idx, column=i + 1)
-                try:
-                    if cell.value is not None:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
-            adjusted_width = max_length + 3
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-        # Prepare response
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-
-        response = HttpResponse(
-            output.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+        report_df = report_df[columns_to_include].fillna('') # Replace NaN with empty string for Excel
+
         timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
-        response['Content-Disposition'] = f'attachment; filename=utilization_report_{timestamp}.xlsx'
-        
-        return response
+        return export_response(
+            f'utilization_report_{timestamp}.xlsx',
+            'Utilization Report',
+            [col.replace('_', ' ').title() for col in columns_to_include],
+            report_df.itertuples(index=False, name=None),
+            widths=width_from_frame(report_df, columns_to_include),
+        )
     except Exception as e:
         # Log the error for debugging
         logger.error(f"Error generating session Excel file: {str(e)}", exc_info=True)
@@ -720,129 +592,64 @@ def download_report(request):
         reports = UtilizationReportModel.objects.filter(date=date)
         if not reports.exists():
             return HttpResponse("No data found for selected date", status=404)
-        
-        # Define the columns we want in the final report
-        columns_in_order = [
-            'Resource Email Address', 'Administrative', 'Billable Hours', 'Department Mgmt', 
-            'Training', 'Unassigned', 'Vacation', 'Grand Total', 'Last Week', 
-            'Total Logged', 'Additional Days', 'WTD Actuals', 'RDM', 'Track', 
-            'Billing', 'Status', 'Comments', 'SPOC Comments'
-        ]
 
-        data = []
-        for report in reports:
-            report_data = {
-                'Resource Email Address': report.resource_email_address,
-                'Administrative': report.administrative or 0,
-                'Billable Hours': report.billable_hours or 0,
-                'Department Mgmt': report.department_mgmt or 0,
-                'Training': report.training or 0,
-                'Unassigned': report.unassigned or 0,
-                'Vacation': report.vacation or 0,
-                'Grand Total': report.grand_total or 0,
-                'Last Week': report.last_week or 0,
-                'Total Logged': report.total_logged or 0,
-                'Additional Days': report.addtnl_days or 0,
-                'WTD Actuals': report.wtd_actuals or 0,
-                'RDM': report.rdm or '',
-                'Track': report.track or '',
-                'Billing': report.billing or 'TBD',
-                'Status': report.status or 'open',
-                'Comments': report.comments or '',
-                'SPOC Comments': report.spoc_comments or ''
-            }
-            # Ensure all desired columns are present, even if None in the model for some rows
-            ordered_data = {col: report_data.get(col, '') for col in columns_in_order}
-            data.append(ordered_data)
-        
-        # Create DataFrame and format numeric columns
-        df = pd.DataFrame(data)
-        numeric_columns = ['Administrative', 'Billable Hours', 'Department Mgmt', 'Training',
-                         'Unassigned', 'Vacation', 'Grand Total', 'Last Week', 'Total Logged',
-                         'Additional Days', 'WTD Actuals']
-        for col in numeric_columns:
-            if col in df.columns:
-                 # Use apply with a lambda to safely convert to float and round, handling errors
-                df[col] = df[col].apply(lambda x: round(float(x), 2) if pd.notna(x) and isinstance(x, (int, float)) else x)
-        df = df.fillna('') # Replace any remaining NaN/None
-
-        # --- Start openpyxl styling --- 
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'Full Report'
-        ws.sheet_view.showGridLines = False
-        thin_border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
-
-        # Logo
-        logo_path = os.path.join(settings.BASE_DIR, 'static', 'Oracle-Logo.png')
-        if os.path.exists(logo_path):
-            img = XLImage(logo_path)
-            img.height = 50
-            img.width = 150
-            ws.add_image(img, 'A1')
-            ws.row_dimensions[1].height = 40 
-        else:
-            ws['A1'] = "Logo not found"
-
-        # Title
-        max_col_letter_title = openpyxl.utils.get_column_letter(len(columns_in_order))
-        ws.merge_cells(f'B1:{max_col_letter_title}1')
-        cell = ws['B1']
-        cell.value = 'Confidential - Oracle Restricted'
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.font = Font(bold=True, color='FF0000', size=14)
-
-        start_row = 3
-
-        # Headers
-        headers = columns_in_order # Use the defined order
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=start_row, column=col_num, value=header)
-            cell.font = Font(bold=True)
-            cell.border = thin_border
-
-        # Data rows
-        current_row = start_row + 1
-        # Iterate through DataFrame rows using the ordered columns
-        for _, row_data in df[columns_in_order].iterrows(): 
-            for col_num, value in enumerate(row_data, 1):
-                cell = ws.cell(row=current_row, column=col_num, value=value)
-                cell.border = thin_border
-            current_row += 1
-
-        # Column widths
-        for i in range(len(headers)):
-            max_length = 0
-            column_letter = openpyxl.utils.get_column_letter(i + 1)
-            max_length = len(str(ws.cell(row=start_row, column=i+1).value))
-            for row_idx in range(start_row + 1, current_row):
-                cell = ws.cell(row=row_idx, column=i + 1)
-                try:
-                    if cell.value is not None:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
-            adjusted_width = max_length + 3
-            ws.column_dimensions[column_letter].width = adjusted_width
-        # --- End openpyxl styling --- 
-
-        # Prepare response
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-
-        response = HttpResponse(
-            output.getvalue(), # Use getvalue() for BytesIO
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        # Read in keyset chunks in email order; numbers rounded, empty values replaced by their defaults
+        rows = (export_values(values) for values in iter_keyset(reports, EXPORT_FIELDS))
+        return export_response(
+            f'utilization_report_{date}.xlsx',
+            'Full Report',
+            EXPORT_HEADERS,
+            rows,
+            widths=width_from_queryset(reports, EXPORT_FIELDS, defaults=EXPORT_DEFAULTS, formatters=EXPORT_FORMATTERS),
         )
-        response['Content-Disposition'] = f'attachment; filename=utilization_report_{date}.xlsx'
-        
-        return response
-        
+
     except Exception as e:
         logger.error(f"Error generating full report Excel for date {date}: {str(e)}", exc_info=True)
         return HttpResponse(f"Error generating report: {str(e)}", status=500)
 
+@require_GET
+def export_range(request):
+    """
+    Download every report row between start and end (inclusive) as csv, parquet or
+    xlsx (one sheet per week), optionally filtered by rdm, track and billing.
+    """
+    start = parse_date(request.GET.get('start', ''))
+    end = parse_date(request.GET.get('end', ''))
+    export_format = request.GET.get('format', 'xlsx')
+    if not start or not end or start > end:
+        return HttpResponse("Valid start and end dates are required", status=400)
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponse(f"Format must be one of {', '.join(EXPORT_FORMATS)}", status=400)
+
+    try:
+        queryset = range_queryset(start, end, {name: request.GET.get(name) for name in ('rdm', 'track', 'billing')})
+        if not queryset.exists():
+            return HttpResponse("No data found for the selected dates", status=404)
+
+        response = StreamingHttpResponse(export_chunks(export_format, queryset), content_type=CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = f'attachment; filename=utilization_{start}_{end}.{export_format}'
+        return response
+    except Exception as e:
+        logger.error(f"Error exporting reports from {start} to {end}: {str(e)}", exc_info=True)
+        return HttpResponse(f"Error generating export: {str(e)}", status=500)
+
+def leakage_table(date):
+    """
+    The open cases table of util_leakage for one date.
+    """
+    rows = list(UtilizationReportModel.objects.filter(
+        date=date,
+        status='open'
+    ).values_list(*[field for field, _ in LEAKAGE_TABLE_FIELDS]))
+    if not rows:
+        return ""
+    columns = list(zip(*rows))
+    data = {
+        column.key: [default if value is None else value for value in values]
+        for (_, default), column, values in zip(LEAKAGE_TABLE_FIELDS[1:], LEAKAGE_TABLE_COLUMNS, columns[1:])
+    }
+    return render_table(LEAKAGE_TABLE_COLUMNS, data, row_attributes={'data-id': columns[0]})
+
 def util_leakage(request):
     """
     Display utilization leakage data.
@@ -883,101 +690,21 @@ def util_leakage(request):
         current_date = datetime.strptime(date, '%Y-%m-%d')
         prev_week_date = (current_date - timedelta(days=7)).strftime('%Y-%m-%d')
         
-        # Get current open cases
-        current_open_count = UtilizationReportModel.objects.filter(
-            date=date,
-            status='open'
-        ).count()
-        
-        # Get previous week's open cases
-        last_week_open_count = UtilizationReportModel.objects.filter(
-            date=prev_week_date,
-            status='open'
-        ).count()
-        
-        # Get handled cases this week (cases that were closed this week from util leakage)
-        current_handled_count = UtilizationReportModel.objects.filter(
-            date=date,
-            status='close',
-            comments__contains='[Closed:'  # This indicates it was closed from util leakage tab
-        ).count()
-        
-        # Get handled cases last week (cases that were closed from util leakage last week)
-        last_week_handled_count = UtilizationReportModel.objects.filter(
-            date=prev_week_date,
-            status='close',
-            comments__contains='[Closed:'  # This indicates it was closed from util leakage tab
-        ).count()
-
-        # Get DAMS utilization for the selected date
-        first_report = UtilizationReportModel.objects.filter(date=date).first()
-        dams_utilization = first_report.dams_utilization if first_report else 0
-        capable_utilization = first_report.capable_utilization if first_report else 0
-
-        # Get the field names from the model to check what fields exist
-        model_fields = [f.name for f in UtilizationReportModel._meta.get_fields()]
-        
-        # Create a list of fields that exist in the model
-        fields_to_retrieve = ['id', 'resource_email_address']
-        for field in ['administrative', 'billable_hours', 'department_mgmt', 'training', 'unassigned', 
-                    'vacation', 'grand_total', 'status', 'addtnl_days', 
-                    'wtd_actuals', 'rdm', 'track', 'billing']:
-            if field in model_fields:
-                fields_to_retrieve.append(field)
-        
-        # Query open cases for current date
-        reports = UtilizationReportModel.objects.filter(
-            date=date,
-            status='open'
-        ).values(*fields_to_retrieve)
-        
-        data = []
-        for report in reports:
-            entry = {
-                'ID': report['id'],
-                'Resource': report['resource_email_address'],
-                'Administrative': report.get('administrative', 0),
-                'Billable Hours': report.get('billable_hours', 0),
-                'Department Mgmt': report.get('department_mgmt', 0),
-                'Training': report.get('training', 0),
-                'Unassigned': report.get('unassigned', 0),
-                'Vacation': report.get('vacation', 0),
-                'Grand Total': report.get('grand_total', 0),
-                'Status': report.get('status', 'open'),
-                'Additional Days': report.get('addtnl_days', 0),
-                'WTD Actuals': report.get('wtd_actuals', 0),
-                'RDM': report.get('rdm', ''),
-                'Track': report.get('track', ''),
-                'Billing': report.get('billing', '')
-            }
-            data.append(entry)
-        
-        report_html = ""
-        if data:
-            df = pd.DataFrame(data)
-            display_columns = [col for col in df.columns if col != 'ID']
-            df_display = df[display_columns]
-            html_table = df_display.to_html(classes='table table-hover table-striped', index=False)
-            
-            soup = BeautifulSoup(html_table, 'html.parser')
-            
-            for i, row in enumerate(soup.find('tbody').find_all('tr')):
-                if i < len(data):
-                    row_id = data[i]['ID']
-                    row['data-id'] = str(row_id)
-            
-            report_html = str(soup)
+        # Case counts and utilization come from the summary rows of both weeks
+        summary = get_date_summary(date)
+        last_week_summary = get_date_summary(prev_week_date)
+        report_html = report_cache.get_or_build('leakage', date, lambda: leakage_table(date))
     
         return render(request, 'util_report/util_leakage.html', {
             'report_html': report_html,
             'selected_date': date,
             'dates': dates,
-            'current_open_count': current_open_count,
-            'last_week_open_count': last_week_open_count,
-            'current_handled_count': current_handled_count,
-            'last_week_handled_count': last_week_handled_count,
-            'dams_utilization': dams_utilization,
-            'capable_utilization': capable_utilization
+            'current_open_count': summary.open_count if summary else 0,
+            'last_week_open_count': last_week_summary.open_count if last_week_summary else 0,
+            'current_handled_count': summary.handled_count if summary else 0,
+            'last_week_handled_count': last_week_summary.handled_count if last_week_summary else 0,
+            'dams_utilization': summary.dams_utilization if summary else 0,
+            'capable_utilization': summary.capable_utilization if summary else 0
         })
     except Exception as e:
         return render(request, 'util_report/util_leakage.html', {
@@ -996,114 +723,32 @@ def download_util_leakage(request):
         return HttpResponse("No date selected", status=400)
 
     try:
-        # Define the columns and their desired headers for the report
-        column_mapping = {
-            'resource_email_address': 'Name',
-            'administrative': 'Administrative',
-            'billable_hours': 'Billable Days', # Note: Header is 'Billable Days'
-            'department_mgmt': 'Department Mgmt',
-            'training': 'Training',
-            'unassigned': 'Unassigned',
-            'vacation': 'Vacation',
-            'grand_total': 'Grand Total',
-            'status': 'Status',
-            'addtnl_days': 'Additional Days',
-            'wtd_actuals': 'WTD Actual', # Note: Header is 'WTD Actual'
-            'rdm': 'RDM',
-            'track': 'Track',
-            'billing': 'Billing'
-        }
-        model_fields_to_fetch = list(column_mapping.keys())
-        report_headers = list(column_mapping.values())
+        fields = [field for field, _ in LEAKAGE_EXPORT_COLUMNS]
+        formatters = {field: leakage_number for field in LEAKAGE_EXPORT_NUMERIC_FIELDS}
 
         # Query open cases for the selected date
         reports = UtilizationReportModel.objects.filter(
             date=date,
             status='open'
-        ).values(*model_fields_to_fetch)
+        )
 
-        if not reports:
+        if not reports.exists():
             return HttpResponse("No utilization leakage data found for the selected date", status=404)
 
-        # --- Start openpyxl styling --- 
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'Util Leakage Report'
-        ws.sheet_view.showGridLines = False
-        thin_border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
-
-        # Logo
-        logo_path = os.path.join(settings.BASE_DIR, 'static', 'Oracle-Logo.png')
-        if os.path.exists(logo_path):
-            img = XLImage(logo_path)
-            img.height = 50
-            img.width = 150
-            ws.add_image(img, 'A1')
-            ws.row_dimensions[1].height = 40 
-        else:
-            ws['A1'] = "Logo not found"
-
-        # Title
-        max_col_letter_title = openpyxl.utils.get_column_letter(len(report_headers))
-        ws.merge_cells(f'B1:{max_col_letter_title}1')
-        cell = ws['B1']
-        cell.value = 'Confidential - Oracle Restricted'
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.font = Font(bold=True, color='FF0000', size=14)
-
-        start_row = 3
-
-        # Headers
-        for col_num, header in enumerate(report_headers, 1):
-            cell = ws.cell(row=start_row, column=col_num, value=header)
-            cell.font = Font(bold=True)
-            cell.border = thin_border
-
-        # Data rows
-        current_row = start_row + 1
-        for report_data in reports: # reports is already a list of dicts from .values()
-            for col_num, model_field in enumerate(model_fields_to_fetch, 1):
-                value = report_data.get(model_field, '')
-                 # Format numerics safely
-                if model_field in ['administrative', 'billable_hours', 'department_mgmt', 'training', 
-                                    'unassigned', 'vacation', 'grand_total', 'addtnl_days', 'wtd_actuals']:
-                    try:
-                        value = round(float(value), 2) if pd.notna(value) else 0
-                    except (ValueError, TypeError):
-                        value = 0 # Default to 0 if conversion fails
-                
-                cell = ws.cell(row=current_row, column=col_num, value=value)
-                cell.border = thin_border
-            current_row += 1
-
-        # Column widths
-        for i in range(len(report_headers)):
-            max_length = 0
-            column_letter = openpyxl.utils.get_column_letter(i + 1)
-            max_length = len(str(ws.cell(row=start_row, column=i+1).value))
-            for row_idx in range(start_row + 1, current_row):
-                cell = ws.cell(row=row_idx, column=i + 1)
-                try:
-                    if cell.value is not None:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
-            adjusted_width = max_length + 3
-            ws.column_dimensions[column_letter].width = adjusted_width
-        # --- End openpyxl styling --- 
-
-        # Prepare response
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-
-        response = HttpResponse(
-            output.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        def rows():
+            for values in iter_keyset(reports, fields):
+                yield [
+                    formatters[field](value) if field in formatters else value
+                    for field, value in zip(fields, values)
+                ]
+
+        return export_response(
+            f'util_leakage_report_{date}.xlsx',
+            'Util Leakage Report',
+            [header for _, header in LEAKAGE_EXPORT_COLUMNS],
+            rows(),
+            widths=width_from_queryset(reports, fields, formatters=formatters),
         )
-        response['Content-Disposition'] = f'attachment; filename=util_leakage_report_{date}.xlsx'
-        
-        return response
     except Exception as e:
         logger.error(f"Error generating Util Leakage Excel for date {date}: {str(e)}", exc_info=True)
         return HttpResponse(f"Error generating Excel file: {str(e)}", status=500)
@@ -1191,6 +836,7 @@ def date_extraction(request, extraction_date=None):
             
             # Create record
             UtilizationReportModel.objects.create(**record_data)
+        report_dates_changed(selected_date)
         
         messages.success(request, f'Data for {selected_date} extracted and saved successfully!')
         return redirect(f'/view-reports/?date={selected_date}')
@@ -1202,32 +848,6 @@ def date_extraction(request, extraction_date=None):
 
 @require_http_methods(["GET"])
 def get_history_data(request):
-    # Check if this is a save status check
-    if request.GET.get('check_save_status'):
-        date_str = request.GET.get('date')
-        save_complete = False
-        
-        if date_str:
-            # Check if the save is complete by looking for records with this date
-            try:
-                report_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                # Fix: Use the correct model name that's used throughout the code (from UtilizationReportModel)
-                report_count = UtilizationReportModel.objects.filter(date=report_date).count()
-                
-                # If we have records, consider the save complete
-                save_complete = report_count > 0
-                
-                # Check if background task is complete by looking at the session
-                if request.session.get('background_save_complete') == date_str:
-                    save_complete = True
-                    # Clear the session flag
-                    del request.session['background_save_complete']
-                    request.session.modified = True
-            except Exception as e:
-                print(f"Error checking save status: {e}")
-        
-        return JsonResponse({'save_complete': save_complete})
-    
     try:
         date_filter = request.GET.get('date', '')
         resource_filter = request.GET.get('resource', '')
@@ -1273,132 +893,23 @@ def update_billable_hours(request):
     """
     try:
         data = json.loads(request.body)
-        report_id = data.get('id')
-        new_billable_hours = float(data.get('billable_hours', 0))
-
-        report = UtilizationReportModel.objects.get(id=report_id)
-        
-        # Store old values for comparison
-        old_status = report.status
-        old_billable_hours = report.billable_hours
-        
-        # Record history for billable hours update
-        UtilizationHistoryModel.objects.create(
-            report_date=report.date,
-            resource_email=report.resource_email_address,
-            action='edited',
-            details="Billable hours updated",
-            field_name='billable_hours',
-            previous_value=str(old_billable_hours),
-            new_value=str(new_billable_hours)
-        )
-        
-        # Update billable hours
-        report.billable_hours = new_billable_hours
-        
-        # Get the week number from the report date
-        report_date = report.date
-        week_number = (report_date.day - 1) // 7 + 1
-        total_days = week_number * 5
-        
-        # Recalculate grand total
-        report.grand_total = (
-            report.administrative +
-            new_billable_hours +
-            report.training +
-            report.unassigned +
-            report.vacation
-        )
-        
-        # Get last week's additional days
-        last_week = 0
-        if week_number > 1:
-            prev_week_date = report_date - timedelta(days=7)
-            prev_week_record = UtilizationReportModel.objects.filter(
-                resource_email_address=report.resource_email_address,
-                date=prev_week_date
-            ).first()
-            
-            if prev_week_record:
-                last_week = prev_week_record.addtnl_days
-        
-        # Calculate total logged days
-        total_logged = new_billable_hours + report.vacation + last_week
-        
-        # Store old status for comparison
-        was_open = report.status == 'open'
-        
-        # Apply business logic based on billing type
-        if report.billing == 'Billing':
-            if total_logged >= total_days:
-                report.addtnl_days = 0
-                report.status = 'close'
-            else:
-                report.addtnl_days = total_days - total_logged
-                report.status = 'open'
-        elif report.billing == 'Partial':
-            half_total_days = total_days / 2
-            if total_logged >= half_total_days:
-                report.addtnl_days = 0
-                report.status = 'close'
-            else:
-                report.addtnl_days = half_total_days - total_logged
-                report.status = 'open'
-        elif report.billing in ['On Bench', 'Non Billable', 'Next', 'Released']:
-            report.addtnl_days = 0
-            report.status = 'close'
-        else:
-            # Default case (TBD, etc.)
-            if total_logged >= total_days:
-                report.addtnl_days = 0
-                report.status = 'close'
-            else:
-                report.addtnl_days = total_days - total_logged
-                report.status = 'open'
-        
-        # Add closing comment if case is being closed
-        if was_open and report.status == 'close':
-            closing_comment = f"[Closed: Automatically closed - Required hours met]"
-            report.comments = f"{report.comments or ''}{' ' if report.comments else ''}{closing_comment}".strip()
-            
-            # Record status change in history
-            UtilizationHistoryModel.objects.create(
-                report_date=report.date,
-                resource_email=report.resource_email_address,
-                action='closed',
-                details="Automatically closed - Required hours met",
-                field_name='status',
-                previous_value='open',
-                new_value='close'
-            )
-        
-        report.save()
-
-        # Calculate updated counts if status changed
+        result = apply_edits([
+            {'id': data.get('id'), 'field': 'billable_hours', 'value': data.get('billable_hours', 0)}
+        ])
+        row = result['rows'][0]
         response_data = {
             'success': True,
-            'grand_total': report.grand_total,
-            'addtnl_days': report.addtnl_days,
-            'status': report.status,
+            'grand_total': row['grand_total'],
+            'addtnl_days': row['addtnl_days'],
+            'status': row['status'],
         }
 
-        if old_status != report.status:
-            # Get current date's counts
-            current_open_count = UtilizationReportModel.objects.filter(
-                date=report_date,
-                status='open'
-            ).count()
-            
-            current_handled_count = UtilizationReportModel.objects.filter(
-                date=report_date,
-                status='close',
-                comments__contains='[Closed:'
-            ).count()
-
+        if row['status_changed']:
+            counts = result['counts'][row['date']]
             response_data.update({
                 'status_changed': True,
-                'current_open_count': current_open_count,
-                'current_handled_count': current_handled_count
+                'current_open_count': counts['open_count'],
+                'current_handled_count': counts['handled_count']
             })
 
         return JsonResponse(response_data)
@@ -1424,81 +935,32 @@ def util_summary(request):
 
     return render(request, 'util_report/util_summary.html', context)
 
+def utilization_data_etag(request):
+    try:
+        return summaries_etag()
+    except Exception as e:
+        logger.error(f"Error computing utilization data ETag: {str(e)}")
+        return None
+
 @require_http_methods(["GET"])
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=utilization_data_etag)
 def get_utilization_data(request):
     """
     API endpoint to get utilization data for charts.
-    Returns data aggregated by month, quarter, and year.
+    Returns data aggregated by month, quarter, and year from the per-date summaries,
+    with an ETag that changes whenever report data changes.
     """
     try:
-        # Get all utilization reports
-        reports = UtilizationReportModel.objects.all().values('date', 'dams_utilization', 'capable_utilization')
-        df = pd.DataFrame(list(reports))
-        
-        if df.empty:
+        result = utilization_series()
+
+        if not result['monthly']['labels']:
             # Return dummy data if no actual data is available
             dummy_data = generate_dummy_utilization_data()
             return JsonResponse(dummy_data)
-            
-        # Convert date strings to datetime objects
-        df['date'] = pd.to_datetime(df['date'])
-        
-        # Add year, month, and quarter columns
-        df['year'] = df['date'].dt.year
-        df['month'] = df['date'].dt.month
-        df['quarter'] = df['date'].dt.quarter
-        
-        # Dictionary to store all result data
-        result = {}
-        
-        # Monthly data - average by month and year
-        monthly_data = df.groupby(['year', 'month']).agg({
-            'dams_utilization': 'mean',
-            'capable_utilization': 'mean'
-        }).reset_index()
-        
-        # Format the monthly data for chart.js - convert all values to strings properly
-        monthly_result = {
-            'labels': [f"{int(row['year'])}-{int(row['month']):02d}" for _, row in monthly_data.iterrows()],
-            'dams': [round(float(val), 2) for val in monthly_data['dams_utilization'].tolist()],
-            'capable': [round(float(val), 2) for val in monthly_data['capable_utilization'].tolist()]
-        }
-        
-        # Quarterly data - average by quarter and year
-        quarterly_data = df.groupby(['year', 'quarter']).agg({
-            'dams_utilization': 'mean',
-            'capable_utilization': 'mean'
-        }).reset_index()
-        
-        # Format the quarterly data for chart.js - convert all values to strings properly
-        quarterly_result = {
-            'labels': [f"{int(row['year'])} Q{int(row['quarter'])}" for _, row in quarterly_data.iterrows()],
-            'dams': [round(float(val), 2) for val in quarterly_data['dams_utilization'].tolist()],
-            'capable': [round(float(val), 2) for val in quarterly_data['capable_utilization'].tolist()]
-        }
-        
-        # Yearly data - average by year
-        yearly_data = df.groupby('year').agg({
-            'dams_utilization': 'mean',
-            'capable_utilization': 'mean'
-        }).reset_index()
-        
-        # Format the yearly data for chart.js - convert all values to strings properly
-        yearly_result = {
-            'labels': [str(int(year)) for year in yearly_data['year'].tolist()],
-            'dams': [round(float(val), 2) for val in yearly_data['dams_utilization'].tolist()],
-            'capable': [round(float(val), 2) for val in yearly_data['capable_utilization'].tolist()]
-        }
-        
-        # Combine all data
-        result = {
-            'monthly': monthly_result,
-            'quarterly': quarterly_result,
-            'yearly': yearly_result
-        }
-        
+
         return JsonResponse(result)
-        
+
     except Exception as e:
         logger.error(f"Error getting utilization data: {str(e)}")
         # Return dummy data in case of error
@@ -1551,155 +1013,42 @@ def generate_dummy_utilization_data():
 @require_http_methods(["GET"])
 def get_low_utilization_resources(request):
     """
-    API endpoint to get resources with low average individual utilization over the last 4 weeks of the month.
-    Returns two lists: resources below 35% and resources below 50%.
+    API endpoint to get resources with low average individual utilization.
+    Covers ?month=YYYY-MM, or ?start=YYYY-MM-DD&end=YYYY-MM-DD, and defaults to the
+    month of the latest report. Returns two lists: resources below 35% and resources below 50%.
     """
     try:
-        # Get all dates and sort them in descending order
-        all_dates = list(UtilizationReportModel.objects.values_list('date', flat=True).distinct().order_by('-date'))
-        
-        if not all_dates:
-            # Return dummy data when no data is available
-            return JsonResponse(generate_dummy_low_utilization_data())
-        
-        # Find the latest date for each month
-        latest_month_ends = {}
-        for date_obj in all_dates:
-            # Convert to datetime.date if it's a string
-            if isinstance(date_obj, str):
-                date_obj = datetime.strptime(date_obj, '%Y-%m-%d').date()
-                
-            # Create a key for year-month
-            year_month = f"{date_obj.year}-{date_obj.month:02d}"
-            
-            # If this year-month isn't in our dict or has a later day, update it
-            if year_month not in latest_month_ends or date_obj.day > latest_month_ends[year_month].day:
-                latest_month_ends[year_month] = date_obj
-        
-        # Sort the month-end dates in descending order
-        month_end_dates = sorted(latest_month_ends.values(), reverse=True)
-        
-        # Use the most recent month-end date
-        most_recent_month_end = month_end_dates[0] if month_end_dates else None
-        
-        if not most_recent_month_end:
-            # Return dummy data when no month-end data is available
-            return JsonResponse(generate_dummy_low_utilization_data())
-        
-        # Determine the year and month of the most recent month end
-        year = most_recent_month_end.year
-        month = most_recent_month_end.month
-        
-        # Find all reports from the same month (last 4 weeks)
-        month_reports = UtilizationReportModel.objects.filter(
-            date__year=year,
-            date__month=month
-        ).values('resource_email_address', 'individual_utilization', 'date', 'billing', 'rdm')
-        
-        # Get total resources count for reference
-        total_resources = len(set([report['resource_email_address'] for report in month_reports]))
-        
-        # Group by resource and calculate average utilization
-        resource_averages = {}
-        for report in month_reports:
-            email = report['resource_email_address']
-            if email not in resource_averages:
-                resource_averages[email] = {
-                    'utilization_sum': 0,
-                    'count': 0,
-                    'billing': report['billing'] or 'N/A',
-                    'rdm': report['rdm'] or 'N/A'
-                }
-            
-            resource_averages[email]['utilization_sum'] += report['individual_utilization'] if report['individual_utilization'] is not None else 0
-            resource_averages[email]['count'] += 1
-        
-        # Calculate average and categorize by threshold
-        below_35 = []
-        below_50 = []
-        all_resources = []
-        
-        # Track statistics for the charts
-        billing_types = {}
-        rdm_distribution = {}
-        utilization_ranges = {
-            "0-15%": 0,
-            "15-25%": 0,
-            "25-35%": 0,
-            "35-50%": 0,
-            "Above 50%": 0
-        }
-        
-        for email, data in resource_averages.items():
-            if data['count'] > 0:  # Ensure we have data points
-                avg_util = data['utilization_sum'] / data['count']
-                billing = data['billing']
-                rdm = data['rdm']
-                
-                # Update billing type statistics
-                billing_types[billing] = billing_types.get(billing, 0) + 1
-                
-                # Update RDM distribution
-                rdm_distribution[rdm] = rdm_distribution.get(rdm, 0) + 1
-                
-                # Update utilization range counts
-                if avg_util < 15:
-                    utilization_ranges["0-15%"] += 1
-                elif avg_util < 25:
-                    utilization_ranges["15-25%"] += 1
-                elif avg_util < 35:
-                    utilization_ranges["25-35%"] += 1
-                elif avg_util < 50:
-                    utilization_ranges["35-50%"] += 1
-                else:
-                    utilization_ranges["Above 50%"] += 1
-                
-                resource_data = {
-                    'resource_email': email,
-                    'individual_utilization': avg_util,
-                    'billing': billing,
-                    'rdm': rdm
-                }
-                
-                all_resources.append(resource_data)
-                
-                if avg_util < 35:
-                    below_35.append(resource_data)
-                elif avg_util < 50:
-                    below_50.append(resource_data)
-        
-        # Sort by utilization (ascending)
-        below_35.sort(key=lambda x: x['individual_utilization'])
-        below_50.sort(key=lambda x: x['individual_utilization'])
-        all_resources.sort(key=lambda x: x['individual_utilization'])
-        
-        # Prepare statistics in the format needed for charts
-        billing_stats = [{"type": billing, "count": count} for billing, count in billing_types.items()]
-        rdm_stats = [{"name": rdm, "count": count} for rdm, count in rdm_distribution.items()]
-        range_stats = [{"range": range_name, "count": count} for range_name, count in utilization_ranges.items()]
-        
-        # Calculate average utilization for different groups
-        avg_below_35 = sum(r['individual_utilization'] for r in below_35) / len(below_35) if below_35 else 0
-        avg_below_50 = sum(r['individual_utilization'] for r in below_50) / len(below_50) if below_50 else 0
-        avg_all = sum(r['individual_utilization'] for r in all_resources) / len(all_resources) if all_resources else 0
-        
+        month = request.GET.get('month')
+        start = request.GET.get('start')
+        end = request.GET.get('end')
+        if month:
+            try:
+                year, month_number = (int(part) for part in month.split('-'))
+                bounds = month_bounds(year, month_number)
+            except ValueError:
+                return JsonResponse({'success': False, 'error': 'Invalid month, expected YYYY-MM'}, status=400)
+        elif start or end:
+            bounds = (parse_date(start or ''), parse_date(end or ''))
+            if not all(bounds) or bounds[0] > bounds[1]:
+                return JsonResponse({'success': False, 'error': 'Invalid date range'}, status=400)
+        else:
+            bounds = latest_month_bounds()
+            if bounds is None:
+                # Return dummy data when no data is available
+                return JsonResponse(generate_dummy_low_utilization_data())
+
+        latest_date = UtilizationReportModel.objects.filter(date__range=bounds).aggregate(
+            latest=models.Max('date')
+        )['latest']
+
+        result = low_utilization_report(*bounds)
         return JsonResponse({
-            'month_end_date': most_recent_month_end.strftime('%Y-%m-%d'),
-            'below_35': below_35,
-            'below_50': below_50,
-            'total_resources': total_resources,
-            'stats': {
-                'billing_types': billing_stats,
-                'rdm_distribution': rdm_stats,
-                'utilization_ranges': range_stats,
-                'averages': {
-                    'below_35': avg_below_35,
-                    'below_50': avg_below_50,
-                    'all': avg_all
-                }
-            }
+            'month_end_date': (latest_date or bounds[1]).strftime('%Y-%m-%d'),
+            'start': bounds[0].strftime('%Y-%m-%d'),
+            'end': bounds[1].strftime('%Y-%m-%d'),
+            **result,
         })
-        
+
     except Exception as e:
         logger.error(f"Error getting low utilization resources: {str(e)}")
         # Return dummy data in case of error
@@ -1770,123 +1119,23 @@ def update_additional_days(request):
     """
     try:
         data = json.loads(request.body)
-        report_id = data.get('id')
-        new_additional_days = float(data.get('additional_days', 0))
-
-        report = UtilizationReportModel.objects.get(id=report_id)
-        
-        # Store old values for comparison
-        old_status = report.status
-        old_additional_days = report.addtnl_days
-        
-        # Record history for additional days update
-        UtilizationHistoryModel.objects.create(
-            report_date=report.date,
-            resource_email=report.resource_email_address,
-            action='edited',
-            details="Additional days updated",
-            field_name='addtnl_days',
-            previous_value=str(old_additional_days),
-            new_value=str(new_additional_days)
-        )
-        
-        # Update additional days
-        report.addtnl_days = new_additional_days
-        
-        # Get the week number from the report date
-        report_date = report.date
-        week_number = (report_date.day - 1) // 7 + 1
-        total_days = week_number * 5
-        
-        # Get last week's additional days
-        last_week = 0
-        if week_number > 1:
-            prev_week_date = report_date - timedelta(days=7)
-            prev_week_record = UtilizationReportModel.objects.filter(
-                resource_email_address=report.resource_email_address,
-                date=prev_week_date
-            ).first()
-            
-            if prev_week_record:
-                last_week = prev_week_record.addtnl_days
-        
-        # Calculate total logged days
-        total_logged = report.billable_hours + report.vacation + last_week
-        
-        # Store old status for comparison
-        was_open = report.status == 'open'
-        
-        # Apply business logic based on billing type and the manually set additional days
-        if new_additional_days == 0:
-            report.status = 'close'
-        else:
-            report.status = 'open'
-        
-        # Add closing comment if case is being closed
-        if was_open and report.status == 'close':
-            closing_comment = f"[Closed: Manually set additional days to 0]"
-            report.comments = f"{report.comments or ''}{' ' if report.comments else ''}{closing_comment}".strip()
-            
-            # Record status change in history
-            UtilizationHistoryModel.objects.create(
-                report_date=report.date,
-                resource_email=report.resource_email_address,
-                action='closed',
-                details="Manually set additional days to 0",
-                field_name='status',
-                previous_value='open',
-                new_value='close'
-            )
-        
-        # Save changes to this record
-        report.save()
-        
-        # Calculate updated capable utilization
-        # Get all records for this date to recalculate capable utilization
-        date_records = UtilizationReportModel.objects.filter(date=report_date)
-
-        # Fetch total_capacity and dams_utilization from any record for this date
-        sample_record = date_records.first()
-        total_capacity = sample_record.total_capacity if sample_record and sample_record.total_capacity else 0
-        dams_utilization = sample_record.dams_utilization if sample_record and sample_record.dams_utilization else 0
-        # Calculate total_utilization from dams_utilization and total_capacity
-        total_utilization = (dams_utilization / 100) * total_capacity if total_capacity else 0
-        total_additional_days = sum(record.addtnl_days for record in date_records if record.addtnl_days is not None)
-
-        if total_capacity > 0:
-            # Calculate capable utilization using the formula: ((total_utilization + (total_additional_days * 8)) / total_capacity * 100)
-            capable_utilization = ((total_utilization + (total_additional_days * 8)) / total_capacity) * 100
-            capable_utilization = round(capable_utilization, 2)
-            # Update capable_utilization for all records with this date
-            date_records.update(capable_utilization=capable_utilization)
-        else:
-            capable_utilization = 0
-
-        # Calculate updated counts if status changed
+        result = apply_edits([
+            {'id': data.get('id'), 'field': 'addtnl_days', 'value': data.get('additional_days', 0)}
+        ])
+        row = result['rows'][0]
+        counts = result['counts'][row['date']]
         response_data = {
             'success': True,
-            'additional_days': report.addtnl_days,
-            'status': report.status,
-            'capable_utilization': capable_utilization,
+            'additional_days': row['addtnl_days'],
+            'status': row['status'],
+            'capable_utilization': counts['capable_utilization'],
         }
 
-        if old_status != report.status:
-            # Get current date's counts
-            current_open_count = UtilizationReportModel.objects.filter(
-                date=report_date,
-                status='open'
-            ).count()
-            
-            current_handled_count = UtilizationReportModel.objects.filter(
-                date=report_date,
-                status='close',
-                comments__contains='[Closed:'
-            ).count()
-
+        if row['status_changed']:
             response_data.update({
                 'status_changed': True,
-                'current_open_count': current_open_count,
-                'current_handled_count': current_handled_count
+                'current_open_count': counts['open_count'],
+                'current_handled_count': counts['handled_count']
             })
 
         return JsonResponse(response_data)
@@ -1898,134 +1147,48 @@ def update_additional_days(request):
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
 
-def calculate_rdm_utilization(date):
+def rdm_summary(selected_date):
     """
-    Calculate and update RDM-wise DAMS and capable utilization for a given date.
-    This function:
-    1. Groups resources by RDM
-    2. Calculates total_billed, wtd_capacity, and additional_days for each RDM
-    3. Calculates both DAMS and capable utilization for each RDM
-    4. Updates the database with the calculated values
+    RDM-wise summary rows and the global utilization figures for one date.
     """
-    # Get all reports for the date
-    reports = UtilizationReportModel.objects.filter(date=date)
-    
-    # Group by RDM and calculate totals
-    rdm_totals = {}
-    for report in reports:
-        rdm = report.rdm or 'Unassigned'
-        if rdm not in rdm_totals:
-            rdm_totals[rdm] = {
-                'total_billed': 0,
-                'total_capacity': 0,
-                'total_additional_days': 0
-            }
-        rdm_totals[rdm]['total_billed'] += report.total_billed or 0
-        rdm_totals[rdm]['total_capacity'] += report.wtd_capacity or 0
-        rdm_totals[rdm]['total_additional_days'] += report.addtnl_days or 0
-    
-    # Calculate DAMS and capable utilization for each RDM
-    rdm_utilizations = {}
-    for rdm, totals in rdm_totals.items():
-        if totals['total_capacity'] > 0:
-            # DAMS utilization: (total_billed / total_capacity) * 100
-            dams_utilization = (totals['total_billed'] / totals['total_capacity']) * 100
-            # Capable utilization: ((total_billed + (total_additional_days * 8)) / total_capacity) * 100
-            capable_utilization = ((totals['total_billed'] + (totals['total_additional_days'] * 8)) / totals['total_capacity']) * 100
-        else:
-            dams_utilization = 0
-            capable_utilization = 0
-        rdm_utilizations[rdm] = {
-            'dams': round(dams_utilization, 2),
-            'capable': round(capable_utilization, 2)
+    date_summary = get_date_summary(selected_date)
+    summary_rows = [
+        {
+            'rdm': row.rdm,
+            'resource_count': row.resource_count,
+            'billable_hours': row.billable_hours,
+            'wtd_actuals': row.wtd_actuals,
+            'addtnl_days': row.addtnl_days,
+            'dams_utilization': row.dams_utilization,
+            'capable_utilization': row.capable_utilization,
+            'partial': row.partial_count,
+            'billing': row.billing_count,
+            'next': row.next_count,
+            'total_capacity': row.total_capacity,
+            'total_billed': row.total_billed
         }
-    
-    # Update all reports with their RDM's utilization values
-    for report in reports:
-        rdm = report.rdm or 'Unassigned'
-        report.rdm_dams_utilization = rdm_utilizations.get(rdm, {}).get('dams', 0)
-        report.rdm_capable_utilization = rdm_utilizations.get(rdm, {}).get('capable', 0)
-        report.save()
-    
-    return rdm_utilizations
+        for row in get_rdm_summaries(selected_date, date_summary)
+    ]
+
+    return {
+        'summary': summary_rows,
+        'global_dams_utilization': date_summary.dams_utilization if date_summary else 0,
+        'global_capable_utilization': date_summary.capable_utilization if date_summary else 0
+    }
 
 @require_GET
 def get_rdm_summary(request):
     """
     AJAX endpoint to return RDM-wise summary as JSON for the selected date.
-    First calculates RDM-wise DAMS utilization if not already calculated.
+    The RDM rows are only rebuilt after the date's report rows changed.
     """
     selected_date = request.GET.get('date')
     if not selected_date:
         return JsonResponse({'error': 'No date provided'}, status=400)
-    
-    # Calculate RDM-wise DAMS utilization if not already done
-    calculate_rdm_utilization(selected_date)
-    
-    # Get all reports for the date
-    reports = UtilizationReportModel.objects.filter(date=selected_date)
-    first_report = reports.first()
-    global_dams_utilization = first_report.dams_utilization if first_report else 0
-    global_capable_utilization = first_report.capable_utilization if first_report else 0
-    
-    # Group reports by RDM
-    rdm_data = {}
-    for report in reports:
-        rdm = report.rdm or 'Unassigned'
-        if rdm not in rdm_data:
-            rdm_data[rdm] = {
-                'resource_count': 0,
-                'billable_hours': 0,
-                'wtd_actuals': 0,
-                'addtnl_days': 0,
-                'partial': 0,
-                'billing': 0,
-                'next': 0,
-                'total_capacity': 0,
-                'total_billed': 0,
-                'rdm_dams_utilization': report.rdm_dams_utilization,
-                'rdm_capable_utilization': report.rdm_capable_utilization
-            }
-        
-        # Update counts
-        rdm_data[rdm]['resource_count'] += 1
-        rdm_data[rdm]['billable_hours'] += report.billable_hours or 0
-        rdm_data[rdm]['wtd_actuals'] += report.wtd_actuals or 0
-        rdm_data[rdm]['addtnl_days'] += report.addtnl_days or 0
-        rdm_data[rdm]['total_capacity'] += report.wtd_capacity or 0
-        rdm_data[rdm]['total_billed'] += report.total_billed or 0
-        
-        # Update billing type counts
-        if (report.billing or '').lower() == 'partial':
-            rdm_data[rdm]['partial'] += 1
-        if (report.billing or '').lower() == 'billing':
-            rdm_data[rdm]['billing'] += 1
-        if (report.billing or '').lower() == 'next':
-            rdm_data[rdm]['next'] += 1
-    
-    # Prepare summary rows
-    summary_rows = []
-    for rdm, vals in rdm_data.items():
-        summary_rows.append({
-            'rdm': rdm,
-            'resource_count': vals['resource_count'],
-            'billable_hours': vals['billable_hours'],
-            'wtd_actuals': vals['wtd_actuals'],
-            'addtnl_days': vals['addtnl_days'],
-            'dams_utilization': vals['rdm_dams_utilization'],  # Use pre-calculated RDM DAMS utilization
-            'capable_utilization': vals['rdm_capable_utilization'],  # Use pre-calculated RDM capable utilization
-            'partial': vals['partial'],
-            'billing': vals['billing'],
-            'next': vals['next'],
-            'total_capacity': vals['total_capacity'],
-            'total_billed': vals['total_billed']
-        })
-    
-    return JsonResponse({
-        'summary': summary_rows,
-        'global_dams_utilization': global_dams_utilization,
-        'global_capable_utilization': global_capable_utilization
-    })
+    if not parse_date(selected_date):
+        return JsonResponse({'error': 'Invalid date'}, status=400)
+
+    return JsonResponse(rdm_summary(selected_date))
 
 @require_GET
 def download_rdm_summary_excel(request):
@@ -2035,123 +1198,88 @@ def download_rdm_summary_excel(request):
     selected_date = request.GET.get('date')
     if not selected_date:
         return HttpResponse('No date provided', status=400)
+    if not parse_date(selected_date):
+        return HttpResponse('Invalid date', status=400)
 
-    # Calculate RDM-wise utilization
-    calculate_rdm_utilization(selected_date)
-    reports = UtilizationReportModel.objects.filter(date=selected_date)
-
-    # Prepare RDM summary data
-    rdm_data = {}
-    for report in reports:
-        rdm = report.rdm or 'Unassigned'
-        if rdm not in rdm_data:
-            rdm_data[rdm] = {
-                'resource_count': 0,
-                'billable_hours': 0,
-                'wtd_actuals': 0,
-                'addtnl_days': 0,
-                'total_capacity': 0,
-                'total_billed': 0,
-                'rdm_dams_utilization': report.rdm_dams_utilization,
-                'rdm_capable_utilization': report.rdm_capable_utilization
-            }
-        rdm_data[rdm]['resource_count'] += 1
-        rdm_data[rdm]['billable_hours'] += report.billable_hours or 0
-        rdm_data[rdm]['wtd_actuals'] += report.wtd_actuals or 0
-        rdm_data[rdm]['addtnl_days'] += report.addtnl_days or 0
-        rdm_data[rdm]['total_capacity'] += report.wtd_capacity or 0
-        rdm_data[rdm]['total_billed'] += report.total_billed or 0
-
-    # Create Excel workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = 'RDM Summary'
-
-    # Hide grid lines
-    ws.sheet_view.showGridLines = False
-
-    # Define styles
-    thin_border = Border(left=Side(style='thin'), 
-                         right=Side(style='thin'), 
-                         top=Side(style='thin'), 
-                         bottom=Side(style='thin'))
-
-    # Insert Oracle logo using BASE_DIR from settings
-    logo_path = os.path.join(settings.BASE_DIR, 'static', 'Oracle-Logo.png') # Use BASE_DIR
-    if os.path.exists(logo_path):
-        img = XLImage(logo_path)
-        img.height = 50  # Adjusted height
-        img.width = 150  # Adjusted width
-        ws.add_image(img, 'A1')
-        # Set row height for the logo row
-        ws.row_dimensions[1].height = 40 
-    else:
-        ws['A1'] = "Logo not found" # Placeholder if logo missing
-
-
-    # Add confidential text centered at the top
-    ws.merge_cells('B1:I1') # Merge across more columns if needed
-    cell = ws['B1']
-    cell.value = 'Confidential - Oracle Restricted'
-    cell.alignment = Alignment(horizontal='center', vertical='center')
-    cell.font = Font(bold=True, color='FF0000', size=14)
-
-    # Start table data from row 3
-    start_row = 3 
-
-    # Write table headers
+    # Same figures as the RDM summary modal
+    summary = rdm_summary(selected_date)
     headers = [
         'RDM', 'Resource Count', 'Billable Hours', 'WTD Actuals', 'Additional Days',
         'Total Capacity', 'Total Billed', 'RDM DAMS Utilization (%)', 'RDM Capable Utilization (%)'
     ]
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=start_row, column=col_num, value=header)
-        cell.font = Font(bold=True)
-        cell.border = thin_border # Apply border to header cells
-
-    # Write data rows
-    current_row = start_row + 1
-    for rdm, vals in rdm_data.items():
-        data_to_write = [
-            rdm,
-            vals['resource_count'],
-            round(vals['billable_hours'], 2),
-            round(vals['wtd_actuals'], 2),
-            round(vals['addtnl_days'], 2),
-            round(vals['total_capacity'], 2),
-            round(vals['total_billed'], 2),
-            vals['rdm_dams_utilization'],
-            vals['rdm_capable_utilization']
+    frame = pd.DataFrame([
+        [
+            row['rdm'],
+            row['resource_count'],
+            round(row['billable_hours'], 2),
+            round(row['wtd_actuals'], 2),
+            round(row['addtnl_days'], 2),
+            round(row['total_capacity'], 2),
+            round(row['total_billed'], 2),
+            row['dams_utilization'],
+            row['capable_utilization']
         ]
-        for col_num, value in enumerate(data_to_write, 1):
-             cell = ws.cell(row=current_row, column=col_num, value=value)
-             cell.border = thin_border # Apply border to data cells
-        current_row += 1
-
-    # Set column widths for better appearance (adjust range as needed)
-    for i in range(len(headers)):
-        max_length = 0
-        column_letter = openpyxl.utils.get_column_letter(i + 1)
-        
-        # Check length of header first
-        max_length = len(str(ws.cell(row=start_row, column=i+1).value))
+        for row in summary['summary']
+    ], columns=headers)
 
-        # Check length of data cells in that column
-        for row_idx in range(start_row + 1, current_row): # Iterate only through data rows
-            cell = ws.cell(row=row_idx, column=i + 1)
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-        
-        # Add padding
-        adjusted_width = max_length + 3 # Increased padding slightly
-        ws.column_dimensions[column_letter].width = adjusted_width
+    return export_response(
+        f'rdm_summary_{selected_date}.xlsx',
+        'RDM Summary',
+        headers,
+        frame.itertuples(index=False, name=None),
+        widths=width_from_frame(frame, headers),
+    )
+
+@require_GET
+def parse_cache_stats(request):
+    """
+    Report parse cache hits, misses and disk usage. Workbooks are parsed by the
+    ingestion workers, so hits and misses are counted from the recorded ingestion
+    runs rather than from this process's counters.
+    """
+    stats = parse_cache.stats()
+    runs = IngestionRunModel.objects.aggregate(
+        hits=models.Count('id', filter=models.Q(cache_hit=True)),
+        misses=models.Count('id', filter=models.Q(cache_hit=False)),
+    )
+    lookups = runs['hits'] + runs['misses']
+    stats.update(runs, hit_ratio=round(runs['hits'] / lookups, 4) if lookups else 0)
+    # Parse time saved is only known inside the worker process that hit the cache
+    stats.pop('seconds_saved', None)
+    return JsonResponse(stats)
+
+@require_GET
+def report_cache_stats(request):
+    """
+    Report cache hits, misses and hit ratios per kind for this worker process.
+    """
+    return JsonResponse(report_cache.stats())
+
+@require_GET
+def ingestion_runs(request):
+    """
+    List recent ingestion runs with their per-stage profile, and compare two runs
+    (?base=<id>&other=<id>) to find the stage that regressed.
+    """
+    runs = IngestionRunModel.objects.all()[:50]
+    context = {'runs': runs}
 
-    # Prepare response
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = f'attachment; filename=rdm_summary_{selected_date}.xlsx'
-    wb.save(response)
-    return response
+    base_id = request.GET.get('base')
+    other_id = request.GET.get('other')
+    if base_id and other_id:
+        try:
+            base = IngestionRunModel.objects.get(pk=base_id)
+            other = IngestionRunModel.objects.get(pk=other_id)
+        except (IngestionRunModel.DoesNotExist, ValueError):
+            messages.error(request, 'One of the selected runs no longer exists.')
+        else:
+            rows, regressed = compare_runs(base, other)
+            context.update({
+                'base': base,
+                'other': other,
+                'comparison': rows,
+                'regressed': regressed,
+                'total_delta': round(other.total_seconds - base.total_seconds, 3),
+            })
 
+    return render(request, 'util_report/ingestion_runs.html', context)